@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+调试产物模块
+在后台线程中写入页面 HTML 和截图，HTML 以 gzip 压缩保存，
+并按保存天数和总大小清理旧文件，避免日志目录在长期运行后被占满
+"""
+
+import gzip
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+from storage import atomic_write_bytes
+
+
+class ArtifactWriter:
+    """异步调试产物写入器"""
+
+    # 需要纳入清理范围的产物文件名前缀 (包括旧版本直接写在日志目录下的文件)
+    PREFIXES = ('login_page_', 'login_failed_', 'error_')
+
+    def __init__(self, directory: Path, max_age_days: float = 14, max_total_mb: float = 50,
+                 legacy_dir: Optional[Path] = None, logger: Optional[logging.Logger] = None):
+        """初始化写入器
+
+        Args:
+            directory: 产物保存目录
+            max_age_days: 产物最长保存天数
+            max_total_mb: 产物总大小上限 (MB)，超出时从最旧的开始删除
+            legacy_dir: 旧版本产物所在目录，一并纳入清理
+            logger: 日志记录器
+        """
+        self.directory = Path(directory)
+        self.max_age_days = max_age_days
+        self.max_total_mb = max_total_mb
+        self.legacy_dir = Path(legacy_dir) if legacy_dir else None
+        self.logger = logger or logging.getLogger('HitunCheckin')
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        # 启动时先在后台清理一次：清理原本只在写入产物后进行，
+        # 调低保存天数/总大小，或长期没有新产物时，旧文件会一直留着
+        self.prune()
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._worker, name='ArtifactWriter', daemon=True)
+                self._thread.start()
+
+    def _artifact_path(self, name: str, suffix: str) -> Path:
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        return self.directory / f"{name}_{timestamp}{suffix}"
+
+    def save_html(self, name: str, html: str) -> Path:
+        """异步保存页面 HTML (gzip 压缩)
+
+        Returns:
+            产物最终路径
+        """
+        path = self._artifact_path(name, '.html.gz')
+        self._ensure_worker()
+        self._queue.put((path, html, True))
+        return path
+
+    def save_png(self, name: str, data: bytes) -> Path:
+        """异步保存截图 (PNG 本身已压缩，原样保存)
+
+        Returns:
+            产物最终路径
+        """
+        path = self._artifact_path(name, '.png')
+        self._ensure_worker()
+        self._queue.put((path, data, False))
+        return path
+
+    def prune(self):
+        """在后台线程中按保存天数和总大小清理一次产物"""
+        self._ensure_worker()
+        self._queue.put(None)
+
+    def flush(self, timeout: float = 10):
+        """等待已提交的产物写完
+
+        Args:
+            timeout: 最长等待时间(秒)
+        """
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+    def _worker(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                try:
+                    self.apply_retention()
+                except Exception as e:
+                    self.logger.warning(f"清理调试产物失败: {e}")
+                finally:
+                    self._queue.task_done()
+                continue
+            path, payload, compress = item
+            try:
+                if isinstance(payload, str):
+                    payload = payload.encode('utf-8')
+                if compress:
+                    payload = gzip.compress(payload, compresslevel=6)
+                atomic_write_bytes(path, payload)
+                if self._queue.empty():
+                    self.apply_retention()
+            except Exception as e:
+                self.logger.warning(f"保存调试产物失败: {path} ({e})")
+            finally:
+                self._queue.task_done()
+
+    def list_artifacts(self) -> List[Path]:
+        """列出所有产物文件，按修改时间从新到旧排序"""
+        files = []
+        for directory in filter(None, (self.directory, self.legacy_dir)):
+            if not directory.is_dir():
+                continue
+            files.extend(
+                path for path in directory.iterdir()
+                if path.is_file() and path.name.startswith(self.PREFIXES)
+            )
+        return sorted(files, key=lambda path: path.stat().st_mtime, reverse=True)
+
+    def apply_retention(self):
+        """删除超过保存天数的产物，并把总大小控制在上限内"""
+        cutoff = time.time() - self.max_age_days * 86400
+        budget = self.max_total_mb * 1024 * 1024
+        used = 0
+        removed = 0
+        for path in self.list_artifacts():
+            try:
+                stat = path.stat()
+                if stat.st_mtime < cutoff or used + stat.st_size > budget:
+                    path.unlink()
+                    removed += 1
+                else:
+                    used += stat.st_size
+            except OSError:
+                continue
+        if removed:
+            self.logger.info(f"已清理 {removed} 个过期调试产物")
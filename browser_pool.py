@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+共享浏览器模块
+单个 Chrome 进程内为每个账号创建隔离的浏览器上下文 (CDP Target.createBrowserContext)
+"""
+
+import logging
+import os
+from typing import Dict, Iterable, List, Optional
+
+
+def _read_rss_kb(pid: int) -> int:
+    """读取进程常驻内存 (VmRSS, KB)，进程不存在时返回 0"""
+    try:
+        with open(f'/proc/{pid}/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+def _children_map() -> Dict[int, List[int]]:
+    """构建 父进程 -> 子进程 映射 (仅 Linux /proc 可用)"""
+    children: Dict[int, List[int]] = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', 'r') as f:
+                stat = f.read()
+            # comm 字段可能包含空格，从最后一个右括号之后解析
+            ppid = int(stat[stat.rindex(')') + 2:].split()[1])
+        except (OSError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    return children
+
+
+def process_tree(root_pids: Iterable[int]) -> List[int]:
+    """若干进程及其全部子进程的 pid 列表 (非 Linux 平台只返回 root_pids)"""
+    roots = [pid for pid in root_pids if pid]
+    if not os.path.isdir('/proc'):
+        return roots
+
+    children = _children_map()
+    seen = set()
+    tree: List[int] = []
+    stack = roots
+    while stack:
+        pid = stack.pop()
+        if pid in seen:
+            continue
+        seen.add(pid)
+        tree.append(pid)
+        stack.extend(children.get(pid, []))
+    return tree
+
+
+def process_tree_rss_mb(root_pids: Iterable[int]) -> Optional[float]:
+    """统计若干进程及其全部子进程的常驻内存总和 (MB)
+
+    Returns:
+        内存占用 MB，非 Linux 平台返回 None
+    """
+    if not os.path.isdir('/proc'):
+        return None
+    return round(sum(_read_rss_kb(pid) for pid in process_tree(root_pids)) / 1024, 1)
+
+
+def browser_memory_mb(driver) -> Optional[float]:
+    """统计 WebDriver 对应的 chromedriver 与 Chrome 进程树内存 (MB)"""
+    roots = []
+    service = getattr(driver, 'service', None)
+    process = getattr(service, 'process', None)
+    if process is not None:
+        roots.append(process.pid)
+    # undetected-chromedriver 使用 use_subprocess 时 Chrome 不是 chromedriver 的子进程
+    browser_pid = getattr(driver, 'browser_pid', None)
+    if browser_pid:
+        roots.append(browser_pid)
+    if not roots:
+        return None
+    return process_tree_rss_mb(roots)
+
+
+class SharedBrowser:
+    """多个账号共用的浏览器
+
+    每个账号在独立的浏览器上下文中运行，上下文之间的 cookie、缓存和存储互相隔离，
+    账号之间只共享 Chrome 的基础进程开销。
+    """
+
+    def __init__(self, driver, logger: Optional[logging.Logger] = None):
+        """初始化共享浏览器
+
+        Args:
+            driver: 已启动的 Chrome WebDriver
+            logger: 日志记录器
+        """
+        self.driver = driver
+        self.logger = logger or logging.getLogger('HitunCheckin')
+        self._home_handle = driver.current_window_handle
+        # 窗口句柄(target id) -> (浏览器上下文 id, 账号标识)
+        self._contexts: Dict[str, tuple] = {}
+        self.base_memory_mb = browser_memory_mb(driver)
+        # 账号标识 -> 该账号上下文存活期间观察到的最大内存增量 (MB)
+        self.context_memory_mb: Dict[str, float] = {}
+
+    @classmethod
+    def launch(cls, checkin) -> 'SharedBrowser':
+        """借助某个签到实例的浏览器初始化逻辑启动共享 Chrome
+
+        Args:
+            checkin: HitunCheckin 实例，仅使用其 _init_driver 启动浏览器
+        """
+        checkin._init_driver()
+        driver = checkin.driver
+        checkin.driver = None
+        return cls(driver, checkin.logger)
+
+    def open_context(self, label: str, proxy: Optional[str] = None) -> str:
+        """创建一个隔离的浏览器上下文并切换到其中的新标签页
+
+        Args:
+            label: 账号标识，用于内存统计
+            proxy: 该上下文使用的出口代理 (各上下文可以不同)
+
+        Returns:
+            新标签页的窗口句柄
+        """
+        params = {}
+        if proxy:
+            # <-loopback> 让发往本机地址的请求也走代理 (Chrome 默认绕过)，本地替身站点测试时需要
+            params = {'proxyServer': proxy, 'proxyBypassList': '<-loopback>'}
+        context = self.driver.execute_cdp_cmd('Target.createBrowserContext', params)
+        context_id = context['browserContextId']
+        target = self.driver.execute_cdp_cmd('Target.createTarget', {
+            'url': 'about:blank',
+            'browserContextId': context_id,
+        })
+        # chromedriver 的窗口句柄即 CDP target id
+        handle = target['targetId']
+        self.driver.switch_to.window(handle)
+        self._contexts[handle] = (context_id, label)
+        return handle
+
+    def close_context(self, handle: Optional[str]):
+        """销毁浏览器上下文 (连同其中的 cookie 与标签页)"""
+        context_id, label = self._contexts.pop(handle, (None, None))
+        if label is not None:
+            self._record_memory(label)
+        try:
+            self.driver.switch_to.window(self._home_handle)
+        except Exception as e:
+            self.logger.debug("切换回初始标签页失败: %s", e)
+        if context_id:
+            try:
+                self.driver.execute_cdp_cmd('Target.disposeBrowserContext', {
+                    'browserContextId': context_id,
+                })
+            except Exception as e:
+                self.logger.warning(f"销毁浏览器上下文失败: {e}")
+
+    def _record_memory(self, label: str):
+        """记录账号上下文带来的内存增量"""
+        if self.base_memory_mb is None:
+            return
+        current = browser_memory_mb(self.driver)
+        if current is None:
+            return
+        delta = max(current - self.base_memory_mb, 0.0)
+        self.context_memory_mb[label] = max(self.context_memory_mb.get(label, 0.0), round(delta, 1))
+
+    def memory_report(self) -> str:
+        """生成共享浏览器与独立浏览器的内存对比报告
+
+        共享浏览器的基础内存和各上下文增量是实际测量值；独立浏览器的数字没有实际启动浏览器测量，
+        是按"每个账号各付一次相同的基础内存"推算的估计值，报告中会注明。
+        """
+        if self.base_memory_mb is None:
+            return "共享浏览器内存统计不可用 (需要 Linux /proc)"
+
+        lines = [f"共享浏览器基础内存: {self.base_memory_mb:.1f} MB"]
+        for label, delta in self.context_memory_mb.items():
+            lines.append(f"  账号 {label} 上下文增量: {delta:.1f} MB")
+
+        count = len(self.context_memory_mb)
+        if count:
+            extra = sum(self.context_memory_mb.values())
+            shared_total = self.base_memory_mb + extra
+            # 估算: 独立浏览器时每个账号都要支付一次基础内存
+            separate_total = self.base_memory_mb * count + extra
+            lines.append(
+                f"共享模式实测约 {shared_total:.1f} MB，平均每账号 {extra / count:.1f} MB；"
+                f"独立浏览器估算约 {separate_total:.1f} MB (每账号 {separate_total / count:.1f} MB，"
+                f"按每个浏览器的基础内存与共享浏览器相同推算，未实际测量)"
+            )
+        return "\n".join(lines)
+
+    def quit(self):
+        """关闭共享浏览器"""
+        for handle in list(self._contexts):
+            self.close_context(handle)
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+        self.logger.info("共享浏览器已关闭")
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+配置校验与热加载模块
+load_config 读取配置后按这里的字段表逐项校验类型与取值范围，一次列出所有问题；
+常驻模式用 ConfigWatcher 监视配置文件的变化，新配置校验通过后才整体替换，
+校验失败时继续使用当前配置。
+"""
+
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from proxy_pool import DIRECT, parse_proxy
+
+# 数值配置项 -> (下限, 上限)，None 表示不限制
+NUMBER_FIELDS: Dict[str, Tuple[Optional[float], Optional[float]]] = {
+    'timeout': (1, None),
+    'run_deadline': (0, None),
+    'max_retry': (1, None),
+    'log_max_mb': (0.1, None),
+    'log_backup_count': (0, None),
+    'login_snapshot_sample_rate': (0, 1),
+    'artifact_max_age_days': (0, None),
+    'artifact_max_total_mb': (0, None),
+    'cloudflare_timeout': (1, None),
+    'run_lock_timeout': (0, None),
+    'http_checkin_timeout': (1, None),
+    'preflight_timeout': (0.1, None),
+    'preflight_retry_delay': (0, None),
+    'adaptive_min_samples': (1, None),
+    'adaptive_timeout_margin': (1, None),
+    'timing_top_requests': (0, None),
+    'daemon_workers': (1, 64),
+    'keepalive_interval_hours': (0.1, None),
+    'keepalive_lead_minutes': (0, None),
+    'config_reload_seconds': (0, None),
+    'coordinator_lease_seconds': (1, None),
+    'coordinator_max_attempts': (1, None),
+    'coordinator_slots': (1, None),
+    'coordinator_poll_seconds': (1, None),
+    'notification_timeout': (1, None),
+    'captcha_timeout': (0, None),
+    'login_redirect_timeout': (1, None),
+    'proxy_max_latency': (1, None),
+    'proxy_max_challenge_rate': (0, 1),
+    'proxy_sideline_minutes': (0, None),
+    'proxy_min_samples': (1, None),
+    'proxy_max_failures': (1, None),
+}
+
+# 必须是整数的数值配置项
+INTEGER_FIELDS = {
+    'max_retry', 'log_backup_count', 'adaptive_min_samples', 'timing_top_requests',
+    'daemon_workers', 'coordinator_max_attempts', 'coordinator_slots', 'proxy_min_samples', 'proxy_max_failures',
+}
+
+BOOL_FIELDS = {
+    'headless', 'log_compress', 'log_json', 'debug_artifacts', 'use_undetected_chrome', 'use_cookies',
+    'speculative_http_checkin', 'driver_download', 'preflight', 'adaptive_timeouts', 'timing_report',
+    'timing_request_summary', 'keepalive', 'shared_browser', 'enable_notification', 'record_fixtures',
+    'proxy_direct_fallback',
+}
+
+STRING_FIELDS = {
+    'name', 'email', 'password', 'log_dir', 'data_dir', 'session_store', 'base_url', 'browser_path',
+    'driver_path', 'schedule', 'control_api', 'control_api_token', 'coordinator', 'serverchan_key',
+    'serverchan_uid', 'log_rotate_when', 'fixture_dir', 'proxy', 'notification_proxy',
+}
+
+CHOICE_FIELDS = {
+    'log_level': ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'),
+    'log_rotation': ('size', 'time'),
+    'login_submit': ('fast', 'classic'),
+}
+
+# 决定进程结构或已打开资源的配置项，修改后需要重启常驻进程才能生效
+RESTART_FIELDS = (
+    'data_dir', 'log_dir', 'log_rotation', 'log_max_mb', 'log_rotate_when', 'log_backup_count',
+    'log_compress', 'log_json', 'session_store', 'shared_browser', 'control_api', 'control_api_token',
+    'coordinator',
+)
+
+
+class ConfigError(ValueError):
+    """配置校验失败，errors 为全部问题"""
+
+    def __init__(self, errors: List[str]):
+        self.errors = errors
+        super().__init__("配置校验失败:\n" + '\n'.join(f"  - {error}" for error in errors))
+
+
+def parse_schedule(expr: str) -> Tuple[int, int]:
+    """解析每日执行时间
+
+    支持固定时间的 cron 表达式 (如 "30 8 * * *") 或 "HH:MM"。
+
+    Returns:
+        (小时, 分钟)
+    """
+    expr = expr.strip()
+    if ':' in expr:
+        hour, minute = expr.split(':', 1)
+    else:
+        fields = expr.split()
+        if len(fields) < 2:
+            raise ValueError(f"无法解析的定时表达式: {expr}")
+        minute, hour = fields[0], fields[1]
+    if not (hour.isdigit() and minute.isdigit()):
+        raise ValueError(f"仅支持固定时间的定时表达式 (如 '30 8 * * *'): {expr}")
+    if int(hour) > 23 or int(minute) > 59:
+        raise ValueError(f"定时表达式超出范围: {expr}")
+    return int(hour), int(minute)
+
+
+def _check_fields(config: Dict[str, Any], prefix: str = '') -> List[str]:
+    """校验一层配置中已知字段的类型与取值"""
+    errors = []
+    for key, value in config.items():
+        label = f"{prefix}{key}"
+        if key in NUMBER_FIELDS:
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                errors.append(f"{label} 应为数字: {value!r}")
+                continue
+            if key in INTEGER_FIELDS and value != int(value):
+                errors.append(f"{label} 应为整数: {value!r}")
+            low, high = NUMBER_FIELDS[key]
+            if low is not None and value < low:
+                errors.append(f"{label} 不能小于 {low}: {value!r}")
+            if high is not None and value > high:
+                errors.append(f"{label} 不能大于 {high}: {value!r}")
+        elif key in BOOL_FIELDS:
+            if not isinstance(value, bool):
+                errors.append(f"{label} 应为 true/false: {value!r}")
+        elif key in STRING_FIELDS:
+            if value is not None and not isinstance(value, str):
+                errors.append(f"{label} 应为字符串: {value!r}")
+        elif key in CHOICE_FIELDS:
+            if value not in CHOICE_FIELDS[key]:
+                errors.append(f"{label} 应为 {'/'.join(CHOICE_FIELDS[key])} 之一: {value!r}")
+
+    schedule = config.get('schedule')
+    if isinstance(schedule, str):
+        try:
+            parse_schedule(schedule)
+        except ValueError as e:
+            errors.append(f"{prefix}schedule: {e}")
+
+    for key, special in (('proxy', DIRECT), ('notification_proxy', 'account')):
+        value = config.get(key)
+        if isinstance(value, str) and value and value != special:
+            try:
+                parse_proxy(value)
+            except ValueError as e:
+                errors.append(f"{prefix}{key}: {e}")
+
+    proxies = config.get('proxies')
+    if proxies is not None:
+        if not isinstance(proxies, list) or not all(isinstance(proxy, str) for proxy in proxies):
+            errors.append(f"{prefix}proxies 应为代理地址数组")
+        else:
+            for proxy in proxies:
+                try:
+                    parse_proxy(proxy)
+                except ValueError as e:
+                    errors.append(f"{prefix}proxies: {e}")
+            if len(set(proxies)) != len(proxies):
+                errors.append(f"{prefix}proxies 中有重复的代理")
+
+    limits = config.get('adaptive_timeout_limits')
+    if limits is not None:
+        if not isinstance(limits, dict):
+            errors.append(f"{prefix}adaptive_timeout_limits 应为对象")
+        else:
+            for phase, bounds in limits.items():
+                if (not isinstance(bounds, (list, tuple)) or len(bounds) != 2
+                        or not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in bounds)
+                        or bounds[0] > bounds[1]):
+                    errors.append(f"{prefix}adaptive_timeout_limits.{phase} 应为 [下限, 上限]: {bounds!r}")
+    return errors
+
+
+def validate_config(config: Dict[str, Any]):
+    """校验配置，发现问题时抛出 ConfigError (一次列出全部问题)
+
+    只校验已知字段，未知字段和以 _ 开头的注释项忽略。
+    """
+    if not isinstance(config, dict):
+        raise ConfigError(["配置文件顶层应为 JSON 对象"])
+    errors = _check_fields(config)
+
+    accounts = config.get('accounts')
+    if accounts is not None and not isinstance(accounts, list):
+        errors.append("accounts 应为数组")
+    elif accounts:
+        seen = set()
+        for index, account in enumerate(accounts, 1):
+            if not isinstance(account, dict):
+                errors.append(f"第 {index} 个账号应为对象")
+                continue
+            errors.extend(_check_fields(account, prefix=f"第 {index} 个账号的 "))
+            if 'proxies' in account:
+                # 代理池由所有账号共用，账号只能用 proxy 指定固定代理
+                errors.append(f"第 {index} 个账号的 proxies 只能在顶层配置，账号请使用 proxy")
+            name = account.get('name') or account.get('email')
+            if name in seen:
+                errors.append(f"第 {index} 个账号与前面的账号重名: {name}")
+            seen.add(name)
+
+    if errors:
+        raise ConfigError(errors)
+
+
+def diff_config(old: Dict[str, Any], new: Dict[str, Any]) -> List[str]:
+    """列出顶层发生变化的配置项 (不含 accounts 和注释项)"""
+    keys = (set(old) | set(new)) - {'accounts'}
+    return sorted(key for key in keys if not key.startswith('_') and old.get(key) != new.get(key))
+
+
+def pin_restart_fields(old: Dict[str, Any], new: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+    """新配置中需要重启才能生效的配置项沿用旧值
+
+    Returns:
+        (实际生效的配置, 被沿用旧值的配置项)
+    """
+    effective = dict(new)
+    pinned = []
+    for key in RESTART_FIELDS:
+        if old.get(key) == new.get(key):
+            continue
+        pinned.append(key)
+        if key in old:
+            effective[key] = old[key]
+        else:
+            effective.pop(key, None)
+    return effective, pinned
+
+
+class ConfigWatcher(threading.Thread):
+    """轮询配置文件的修改时间与大小，变化时调用 on_change
+
+    调用 poke() (如收到 SIGHUP) 可立即重新加载，不必等到下一次轮询。
+    """
+
+    def __init__(self, path: str, on_change: Callable[[], Any], interval: float = 5.0):
+        """
+        Args:
+            path: 配置文件路径
+            on_change: 文件变化时的回调 (在监视线程中执行)
+            interval: 轮询间隔 (秒)
+        """
+        super().__init__(name='config-watcher', daemon=True)
+        self.path = path
+        self.on_change = on_change
+        self.interval = interval
+        self._signature = self._stat()
+        self._wake = threading.Event()
+        self._done = threading.Event()
+
+    def _stat(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        # 编辑器通常先写临时文件再改名替换，inode 变化也视为修改
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def poke(self):
+        """立即重新加载"""
+        self._wake.set()
+
+    def run(self):
+        while not self._done.is_set():
+            self._wake.wait(self.interval)
+            if self._done.is_set():
+                break
+            forced = self._wake.is_set()
+            self._wake.clear()
+            signature = self._stat()
+            if signature is None or (signature == self._signature and not forced):
+                continue
+            self._signature = signature
+            self.on_change()
+
+    def stop(self):
+        self._done.set()
+        self._wake.set()
+        self.join()
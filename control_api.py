@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+常驻模式的本地控制接口
+通过本机 TCP 端口或 Unix socket 提供 HTTP 接口: 触发签到、查询最近结果和各阶段耗时、
+下载调试产物。签到在常驻进程现有的线程池中执行，不会另起进程与定时任务争抢浏览器。
+
+接口:
+    GET  /status                 各账号最近一次签到结果与下次签到时间
+    POST /checkin[/<账号>]        触发全部或单个账号签到，?wait=秒数 时等待结果 (超时的账号列在 running 中)
+    GET  /timings[/<账号>]        各账号最近一次运行的各阶段耗时，不指定账号时附带共用的历史耗时统计
+    GET  /artifacts?limit=20     最近的调试产物列表
+    GET  /artifacts/<文件名>      下载调试产物
+    GET  /proxies                出口代理池中各代理的健康状况与分到的账号
+    POST /reload                 立即重新加载配置文件
+"""
+
+import hmac
+import json
+import logging
+import os
+import socketserver
+import threading
+from concurrent.futures import wait as wait_futures
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """监听 Unix socket 的 HTTP 服务器"""
+
+    daemon_threads = True
+
+    def server_bind(self):
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+        super().server_bind()
+        # 只允许同一用户访问
+        os.chmod(self.server_address, 0o600)
+
+
+def parse_address(address: str) -> Tuple[str, Any]:
+    """解析监听地址
+
+    Args:
+        address: "unix:/path/to.sock"、"127.0.0.1:8765" 或端口号 "8765"
+
+    Returns:
+        ('unix', 路径) 或 ('tcp', (主机, 端口))
+    """
+    if address.startswith('unix:'):
+        return 'unix', address[len('unix:'):]
+    host, _, port = address.rpartition(':')
+    return 'tcp', (host or '127.0.0.1', int(port))
+
+
+class ControlAPI:
+    """常驻进程的控制接口"""
+
+    def __init__(self, daemon, address: str, token: Optional[str] = None,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            daemon: CheckinDaemon 实例
+            address: 监听地址，见 parse_address
+            token: 访问令牌，设置后请求需带 "Authorization: Bearer <token>"
+            logger: 日志记录器
+        """
+        self.daemon = daemon
+        self.address = address
+        self.token = token
+        self.logger = logger or logging.getLogger('HitunCheckin')
+        self.server = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """在后台线程中开始监听"""
+        kind, target = parse_address(self.address)
+        handler = self._make_handler()
+        if kind == 'unix':
+            self.server = _UnixHTTPServer(target, handler)
+        else:
+            self.server = ThreadingHTTPServer(target, handler)
+            self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, name='ControlAPI', daemon=True)
+        self._thread.start()
+        self.logger.info(f"控制接口已启动: {self.address}")
+
+    def stop(self):
+        """停止监听"""
+        if not self.server:
+            return
+        self.server.shutdown()
+        self.server.server_close()
+        kind, target = parse_address(self.address)
+        if kind == 'unix' and os.path.exists(target):
+            os.unlink(target)
+        self.server = None
+
+    # ---- 接口实现 ----
+
+    def handle(self, method: str, path: str, query: Dict[str, list]) -> Tuple[int, Any]:
+        """分发请求
+
+        Returns:
+            (HTTP 状态码, JSON 对象；下载产物时为文件路径)
+        """
+        parts = [unquote(part) for part in path.strip('/').split('/') if part]
+        if not parts:
+            return 404, {'error': 'not found'}
+        resource, name = parts[0], '/'.join(parts[1:]) or None
+
+        if method == 'GET' and resource == 'status' and not name:
+            return 200, self.daemon.status()
+        if method == 'POST' and resource == 'checkin':
+            return self._checkin(name, query)
+        if method == 'GET' and resource == 'timings':
+            return self._timings(name)
+        if method == 'GET' and resource == 'artifacts':
+            return self._artifacts(name, query)
+        if method == 'GET' and resource == 'proxies' and not name:
+            return self._proxies()
+        if method == 'POST' and resource == 'reload' and not name:
+            ok = self.daemon.reload_config()
+            return (200, {'reloaded': True}) if ok else (400, {'reloaded': False, 'error': '配置校验失败，详见日志'})
+        return 404, {'error': 'not found'}
+
+    def _checkin(self, name: Optional[str], query: Dict[str, list]) -> Tuple[int, Any]:
+        checkins = self.daemon.accounts()
+        names = [name] if name else list(checkins)
+        if name and name not in checkins:
+            return 404, {'error': f"未知账号: {name}"}
+
+        submitted, running = {}, []
+        for account in names:
+            future = self.daemon.trigger(account)
+            if future is None:
+                running.append(account)
+            else:
+                submitted[account] = future
+        self.logger.info(f"控制接口触发签到: {list(submitted) or '无'}，进行中: {running or '无'}")
+
+        wait = float(query.get('wait', ['0'])[0] or 0)
+        if wait <= 0:
+            return 202, {'submitted': list(submitted), 'running': running}
+
+        # 所有账号共用同一个等待时限，而不是逐个账号各等 wait 秒
+        done, _ = wait_futures(submitted.values(), timeout=wait)
+        results = {}
+        for account, future in submitted.items():
+            if future not in done:
+                # 等待超时的账号仍在签到，不返回上一次的结果
+                running.append(account)
+                continue
+            if future.exception():
+                self.logger.warning(f"[{account}] 控制接口触发的签到异常: {future.exception()}")
+            results[account] = self.daemon.last_result(account)
+        return 200, {'results': results, 'running': running}
+
+    def _timings(self, name: Optional[str]) -> Tuple[int, Any]:
+        checkins = self.daemon.accounts()
+        if name and name not in checkins:
+            return 404, {'error': f"未知账号: {name}"}
+        if name:
+            return 200, {'account': name, 'last_run': self.daemon.last_result(name)}
+        # 历史耗时由各账号共用同一个文件，取任一账号的即可
+        history = next(iter(checkins.values())).history.summary() if checkins else {}
+        return 200, {
+            'accounts': {account: self.daemon.last_result(account) for account in checkins},
+            'history': history,
+        }
+
+    def _proxies(self) -> Tuple[int, Any]:
+        # 代理池由各账号共用，取任一账号的即可；没有账号或未配置代理时为空列表
+        checkins = list(self.daemon.accounts().values())
+        pool = checkins[0].proxies if checkins else None
+        return 200, {'proxies': pool.status() if pool else []}
+
+    def _artifacts(self, name: Optional[str], query: Dict[str, list]) -> Tuple[int, Any]:
+        # 产物目录由全局配置决定，取任一账号的即可
+        checkins = list(self.daemon.accounts().values())
+        files = checkins[0].artifacts.list_artifacts() if checkins else []
+        if name:
+            # 只允许下载产物列表中的文件，防止路径穿越
+            for path in files:
+                if path.name == name:
+                    return 200, path
+            return 404, {'error': f"产物不存在: {name}"}
+
+        limit = int(query.get('limit', ['20'])[0] or 20)
+        listing = []
+        for path in files[:limit]:
+            stat = path.stat()
+            listing.append({'name': path.name, 'size': stat.st_size, 'mtime': int(stat.st_mtime)})
+        return 200, {'artifacts': listing}
+
+    def _authorized(self, header: Optional[str]) -> bool:
+        if not self.token:
+            return True
+        return hmac.compare_digest(header or '', f"Bearer {self.token}")
+
+    def _make_handler(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            server_version = 'HitunCheckin'
+
+            def address_string(self):
+                # Unix socket 的 client_address 为空字符串
+                return self.client_address[0] if self.client_address else 'unix'
+
+            def log_message(self, format, *args):
+                api.logger.debug("控制接口 %s - %s", self.address_string(), format % args)
+
+            def _dispatch(self, method: str):
+                if not api._authorized(self.headers.get('Authorization')):
+                    self._send_json(401, {'error': 'unauthorized'})
+                    return
+                url = urlparse(self.path)
+                try:
+                    status, payload = api.handle(method, url.path, parse_qs(url.query))
+                except ValueError as e:
+                    status, payload = 400, {'error': str(e)}
+                except Exception as e:
+                    api.logger.warning(f"控制接口处理请求失败: {e}")
+                    status, payload = 500, {'error': str(e)}
+                if isinstance(payload, os.PathLike):
+                    self._send_file(payload)
+                else:
+                    self._send_json(status, payload)
+
+            def _send_json(self, status: int, payload: Any):
+                body = json.dumps(payload, ensure_ascii=False, default=str).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_file(self, path):
+                data = path.read_bytes()
+                content_type = 'image/png' if path.suffix == '.png' else 'application/octet-stream'
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                self.send_header('Content-Disposition', f'attachment; filename="{path.name}"')
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._dispatch('GET')
+
+            def do_POST(self):
+                self._dispatch('POST')
+
+        return Handler
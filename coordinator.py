@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+协调者模式 (多节点账号分片)
+账号列表保存在共享的账号表中，各节点上的 worker 进程从表中租用 (lease) 当天还没签到的账号，
+执行签到期间定期续租，完成后释放并记录结果。worker 崩溃时租约到期，账号会被其他 worker 回收重试。
+各容器不需要分别配置账号，增加 worker 数量即可线性提高吞吐。
+
+后端 (配置项 coordinator):
+    sqlite:///路径/coordinator.db       共享卷上的 SQLite 数据库
+    redis://[:密码@]主机:端口/库号       Redis 协议服务 (或本地的 resp_standin 替身)
+"""
+
+import abc
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from resp_client import RespClient
+
+
+def account_key(account: Dict[str, Any]) -> str:
+    """账号在账号表中的标识 (name，未设置时为 email)"""
+    return account.get('name') or account['email']
+
+
+def today() -> str:
+    """当前签到周期 (本地日期)"""
+    return datetime.now().strftime('%Y-%m-%d')
+
+
+def _is_due(state: Dict[str, Any], cycle: str, max_attempts: int) -> bool:
+    """账号在本周期是否还需要签到: 本周期未运行过，或未成功且尝试次数未用完"""
+    if state.get('cycle') != cycle:
+        return True
+    return state.get('last_status') != 'success' and state.get('attempts', 0) < max_attempts
+
+
+class LeaseStore(abc.ABC):
+    """账号表与租约接口
+
+    账号状态字段: name, owner, lease_expires, cycle, attempts, last_status, last_finished, last_duration
+    last_status 取值: running (已租出) / success / failed
+    """
+
+    @abc.abstractmethod
+    def register(self, accounts: List[Dict[str, Any]]) -> int:
+        """用给定账号列表替换账号表 (保留已有账号的签到状态)，返回账号数"""
+
+    @abc.abstractmethod
+    def acquire(self, worker: str, ttl: float, max_attempts: int = 2
+                ) -> Optional[Tuple[Dict[str, Any], Optional[str]]]:
+        """租用一个本周期待签到的账号
+
+        Args:
+            worker: worker 标识
+            ttl: 租约时长 (秒)
+            max_attempts: 每个周期每个账号最多被租用的次数 (含崩溃回收)
+
+        Returns:
+            (账号配置, 被回收租约的原持有者或 None)；没有可租用的账号时返回 None
+        """
+
+    @abc.abstractmethod
+    def renew(self, name: str, worker: str, ttl: float) -> bool:
+        """续租，租约已过期并被其他 worker 取得时返回 False"""
+
+    @abc.abstractmethod
+    def release(self, name: str, worker: str, success: bool, duration: float) -> bool:
+        """释放租约并记录结果，租约已不属于该 worker 时不做修改并返回 False"""
+
+    @abc.abstractmethod
+    def status(self) -> List[Dict[str, Any]]:
+        """所有账号的租约与签到状态"""
+
+    def describe(self) -> str:
+        """用于日志的存储描述"""
+        return self.__class__.__name__
+
+
+class SQLiteLeaseStore(LeaseStore):
+    """SQLite 账号表，租用与续租在 BEGIN IMMEDIATE 事务中完成"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS accounts (
+            name TEXT PRIMARY KEY,
+            config TEXT NOT NULL,
+            owner TEXT,
+            lease_expires REAL NOT NULL DEFAULT 0,
+            cycle TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            last_status TEXT,
+            last_finished REAL,
+            last_duration REAL
+        )
+    """
+    STATE_FIELDS = ('name', 'owner', 'lease_expires', 'cycle', 'attempts',
+                    'last_status', 'last_finished', 'last_duration')
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(self.SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+
+    def _transaction(self, work):
+        """在写事务中执行 work(conn)"""
+        with closing(self._connect()) as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                result = work(conn)
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
+            return result
+
+    def register(self, accounts):
+        names = [account_key(account) for account in accounts]
+
+        def work(conn):
+            for name, account in zip(names, accounts):
+                conn.execute(
+                    'INSERT INTO accounts (name, config) VALUES (?, ?) '
+                    'ON CONFLICT(name) DO UPDATE SET config = excluded.config',
+                    (name, json.dumps(account, ensure_ascii=False)),
+                )
+            placeholders = ','.join('?' * len(names))
+            conn.execute(f'DELETE FROM accounts WHERE name NOT IN ({placeholders})', names)
+            return len(names)
+
+        return self._transaction(work)
+
+    def acquire(self, worker, ttl, max_attempts=2):
+        cycle = today()
+
+        def work(conn):
+            now = time.time()
+            row = conn.execute(
+                'SELECT name, config, owner FROM accounts '
+                'WHERE lease_expires < ? AND (cycle IS NULL OR cycle != ? '
+                '    OR (last_status IS NOT \'success\' AND attempts < ?)) '
+                'ORDER BY COALESCE(last_finished, 0) LIMIT 1',
+                (now, cycle, max_attempts),
+            ).fetchone()
+            if not row:
+                return None
+            name, config, previous = row
+            conn.execute(
+                'UPDATE accounts SET owner = ?, lease_expires = ?, '
+                'attempts = CASE WHEN cycle = ? THEN attempts + 1 ELSE 1 END, '
+                'cycle = ?, last_status = \'running\' WHERE name = ?',
+                (worker, now + ttl, cycle, cycle, name),
+            )
+            return json.loads(config), previous
+
+        return self._transaction(work)
+
+    def renew(self, name, worker, ttl):
+        def work(conn):
+            return conn.execute(
+                'UPDATE accounts SET lease_expires = ? WHERE name = ? AND owner = ?',
+                (time.time() + ttl, name, worker),
+            ).rowcount == 1
+
+        return self._transaction(work)
+
+    def release(self, name, worker, success, duration):
+        def work(conn):
+            return conn.execute(
+                'UPDATE accounts SET owner = NULL, lease_expires = 0, last_status = ?, '
+                'last_finished = ?, last_duration = ? WHERE name = ? AND owner = ?',
+                ('success' if success else 'failed', time.time(), round(duration, 1), name, worker),
+            ).rowcount == 1
+
+        return self._transaction(work)
+
+    def status(self):
+        with closing(self._connect()) as conn:
+            rows = conn.execute(f"SELECT {', '.join(self.STATE_FIELDS)} FROM accounts ORDER BY name").fetchall()
+        now = time.time()
+        states = []
+        for row in rows:
+            state = dict(zip(self.STATE_FIELDS, row))
+            if state['lease_expires'] < now:
+                state['owner'] = None
+            states.append(state)
+        return states
+
+    def describe(self):
+        return f"sqlite:{self.path}"
+
+
+class RedisLeaseStore(LeaseStore):
+    """Redis 协议账号表
+
+    键:
+        <prefix>accounts          账号名集合
+        <prefix>account:<账号>     账号配置 (JSON)
+        <prefix>state:<账号>       签到状态 (JSON)，只由租约持有者修改
+        <prefix>lease:<账号>       租约，值为 worker 标识，带过期时间 (SET NX PX)
+    """
+
+    def __init__(self, url: str, prefix: str = 'hitun:coord:'):
+        self.url = url
+        self.prefix = prefix
+        self.client = RespClient.from_url(url)
+
+    def _key(self, kind: str, name: str = '') -> str:
+        return f"{self.prefix}{kind}:{name}" if name else f"{self.prefix}{kind}"
+
+    def _state(self, name: str) -> Dict[str, Any]:
+        raw = self.client.execute('GET', self._key('state', name))
+        return json.loads(raw) if raw else {}
+
+    def _names(self) -> List[str]:
+        return [name.decode('utf-8') for name in self.client.execute('SMEMBERS', self._key('accounts'))]
+
+    def register(self, accounts):
+        names = [account_key(account) for account in accounts]
+        with self.client.lock:
+            for name, account in zip(names, accounts):
+                self.client.execute('SET', self._key('account', name), json.dumps(account, ensure_ascii=False))
+                self.client.execute('SADD', self._key('accounts'), name)
+            stale = [name for name in self._names() if name not in names]
+            if stale:
+                self.client.execute('SREM', self._key('accounts'), *stale)
+                self.client.execute('DEL', *[self._key(kind, name) for name in stale
+                                             for kind in ('account', 'state')])
+        return len(names)
+
+    def acquire(self, worker, ttl, max_attempts=2):
+        cycle = today()
+        with self.client.lock:
+            candidates = []
+            for name in self._names():
+                state = self._state(name)
+                if _is_due(state, cycle, max_attempts):
+                    candidates.append((state.get('last_finished') or 0, name))
+            for _, name in sorted(candidates):
+                lease = self._key('lease', name)
+                if self.client.execute('SET', lease, worker, 'NX', 'PX', int(ttl * 1000)) is None:
+                    continue
+                # 读取状态与取得租约之间账号可能已被其他 worker 签完，取得租约后重新检查
+                state = self._state(name)
+                raw = self.client.execute('GET', self._key('account', name))
+                if not raw or not _is_due(state, cycle, max_attempts):
+                    self.client.execute('DEL', lease)
+                    continue
+                previous = state.get('owner') if state.get('last_status') == 'running' else None
+                attempts = state.get('attempts', 0) + 1 if state.get('cycle') == cycle else 1
+                state.update(owner=worker, cycle=cycle, attempts=attempts, last_status='running')
+                self.client.execute('SET', self._key('state', name), json.dumps(state))
+                return json.loads(raw), previous
+        return None
+
+    def _if_owner(self, name: str, worker: str, *commands) -> bool:
+        """租约仍属于 worker 时在事务中执行 commands"""
+        lease = self._key('lease', name)
+        with self.client.lock:
+            try:
+                self.client.execute('WATCH', lease)
+                owner = self.client.execute('GET', lease)
+                if owner is None or owner.decode('utf-8') != worker:
+                    self.client.execute('UNWATCH')
+                    return False
+                self.client.execute('MULTI')
+                for command in commands:
+                    self.client.execute(*command)
+                return self.client.execute('EXEC') is not None
+            except BaseException:
+                self.client.close()
+                raise
+
+    def renew(self, name, worker, ttl):
+        return self._if_owner(name, worker, ('PEXPIRE', self._key('lease', name), int(ttl * 1000)))
+
+    def release(self, name, worker, success, duration):
+        state = self._state(name)
+        state.update(owner=None, last_status='success' if success else 'failed',
+                     last_finished=time.time(), last_duration=round(duration, 1))
+        return self._if_owner(name, worker,
+                              ('SET', self._key('state', name), json.dumps(state)),
+                              ('DEL', self._key('lease', name)))
+
+    def status(self):
+        states = []
+        with self.client.lock:
+            for name in sorted(self._names()):
+                state = self._state(name)
+                owner = self.client.execute('GET', self._key('lease', name))
+                ttl = self.client.execute('PTTL', self._key('lease', name)) if owner else -2
+                states.append({
+                    'name': name,
+                    'owner': owner.decode('utf-8') if owner else None,
+                    'lease_expires': time.time() + ttl / 1000 if ttl > 0 else 0,
+                    'cycle': state.get('cycle'),
+                    'attempts': state.get('attempts', 0),
+                    'last_status': state.get('last_status'),
+                    'last_finished': state.get('last_finished'),
+                    'last_duration': state.get('last_duration'),
+                })
+        return states
+
+    def describe(self):
+        return f"redis://{self.client.host}:{self.client.port}/{self.client.db}"
+
+
+def create_lease_store(spec: Optional[str], data_dir: Path) -> LeaseStore:
+    """根据配置项 coordinator 创建账号表
+
+    Args:
+        spec: 见模块说明；"sqlite:" 不带路径时使用 data_dir/coordinator.db
+        data_dir: 数据目录
+    """
+    spec = (spec or '').strip()
+    if spec.startswith('sqlite:'):
+        path = spec[len('sqlite:'):]
+        if path.startswith('//'):
+            path = path[2:]
+        return SQLiteLeaseStore(Path(path) if path else Path(data_dir) / 'coordinator.db')
+    if spec.startswith(('redis://', 'rediss://')):
+        if spec.startswith('rediss://'):
+            raise ValueError("暂不支持 TLS 连接 (rediss://)")
+        return RedisLeaseStore(spec)
+    raise ValueError(f"未配置或无法识别的协调者存储 (coordinator): {spec or '空'}")
+
+
+class _Heartbeat(threading.Thread):
+    """签到期间定期续租"""
+
+    def __init__(self, store: LeaseStore, name: str, worker: str, ttl: float, logger: logging.Logger):
+        super().__init__(name=f"lease-{name}", daemon=True)
+        self.store = store
+        self.account = name
+        self.worker = worker
+        self.ttl = ttl
+        self.logger = logger
+        self.lost = False
+        self._done = threading.Event()
+
+    def run(self):
+        # 每 1/3 租期续租一次，一次续租失败 (如网络抖动) 不会让租约过期
+        while not self._done.wait(self.ttl / 3):
+            try:
+                if not self.store.renew(self.account, self.worker, self.ttl):
+                    self.lost = True
+                    self.logger.warning(f"[{self.account}] 租约已丢失 (已过期并被其他 worker 回收)")
+                    return
+            except Exception as e:
+                self.logger.warning(f"[{self.account}] 续租失败: {e}")
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+
+class CoordinatorWorker:
+    """从共享账号表租用账号并签到的 worker 进程"""
+
+    def __init__(self, config_path: str, store: Optional[LeaseStore] = None,
+                 worker_id: Optional[str] = None, checkin_factory=None):
+        """
+        Args:
+            config_path: 配置文件路径 (各节点共用的配置，可以不包含账号)
+            store: 账号表，默认按配置项 coordinator 创建
+            worker_id: worker 标识，默认 "主机名:pid"
+            checkin_factory: 根据账号配置创建签到实例的函数，默认 HitunCheckin(config_path, account=...)
+        """
+        from hitun_checkin import HitunCheckin, load_config
+        from logging_setup import setup_logging
+
+        self.config_path = config_path
+        self.config = load_config(config_path, require_credentials=False)
+        self.logger = setup_logging(self.config)
+        self.store = store or create_lease_store(self.config.get('coordinator'),
+                                                 Path(self.config.get('data_dir', 'data')))
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.checkin_factory = checkin_factory or (lambda account: HitunCheckin(config_path, account=account))
+        self.ttl = self.config.get('coordinator_lease_seconds', 120)
+        self.max_attempts = self.config.get('coordinator_max_attempts', 2)
+        self.poll_seconds = self.config.get('coordinator_poll_seconds', 60)
+        self.slots = max(1, self.config.get('coordinator_slots', 1))
+        self.results: Dict[str, bool] = {}
+        self._stop = threading.Event()
+
+    def stop(self, *_):
+        """请求停止: 不再租用新账号，进行中的签到完成后退出"""
+        self._stop.set()
+
+    def run_one(self, slot_id: str) -> Optional[bool]:
+        """租用并签到一个账号
+
+        Returns:
+            签到是否成功；没有可租用的账号时返回 None
+        """
+        leased = self.store.acquire(slot_id, self.ttl, self.max_attempts)
+        if leased is None:
+            return None
+        account, previous = leased
+        name = account_key(account)
+        if previous and previous != slot_id:
+            self.logger.warning(f"[{name}] 回收了 {previous} 的过期租约 (该 worker 可能已崩溃)")
+        self.logger.info(f"[{name}] 已租用 (worker {slot_id}, 租期 {self.ttl}s)")
+
+        heartbeat = _Heartbeat(self.store, name, slot_id, self.ttl, self.logger)
+        heartbeat.start()
+        started = time.time()
+        success = False
+        try:
+            success = self.checkin_factory(account).run()
+        except Exception as e:
+            self.logger.error(f"[{name}] 签到异常: {e}")
+        finally:
+            heartbeat.stop()
+            duration = time.time() - started
+            if not self.store.release(name, slot_id, success, duration):
+                self.logger.warning(f"[{name}] 释放租约时发现租约已不属于本 worker，结果未写入账号表")
+        self.results[name] = success
+        self.logger.info(f"[{name}] 签到{'成功' if success else '失败'}，耗时 {duration:.1f}s，已释放租约")
+        return success
+
+    def _slot_loop(self, slot_id: str, forever: bool, opens_at):
+        while not self._stop.is_set():
+            if forever and opens_at and datetime.now() < opens_at():
+                self._stop.wait(self.poll_seconds)
+                continue
+            try:
+                result = self.run_one(slot_id)
+            except Exception as e:
+                self.logger.warning(f"访问账号表失败: {e}")
+                result = None
+            if result is None:
+                if not forever:
+                    return
+                self._stop.wait(self.poll_seconds)
+
+    def run(self, forever: bool = False, schedule: Optional[str] = None) -> bool:
+        """处理账号表中待签到的账号
+
+        Args:
+            forever: 为 True 时持续轮询账号表 (每天的新周期到达 schedule 时间后开始租用)；
+                为 False 时处理完当前待签到的账号后返回
+            schedule: forever 模式下每日开始签到的时间，默认读取配置 schedule
+
+        Returns:
+            本进程签到的账号是否全部成功
+        """
+        opens_at = None
+        if forever:
+            from config_model import parse_schedule
+            hour, minute = parse_schedule(schedule or self.config.get('schedule', '0 8 * * *'))
+            opens_at = lambda: datetime.now().replace(hour=hour, minute=minute, second=0, microsecond=0)  # noqa: E731
+
+        self.logger.info(
+            f"协调者模式 worker {self.worker_id} 启动: 账号表 {self.store.describe()}，"
+            f"{self.slots} 个并发槽，租期 {self.ttl}s"
+        )
+        slot_ids = [self.worker_id] if self.slots == 1 else [f"{self.worker_id}/{i}" for i in range(self.slots)]
+        threads = [threading.Thread(target=self._slot_loop, args=(slot_id, forever, opens_at),
+                                    name=f"slot-{i}") for i, slot_id in enumerate(slot_ids)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        succeeded = sum(1 for ok in self.results.values() if ok)
+        self.logger.info(f"worker {self.worker_id} 结束: 签到 {len(self.results)} 个账号，成功 {succeeded} 个")
+        return succeeded == len(self.results)
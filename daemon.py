@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+常驻运行模块
+在一个长期运行的进程内按计划执行签到，并在两次签到之间
+以不启动浏览器的方式定期刷新会话，让定时签到尽量走快速的 cookie 登录。
+配置文件修改后自动重新加载，签到时间、超时和账号列表无需重启即可生效
+"""
+
+import signal
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from config_model import ConfigWatcher, diff_config, parse_schedule, pin_restart_fields
+from hitun_checkin import HitunCheckin, load_config, resolve_account_name
+from http_session import earliest_expiry
+from run_history import percentile
+from storage import load_json, save_json
+
+
+def next_run_time(hour: int, minute: int, now: Optional[datetime] = None) -> datetime:
+    """计算下一次执行时间"""
+    now = now or datetime.now()
+    target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if target <= now:
+        target += timedelta(days=1)
+    return target
+
+
+class CheckinDaemon:
+    """常驻签到进程
+
+    所有账号的签到实例常驻内存，签到和会话保活都在同一个线程池中执行，
+    同一账号的签到与保活互斥。配置文件变化时 (或收到 SIGHUP) 重新加载，
+    只更新受影响的部分: 未变化的账号实例原样保留，正在签到的账号等本次运行结束后再换用新配置。
+    """
+
+    # 调度循环的检查间隔 (秒)
+    TICK_SECONDS = 30
+
+    def __init__(self, config_path: str, schedule: Optional[str] = None, run_on_start: bool = False):
+        """初始化常驻进程
+
+        Args:
+            config_path: 配置文件路径
+            schedule: 每日签到时间，默认读取配置中的 schedule
+            run_on_start: 启动时是否立即签到一次
+        """
+        self.config_path = config_path
+        self.config = load_config(config_path)
+        accounts = self.config.get('accounts') or [None]
+        self.checkins: Dict[str, HitunCheckin] = {}
+        for account in accounts:
+            checkin = HitunCheckin(config_path, account=account)
+            self.checkins[checkin.account_name] = checkin
+        self.logger = next(iter(self.checkins.values())).logger
+
+        # 命令行指定的签到时间优先于配置文件，热加载时不覆盖
+        self.schedule_override = schedule
+        self.hour, self.minute = parse_schedule(schedule or self.config.get('schedule', '0 8 * * *'))
+        self.run_on_start = run_on_start
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.config.get('daemon_workers', 1), thread_name_prefix='checkin'
+        )
+        self._locks = {name: threading.Lock() for name in self.checkins}
+        self._stop = threading.Event()
+        self._last_refresh = {name: time.time() for name in self.checkins}
+        self.next_checkin = next_run_time(self.hour, self.minute)
+        self.stats_path = Path(self.config.get('data_dir', 'data')) / 'keepalive_stats.json'
+        # 各账号最近一次签到的结果，供控制接口查询
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.api = None
+        # 保护账号表与配置，热加载与调度循环互斥
+        self._state_lock = threading.RLock()
+        # 正在签到/保活的账号在本次运行结束后再应用的新配置: 账号 -> (配置, 账号配置)
+        self._pending_config: Dict[str, tuple] = {}
+        self.watcher: Optional[ConfigWatcher] = None
+
+    def submit_checkin(self, name: str) -> Future:
+        """把某个账号的签到提交到线程池"""
+        return self.executor.submit(self._run_checkin, name)
+
+    def submit_all(self):
+        """为所有账号提交签到"""
+        for name in self.checkins:
+            self.submit_checkin(name)
+
+    def trigger(self, name: str) -> Optional[Future]:
+        """按需触发签到，账号正在签到或保活时返回 None"""
+        lock = self._locks.get(name)
+        if lock is None or lock.locked():
+            return None
+        return self.submit_checkin(name)
+
+    def accounts(self) -> Dict[str, HitunCheckin]:
+        """账号表的快照 (热加载可能同时替换账号表)"""
+        with self._state_lock:
+            return dict(self.checkins)
+
+    def last_result(self, name: str) -> Optional[Dict[str, Any]]:
+        """账号最近一次签到的结果，没有时返回 None"""
+        with self._state_lock:
+            return self.results.get(name)
+
+    def status(self) -> Dict[str, Any]:
+        """各账号最近一次签到结果与下次签到时间"""
+        with self._state_lock:
+            return {
+                'next_checkin': self.next_checkin.isoformat(timespec='seconds'),
+                'accounts': {
+                    name: {'running': self._locks[name].locked(), 'last_result': self.results.get(name),
+                           'proxy': self.checkins[name].proxy}
+                    for name in self.checkins
+                },
+            }
+
+    def _run_checkin(self, name: str) -> bool:
+        with self._state_lock:
+            checkin, lock = self.checkins.get(name), self._locks.get(name)
+        if checkin is None:
+            # 提交后账号已从配置中移除
+            return False
+        with lock:
+            started = time.time()
+            success = False
+            try:
+                success = checkin.run()
+            finally:
+                self._last_refresh[name] = time.time()
+                result = {
+                    'success': success,
+                    'started': datetime.fromtimestamp(started).isoformat(timespec='seconds'),
+                    'duration': round(time.time() - started, 1),
+                    'traffic': checkin.last_traffic,
+                    'login_method': checkin.login_method,
+                    'failure': list(checkin.last_failure) if checkin.last_failure and not success else None,
+                    'phases': checkin.last_phases,
+                }
+                with self._state_lock:
+                    if self.checkins.get(name) is checkin:
+                        self.results[name] = result
+                self._apply_pending(name, checkin)
+        self._record_login(name, checkin)
+        return success
+
+    def _refresh(self, name: str):
+        """执行一次会话保活 (账号正在签到时跳过)"""
+        with self._state_lock:
+            checkin, lock = self.checkins.get(name), self._locks.get(name)
+        if checkin is None or not lock.acquire(blocking=False):
+            return
+        try:
+            ok, elapsed = checkin.refresh_session()
+        finally:
+            self._apply_pending(name, checkin)
+            lock.release()
+        stats = self._update_stats(name, refreshes=1, refresh_failures=0 if ok else 1,
+                                   refresh_seconds=elapsed)
+        self.logger.info(
+            f"[{name}] 保活累计 {stats['refreshes']} 次 (失败 {stats['refresh_failures']} 次)，"
+            f"耗时 {stats['refresh_seconds']:.1f}s"
+        )
+
+    def _record_login(self, name: str, checkin: HitunCheckin):
+        """统计签到时的登录方式，估算保活节省的登录时间"""
+        if checkin.login_method == 'cookie':
+            saved = 0.0
+            password_p50 = percentile(checkin.history.durations('password_login'), 50)
+            cookie_p50 = percentile(checkin.history.durations('cookie_login'), 50)
+            if password_p50 is not None and cookie_p50 is not None:
+                saved = max(password_p50 - cookie_p50, 0.0)
+            stats = self._update_stats(name, cookie_logins=1, saved_seconds=saved)
+        elif checkin.login_method == 'password':
+            stats = self._update_stats(name, password_logins=1)
+        else:
+            return
+        self.logger.info(
+            f"[{name}] cookie 登录 {stats['cookie_logins']} 次 / 密码登录 {stats['password_logins']} 次，"
+            f"保活耗时 {stats['refresh_seconds']:.1f}s，预计节省登录 {stats['saved_seconds']:.1f}s"
+        )
+
+    def _update_stats(self, name: str, **increments) -> Dict[str, float]:
+        """累加保活统计并写入文件"""
+        all_stats = load_json(self.stats_path, {})
+        stats = all_stats.setdefault(name, {})
+        for key in ('refreshes', 'refresh_failures', 'refresh_seconds',
+                    'cookie_logins', 'password_logins', 'saved_seconds'):
+            stats[key] = round(stats.get(key, 0) + increments.get(key, 0), 3)
+        try:
+            save_json(self.stats_path, all_stats)
+        except Exception as e:
+            self.logger.warning(f"保存保活统计失败: {e}")
+        return stats
+
+    def _keepalive_due(self, name: str, now: float) -> bool:
+        """判断账号是否需要保活
+
+        满足任一条件即刷新: 距上次刷新超过保活间隔；临近下次签到；会话 cookie 即将过期。
+        两次刷新之间至少间隔 keepalive_lead_minutes，避免频繁请求。
+        """
+        interval = self.config.get('keepalive_interval_hours', 6) * 3600
+        lead = self.config.get('keepalive_lead_minutes', 30) * 60
+        since_last = now - self._last_refresh[name]
+        if since_last >= interval:
+            return True
+        if since_last < lead:
+            return False
+        if 0 <= self.next_checkin.timestamp() - now <= lead:
+            return True
+        cookies = self.checkins[name]._peek_cookies()
+        expiry = earliest_expiry(cookies) if cookies else None
+        return expiry is not None and expiry - now <= lead
+
+    def _apply_pending(self, name: str, checkin: HitunCheckin):
+        """应用账号运行期间到达的新配置 (调用方持有该账号的锁)"""
+        with self._state_lock:
+            pending = self._pending_config.pop(name, None)
+        if pending:
+            checkin.apply_config(*pending)
+            self.logger.info(f"[{name}] 本次运行结束，已应用新配置")
+
+    def reload_config(self) -> bool:
+        """重新加载配置文件
+
+        新配置校验失败时继续使用当前配置。校验通过后在状态锁内一次性切换:
+        签到时间、线程池大小、各账号实例的配置与账号列表；空闲账号立即换用新配置，
+        正在运行的账号等运行结束后再换用；需要重启才能生效的配置项沿用旧值并给出提示。
+
+        Returns:
+            新配置是否加载成功
+        """
+        try:
+            config = load_config(self.config_path)
+        except (OSError, ValueError) as e:
+            self.logger.error(f"重新加载配置失败，继续使用当前配置: {e}")
+            return False
+
+        with self._state_lock:
+            config, pinned = pin_restart_fields(self.config, config)
+            if pinned:
+                self.logger.warning(f"以下配置项需要重启常驻进程才能生效: {', '.join(pinned)}")
+            changed = diff_config(self.config, config)
+            accounts = {resolve_account_name(account): account for account in (config.get('accounts') or [None])}
+            old_accounts = {name: checkin.account for name, checkin in self.checkins.items()}
+            added = [name for name in accounts if name not in self.checkins]
+            removed = [name for name in self.checkins if name not in accounts]
+            modified = [name for name in accounts if name in old_accounts and accounts[name] != old_accounts[name]]
+            if not (changed or added or removed or modified):
+                self.logger.info("配置文件已变化，但生效的配置没有变化")
+                return True
+
+            old_config, self.config = self.config, config
+            self._apply_schedule(old_config)
+            if config.get('daemon_workers', 1) != old_config.get('daemon_workers', 1):
+                self._resize_executor(config.get('daemon_workers', 1))
+
+            for name in removed:
+                self._remove_account(name)
+            for name in added:
+                self._add_account(name, accounts[name])
+            # 全局配置有变化时所有账号都要换用新配置，否则只更新账号配置有变化的账号
+            for name in (list(accounts) if changed else modified):
+                if name not in added:
+                    self._update_account(name, accounts[name])
+
+        self.logger.info(
+            f"配置已重新加载: 变更 {changed or '无'}，新增账号 {added or '无'}，"
+            f"移除账号 {removed or '无'}，账号配置变更 {modified or '无'}"
+        )
+        return True
+
+    def _apply_schedule(self, old_config: Dict[str, Any]):
+        if self.schedule_override:
+            return
+        schedule = self.config.get('schedule', '0 8 * * *')
+        if schedule == old_config.get('schedule', '0 8 * * *'):
+            return
+        self.hour, self.minute = parse_schedule(schedule)
+        self.next_checkin = next_run_time(self.hour, self.minute)
+        self.logger.info(
+            f"签到时间改为每天 {self.hour:02d}:{self.minute:02d}，"
+            f"下次签到时间: {self.next_checkin.strftime('%Y-%m-%d %H:%M:%S')}"
+        )
+
+    def _resize_executor(self, workers: int):
+        """换用新大小的线程池，旧线程池中已提交的任务照常执行完"""
+        old = self.executor
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='checkin')
+        old.shutdown(wait=False)
+        self.logger.info(f"线程池大小改为 {workers}")
+
+    def _add_account(self, name: str, account: Optional[Dict[str, Any]]):
+        checkin = HitunCheckin(self.config_path, account=account)
+        # 构造时会再读一次配置文件，统一换用本次校验过的配置
+        checkin.apply_config(self.config, account)
+        self.checkins[name] = checkin
+        self._locks[name] = threading.Lock()
+        self._last_refresh[name] = time.time()
+
+    def _remove_account(self, name: str):
+        """移除账号；正在运行的签到持有实例引用，会照常完成"""
+        del self.checkins[name]
+        del self._locks[name]
+        self._last_refresh.pop(name, None)
+        self._pending_config.pop(name, None)
+        self.results.pop(name, None)
+
+    def _update_account(self, name: str, account: Optional[Dict[str, Any]]):
+        lock = self._locks[name]
+        if lock.acquire(blocking=False):
+            try:
+                self.checkins[name].apply_config(self.config, account)
+            finally:
+                lock.release()
+        else:
+            self._pending_config[name] = (self.config, account)
+            self.logger.info(f"[{name}] 正在运行，本次运行结束后应用新配置")
+
+    def stop(self, *_):
+        """请求停止调度循环"""
+        self._stop.set()
+
+    def run_forever(self):
+        """进入调度循环，直到收到停止信号"""
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        interval = self.config.get('config_reload_seconds', 5)
+        if interval:
+            self.watcher = ConfigWatcher(self.config_path, self.reload_config, interval=interval)
+            self.watcher.start()
+            if hasattr(signal, 'SIGHUP'):
+                signal.signal(signal.SIGHUP, lambda *_: self.watcher.poke())
+
+        self.logger.info(
+            f"常驻模式启动: {len(self.checkins)} 个账号，每天 {self.hour:02d}:{self.minute:02d} 签到"
+        )
+        if self.config.get('control_api'):
+            from control_api import ControlAPI
+            self.api = ControlAPI(self, self.config['control_api'],
+                                  token=self.config.get('control_api_token') or None, logger=self.logger)
+            self.api.start()
+        if self.run_on_start:
+            self.logger.info("启动时执行一次签到...")
+            self.submit_all()
+        self.logger.info(f"下次签到时间: {self.next_checkin.strftime('%Y-%m-%d %H:%M:%S')}")
+
+        while not self._stop.is_set():
+            self.tick()
+            self._stop.wait(self.TICK_SECONDS)
+
+        self.logger.info("常驻模式停止，等待进行中的任务完成...")
+        if self.watcher:
+            self.watcher.stop()
+        if self.api:
+            self.api.stop()
+        self.executor.shutdown(wait=True)
+
+    def tick(self):
+        """调度循环的一次检查: 到点签到、按需保活"""
+        with self._state_lock:
+            if datetime.now() >= self.next_checkin:
+                self.logger.info("定时签到触发")
+                self.submit_all()
+                self.next_checkin = next_run_time(self.hour, self.minute)
+                self.logger.info(f"下次签到时间: {self.next_checkin.strftime('%Y-%m-%d %H:%M:%S')}")
+
+            if self.config.get('keepalive', True):
+                now = time.time()
+                for name in self.checkins:
+                    if self._keepalive_due(name, now):
+                        self._last_refresh[name] = now
+                        self.executor.submit(self._refresh, name)
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+整体运行时限模块
+一次 run() 的所有等待 (页面加载及其重试、Cloudflare 挑战、元素等待、两次尝试之间的间隔)
+都从同一个时间预算中扣除，预算用完时中止运行并记录耗尽预算的阶段，避免恶劣网络下单次运行
+拖到与下一次定时任务重叠。
+"""
+
+import time
+from typing import Callable, Optional
+
+# 阶段名称，用于日志和失败通知
+PHASE_LABELS = {
+    'page_load': '页面加载',
+    'cloudflare': 'Cloudflare 验证',
+    'element': '等待页面元素',
+    'retry_delay': '重试等待',
+    'http_checkin': 'HTTP 签到',
+    'login': '登录',
+    'checkin': '签到',
+}
+
+
+class DeadlineExceeded(Exception):
+    """运行时限已用完"""
+
+    def __init__(self, phase: str, seconds: float):
+        self.phase = phase
+        self.seconds = seconds
+        super().__init__(f"超过整体运行时限 {seconds:.0f}s (耗尽于{PHASE_LABELS.get(phase, phase)})")
+
+
+class RunDeadline:
+    """一次运行的时间预算"""
+
+    def __init__(self, seconds: Optional[float], clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            seconds: 预算秒数，None 或 0 表示不限制
+            clock: 单调时钟 (场景测试中替换为虚拟时钟)
+        """
+        self.seconds = seconds or None
+        self.clock = clock
+        self.started = clock()
+        # 预算耗尽时所处的阶段
+        self.exhausted_phase: Optional[str] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.seconds is not None
+
+    def remaining(self) -> float:
+        """剩余秒数，不限制时为无穷大"""
+        if self.seconds is None:
+            return float('inf')
+        return max(self.seconds - (self.clock() - self.started), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def exhaust(self, phase: str) -> DeadlineExceeded:
+        """标记预算已用完，返回对应的异常"""
+        # 只记录第一个发现预算用完的阶段；各阶段在被截短的等待结束后立即检查，因此就是耗尽预算的阶段
+        if self.exhausted_phase is None:
+            self.exhausted_phase = phase
+        return DeadlineExceeded(self.exhausted_phase, self.seconds)
+
+    def check(self, phase: str):
+        """预算已用完时抛出 DeadlineExceeded"""
+        if self.expired:
+            raise self.exhaust(phase)
+
+    def cap(self, seconds: float, phase: str) -> float:
+        """把某个阶段的等待时间限制在剩余预算内
+
+        Args:
+            seconds: 阶段原本的等待/超时时间
+            phase: 阶段名称，见 PHASE_LABELS
+
+        Returns:
+            可用的等待时间；预算已用完时抛出 DeadlineExceeded
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise self.exhaust(phase)
+        return min(seconds, remaining)
+
+    def describe(self) -> str:
+        """失败通知中的说明"""
+        phase = self.exhausted_phase
+        return f"超过整体运行时限 {self.seconds:.0f}s，预算耗尽于: {PHASE_LABELS.get(phase, phase or '未知阶段')}"
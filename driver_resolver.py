@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+浏览器与驱动定位模块
+首次运行时探测已安装的 Chromium 版本并选出匹配的 chromedriver，结果缓存在 data_dir；
+后续运行只比较文件大小和修改时间，缓存有效时不执行任何子进程，也不访问网络。
+只有缓存的驱动缺失或与浏览器主版本不匹配时才会重新探测，必要时才下载驱动。
+"""
+
+import logging
+import os
+import re
+import shutil
+import subprocess
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from storage import load_json, save_json
+
+# 按优先级查找的浏览器可执行文件
+BROWSER_CANDIDATES = [
+    '/usr/bin/chromium',
+    '/usr/bin/chromium-browser',
+    '/usr/bin/google-chrome-stable',
+    '/usr/bin/google-chrome',
+]
+BROWSER_NAMES = ['chromium', 'chromium-browser', 'google-chrome-stable', 'google-chrome']
+
+# 系统自带的 chromedriver 位置
+DRIVER_CANDIDATES = [
+    '/usr/bin/chromedriver',
+    '/usr/lib/chromium/chromedriver',
+    '/usr/lib/chromium-browser/chromedriver',
+]
+
+VERSION_PATTERN = re.compile(r'(\d+\.\d+\.\d+(?:\.\d+)?)')
+
+
+def file_signature(path: Optional[str]) -> Optional[List[int]]:
+    """文件的 [大小, 修改时间]，用于廉价地判断二进制是否被替换"""
+    if not path:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, int(stat.st_mtime)]
+
+
+def binary_version(path: str, timeout: float = 10) -> Optional[str]:
+    """执行 `<path> --version` 读取版本号"""
+    try:
+        output = subprocess.run(
+            [path, '--version'], capture_output=True, text=True, timeout=timeout
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = VERSION_PATTERN.search(output)
+    return match.group(1) if match else None
+
+
+def major_version(version: Optional[str]) -> str:
+    """主版本号，未知时返回空字符串"""
+    return version.split('.')[0] if version else ''
+
+
+class DriverResolver:
+    """定位浏览器和与之匹配的 chromedriver"""
+
+    def __init__(self, cache_path: Path, browser_path: Optional[str] = None,
+                 driver_path: Optional[str] = None, allow_download: bool = True,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            cache_path: 缓存文件路径
+            browser_path: 配置指定的浏览器路径，默认自动查找
+            driver_path: 配置指定的驱动路径，默认自动查找
+            allow_download: 找不到匹配的驱动时是否允许通过 webdriver-manager 下载
+            logger: 日志记录器
+        """
+        self.cache_path = Path(cache_path)
+        self.browser_override = browser_path
+        self.driver_override = driver_path
+        self.allow_download = allow_download
+        self.logger = logger or logging.getLogger('HitunCheckin')
+
+    def resolve(self) -> Dict[str, Any]:
+        """返回 browser_path / browser_version / driver_path / driver_version
+
+        路径为 None 表示未找到，由调用方交给 Selenium/uc 自行处理。
+        """
+        cached = load_json(self.cache_path, {})
+        if self._is_valid(cached):
+            self.logger.debug(
+                f"使用缓存的浏览器 {cached['browser_path']} ({cached.get('browser_version')})，"
+                f"驱动 {cached.get('driver_path')}"
+            )
+            return cached
+
+        resolved = self._probe(cached.get('driver_path'))
+        try:
+            save_json(self.cache_path, resolved)
+        except OSError as e:
+            self.logger.warning(f"保存驱动缓存失败: {e}")
+        return resolved
+
+    def _is_valid(self, cached: Dict[str, Any]) -> bool:
+        """缓存的路径与配置一致且二进制未被替换"""
+        if not cached.get('browser_path') or not cached.get('driver_path'):
+            return False
+        if self.browser_override and cached['browser_path'] != self.browser_override:
+            return False
+        if self.driver_override and cached['driver_path'] != self.driver_override:
+            return False
+        return (file_signature(cached['browser_path']) == cached.get('browser_signature')
+                and file_signature(cached['driver_path']) == cached.get('driver_signature'))
+
+    def _find_browser(self) -> Optional[str]:
+        if self.browser_override:
+            return self.browser_override
+        for candidate in BROWSER_CANDIDATES:
+            if os.path.exists(candidate):
+                return candidate
+        for name in BROWSER_NAMES:
+            found = shutil.which(name)
+            if found:
+                return found
+        return None
+
+    def _probe(self, previous_driver: Optional[str]) -> Dict[str, Any]:
+        """探测浏览器版本并选出主版本匹配的驱动"""
+        browser_path = self._find_browser()
+        browser_version = binary_version(browser_path) if browser_path else None
+        self.logger.info(f"探测到浏览器: {browser_path or '未找到'} ({browser_version or '版本未知'})")
+
+        if self.driver_override:
+            candidates = [self.driver_override]
+        else:
+            # 之前下载过的驱动排在系统驱动之后，避免重复下载
+            candidates = DRIVER_CANDIDATES + ([previous_driver] if previous_driver else [])
+            found = shutil.which('chromedriver')
+            if found and found not in candidates:
+                candidates.insert(len(DRIVER_CANDIDATES), found)
+
+        driver_path = driver_version = None
+        for candidate in candidates:
+            if not os.path.exists(candidate):
+                continue
+            version = binary_version(candidate)
+            if not browser_version or major_version(version) == major_version(browser_version):
+                driver_path, driver_version = candidate, version
+                break
+            self.logger.info(f"驱动 {candidate} ({version}) 与浏览器主版本不匹配，跳过")
+
+        if not driver_path and self.allow_download and not self.driver_override:
+            driver_path, driver_version = self._download()
+
+        if driver_path:
+            self.logger.info(f"使用驱动: {driver_path} ({driver_version or '版本未知'})")
+        else:
+            self.logger.warning("未找到匹配的 chromedriver，交由 WebDriver 自行查找")
+
+        return {
+            'browser_path': browser_path,
+            'browser_version': browser_version,
+            'browser_signature': file_signature(browser_path),
+            'driver_path': driver_path,
+            'driver_version': driver_version,
+            'driver_signature': file_signature(driver_path),
+            'resolved_at': datetime.now().isoformat(timespec='seconds'),
+        }
+
+    def _download(self) -> tuple:
+        """通过 webdriver-manager 下载驱动 (需要网络)"""
+        self.logger.info("本地没有匹配的 chromedriver，尝试下载...")
+        try:
+            from webdriver_manager.chrome import ChromeDriverManager
+            path = ChromeDriverManager().install()
+        except Exception as e:
+            self.logger.warning(f"下载 chromedriver 失败: {e}")
+            return None, None
+        return path, binary_version(path)
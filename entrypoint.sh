@@ -44,7 +44,7 @@ CRON_SCHEDULE=${CRON_SCHEDULE:-"0 8 * * *"}
 log "=========================================="
 log "Hitun.io 自动签到 Docker 容器"
 log "运行模式: ${RUN_MODE}"
-if [ "$RUN_MODE" = "cron" ]; then
+if [ "$RUN_MODE" = "cron" ] || [ "$RUN_MODE" = "daemon" ] || [ "$RUN_MODE" = "worker" ]; then
     log "定时任务: ${CRON_SCHEDULE}"
 fi
 log "=========================================="
@@ -113,6 +113,26 @@ case "$RUN_MODE" in
         done
         ;;
 
+    "daemon")
+        # 常驻模式 - 进程内调度签到，并在两次签到之间保持会话活跃
+        RUN_ON_START_FLAG=""
+        if [ "${RUN_ON_START:-false}" = "true" ]; then
+            RUN_ON_START_FLAG="--run-on-start"
+        fi
+        cd /app && exec python hitun_checkin.py --config /app/data/config.json --daemon \
+            --schedule "${CRON_SCHEDULE}" ${RUN_ON_START_FLAG}
+        ;;
+
+    "worker")
+        # 协调者模式 - 从共享账号表租用账号签到，可在多个容器中同时运行
+        if [ "${SEED_ACCOUNTS:-false}" = "true" ]; then
+            log "写入账号表..."
+            cd /app && python hitun_checkin.py --config /app/data/config.json --seed-accounts
+        fi
+        cd /app && exec python hitun_checkin.py --config /app/data/config.json --worker --worker-loop \
+            --schedule "${CRON_SCHEDULE}"
+        ;;
+
     "test")
         # 测试模式 - 仅测试登录
         log "执行登录测试..."
@@ -121,7 +141,7 @@ case "$RUN_MODE" in
 
     *)
         error "未知运行模式: ${RUN_MODE}"
-        error "支持的模式: once, cron, test"
+        error "支持的模式: once, cron, daemon, worker, test"
         exit 1
         ;;
 esac
@@ -0,0 +1,622 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+进程内假 WebDriver
+用脚本化的假站点模拟 hitun.io 的登录页、用户页、签到按钮、弹窗和 Cloudflare 挑战，
+配合虚拟时钟让 time.sleep 和各种超时瞬间完成，
+无需真实 Chrome 和网络即可快速、确定地验证 login()/checkin()/run() 流程
+"""
+
+import re
+import types
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+from selenium.common.exceptions import (
+    InvalidCookieDomainException,
+    NoSuchElementException,
+    NoSuchWindowException,
+    TimeoutException,
+    WebDriverException,
+)
+from selenium.webdriver.common.by import By
+
+FAKE_PNG = b'\x89PNG\r\n\x1a\n' + b'\x00' * 16
+
+
+class VirtualClock:
+    """虚拟时钟: sleep 只推进虚拟时间，不真正等待"""
+
+    def __init__(self, start: float = 1_700_000_000.0):
+        self.now = start
+        self.slept = 0.0
+
+    def time(self) -> float:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+    perf_counter = monotonic
+
+    def sleep(self, seconds: float):
+        seconds = max(seconds, 0)
+        self.now += seconds
+        self.slept += seconds
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+    @contextmanager
+    def install(self, *modules):
+        """把给定模块中的 time 引用替换为虚拟时钟
+
+        默认替换 hitun_checkin 和 selenium 的 WebDriverWait 使用的 time 模块。
+        """
+        import hitun_checkin
+        from selenium.webdriver.support import wait as selenium_wait
+
+        targets = list(modules) or [hitun_checkin, selenium_wait]
+        fake_time = types.SimpleNamespace(
+            time=self.time, monotonic=self.monotonic, perf_counter=self.perf_counter, sleep=self.sleep
+        )
+        originals = [(module, module.time) for module in targets]
+        try:
+            for module in targets:
+                module.time = fake_time
+            yield self
+        finally:
+            for module, original in originals:
+                module.time = original
+
+
+class FakeElement:
+    """假页面元素"""
+
+    def __init__(self, driver: 'FakeDriver', tag: str, text: str = '', attrs: Optional[Dict[str, str]] = None,
+                 displayed: bool = True, enabled: bool = True, on_click: Optional[Callable[[], None]] = None):
+        self.driver = driver
+        self.tag_name = tag
+        self.text = text
+        self.attrs = attrs or {}
+        self._displayed = displayed
+        self._enabled = enabled
+        self._on_click = on_click
+
+    def get_attribute(self, name: str) -> Optional[str]:
+        if name == 'value':
+            return self.driver.form_values.get(self.attrs.get('id', ''), '')
+        return self.attrs.get(name)
+
+    def is_displayed(self) -> bool:
+        return self._displayed
+
+    def is_enabled(self) -> bool:
+        return self._enabled
+
+    def clear(self):
+        self.driver.form_values[self.attrs.get('id', '')] = ''
+
+    def send_keys(self, *values: str):
+        key = self.attrs.get('id', '')
+        self.driver.form_values[key] = self.driver.form_values.get(key, '') + ''.join(values)
+
+    def click(self):
+        self.driver.clicks.append(self.attrs.get('id') or self.text)
+        if self._on_click:
+            self._on_click()
+
+    def submit(self):
+        self.driver.site.submit_login(self.driver)
+
+    def find_element(self, by: str, value: str) -> 'FakeElement':
+        return self.driver.find_element(by, value)
+
+    def find_elements(self, by: str, value: str) -> List['FakeElement']:
+        return self.driver.find_elements(by, value)
+
+
+_XPATH_RE = re.compile(r"^//(\w+|\*)\[(.+)\]$")
+_CONDITION_RES = [
+    (re.compile(r"^contains\(text\(\),\s*'([^']*)'\)$"), lambda el, v: v in el.text),
+    (re.compile(r"^contains\(@([\w-]+),\s*'([^']*)'\)$"), lambda el, a, v: v in (el.attrs.get(a) or '')),
+    (re.compile(r"^@([\w-]+)='([^']*)'$"), lambda el, a, v: el.attrs.get(a) == v),
+]
+
+
+def _xpath_matcher(expression: str) -> Callable[[FakeElement], bool]:
+    """解析签到流程中用到的简单 XPath: //tag[条件 or 条件 ...]"""
+    match = _XPATH_RE.match(expression.strip())
+    if not match:
+        raise WebDriverException(f"FakeDriver 不支持的 XPath: {expression}")
+    tag, body = match.groups()
+    predicates = []
+    for condition in re.split(r'\s+or\s+', body):
+        for pattern, check in _CONDITION_RES:
+            found = pattern.match(condition.strip())
+            if found:
+                predicates.append((check, found.groups()))
+                break
+        else:
+            raise WebDriverException(f"FakeDriver 不支持的 XPath 条件: {condition}")
+
+    def matcher(element: FakeElement) -> bool:
+        if tag != '*' and element.tag_name != tag:
+            return False
+        return any(check(element, *args) for check, args in predicates)
+
+    return matcher
+
+
+class _SwitchTo:
+    def __init__(self, driver: 'FakeDriver'):
+        self._driver = driver
+
+    def window(self, handle: str):
+        if handle not in self._driver.windows:
+            raise NoSuchWindowException(f"no such window: {handle}")
+        self._driver.current_window_handle = handle
+
+
+class FakeDriver:
+    """实现签到流程用到的 WebDriver 接口子集
+
+    每个窗口(浏览器上下文)有独立的 cookie 罐和当前地址，
+    支持 Target.createBrowserContext / createTarget / disposeBrowserContext 以模拟共享浏览器，
+    浏览器上下文可以有自己的代理 (proxyServer)。
+    """
+
+    def __init__(self, site: 'FakeSite', proxy: Optional[str] = None):
+        self.site = site
+        self.clock = site.clock
+        # 启动参数中的代理 (--proxy-server)
+        self.proxy = proxy
+        # 浏览器上下文 -> 代理
+        self.context_proxies: Dict[str, Optional[str]] = {}
+        self.capabilities = {'browserName': 'chrome', 'browserVersion': site.browser_version}
+        self.user_agent = (
+            f"Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) "
+            f"HeadlessChrome/{site.browser_version} Safari/537.36"
+        )
+        self.windows: Dict[str, Dict[str, Any]] = {}
+        self._window_seq = 0
+        self.current_window_handle = self._new_window()
+        self.switch_to = _SwitchTo(self)
+        self.form_values: Dict[str, str] = {}
+        self.clicks: List[str] = []
+        self.cdp_commands: List[tuple] = []
+        self.scripts: List[str] = []
+        self.page_load_timeout: Optional[float] = None
+        self.quit_called = False
+
+    # ---- 窗口与 cookie 罐 ----
+
+    def _new_window(self, context_id: str = 'default') -> str:
+        self._window_seq += 1
+        handle = f"target-{self._window_seq}"
+        self.windows[handle] = {'url': 'about:blank', 'cookies': {}, 'context': context_id, 'state': {}}
+        return handle
+
+    @property
+    def _window(self) -> Dict[str, Any]:
+        return self.windows[self.current_window_handle]
+
+    @property
+    def window_proxy(self) -> Optional[str]:
+        """当前窗口使用的代理"""
+        return self.context_proxies.get(self._window['context'], self.proxy)
+
+    @property
+    def window_state(self) -> Dict[str, Any]:
+        """当前窗口的页面状态 (弹窗、挑战开始时间等)"""
+        return self._window['state']
+
+    @property
+    def cookies(self) -> Dict[str, Dict[str, Any]]:
+        return self._window['cookies']
+
+    def add_cookie(self, cookie: Dict[str, Any]):
+        if self.current_url == 'about:blank':
+            raise InvalidCookieDomainException("invalid cookie domain")
+        self.cookies[cookie['name']] = dict(cookie)
+
+    def get_cookies(self) -> List[Dict[str, Any]]:
+        return [dict(cookie) for cookie in self.cookies.values()]
+
+    def get_cookie(self, name: str) -> Optional[Dict[str, Any]]:
+        return self.cookies.get(name)
+
+    def delete_all_cookies(self):
+        self.cookies.clear()
+
+    # ---- 导航与页面 ----
+
+    @property
+    def current_url(self) -> str:
+        return self._window['url']
+
+    @current_url.setter
+    def current_url(self, url: str):
+        self._window['url'] = url
+
+    @property
+    def path(self) -> str:
+        return urlparse(self.current_url).path or '/'
+
+    def set_page_load_timeout(self, seconds: float):
+        self.page_load_timeout = seconds
+
+    def get(self, url: str):
+        self.site.navigate(self, url)
+
+    def refresh(self):
+        self.site.navigate(self, self.current_url)
+
+    @property
+    def title(self) -> str:
+        return self.site.render(self)['title']
+
+    @property
+    def page_source(self) -> str:
+        return self.site.render(self)['source']
+
+    def _elements(self) -> List[FakeElement]:
+        return self.site.render(self)['elements']
+
+    def find_elements(self, by: str, value: str) -> List[FakeElement]:
+        elements = self._elements()
+        if by == By.ID:
+            return [el for el in elements if el.attrs.get('id') == value]
+        if by == By.CLASS_NAME:
+            return [el for el in elements if value in (el.attrs.get('class') or '').split()]
+        if by == By.TAG_NAME:
+            return [el for el in elements if el.tag_name == value]
+        if by == By.XPATH:
+            matcher = _xpath_matcher(value)
+            return [el for el in elements if matcher(el)]
+        if by == By.CSS_SELECTOR and value.startswith('#'):
+            return [el for el in elements if el.attrs.get('id') == value[1:]]
+        raise WebDriverException(f"FakeDriver 不支持的定位方式: {by}")
+
+    def find_element(self, by: str, value: str) -> FakeElement:
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f"no such element: {by}={value}")
+        return elements[0]
+
+    # ---- 脚本、CDP 与截图 ----
+
+    def execute_script(self, script: str, *args) -> Any:
+        self.scripts.append(script)
+        return self.site.execute_script(self, script, args)
+
+    def execute_cdp_cmd(self, cmd: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        self.cdp_commands.append((cmd, params))
+        if cmd == 'Emulation.setUserAgentOverride':
+            self.user_agent = params['userAgent']
+        elif cmd == 'Performance.getMetrics':
+            return {'metrics': [{'name': 'JSHeapUsedSize', 'value': 8 * 1024 * 1024},
+                                {'name': 'Nodes', 'value': 1200}]}
+        elif cmd == 'Target.createBrowserContext':
+            context_id = f"context-{self._window_seq + 1}"
+            if params.get('proxyServer'):
+                self.context_proxies[context_id] = params['proxyServer']
+            return {'browserContextId': context_id}
+        elif cmd == 'Target.createTarget':
+            return {'targetId': self._new_window(params.get('browserContextId', 'default'))}
+        elif cmd == 'Target.disposeBrowserContext':
+            for handle, window in list(self.windows.items()):
+                if window['context'] == params['browserContextId']:
+                    del self.windows[handle]
+        return {}
+
+    def get_screenshot_as_png(self) -> bytes:
+        return FAKE_PNG
+
+    def save_screenshot(self, filename: str) -> bool:
+        with open(filename, 'wb') as f:
+            f.write(FAKE_PNG)
+        return True
+
+    def quit(self):
+        self.quit_called = True
+
+
+class FakeSite:
+    """脚本化的 hitun.io 假站点
+
+    Args:
+        clock: 虚拟时钟
+        email/password: 正确的登录凭证
+        challenge_seconds: 没有有效 cf_clearance 时 Cloudflare 挑战持续的时间，None 表示无挑战，
+            float('inf') 表示挑战永不通过
+        checkin_button: 用户页是否有签到按钮
+        login_button: 登录页是否有 id 为 login 的登录按钮 (没有时只能提交表单)
+        already_checked_in: 签到按钮是否已禁用 (今天已签到)
+        welcome_popup: 登录后的欢迎弹窗样式: None / 'ok_text' / 'swal2' / 'confirm_class'
+        result_popup: 签到结果展示方式: 'swal2' / 'modal' / 'alert' / 'page' (只在页面文本中)
+        reward: 签到获得的流量文本
+        load_failures: 前若干次页面加载抛出的瞬态网络错误
+        login_redirect: 登录成功后是否跳转到用户页 (False 时停留在登录页并显示欢迎信息)
+        login_captcha: 登录页有验证码组件时，从开始填写表单到验证完成的秒数；None 表示没有验证码
+        load_time: 每次页面加载消耗的虚拟时间
+        proxies: 经由各代理访问时的表现: 代理地址 -> {'latency': 每次页面加载额外消耗的虚拟时间,
+            'challenge_seconds': 每次页面加载都出现的 Cloudflare 挑战持续时间 (出口 IP 被标记，cf_clearance 无效),
+            'down': True 表示代理无法连接}
+    """
+
+    def __init__(self, clock: Optional[VirtualClock] = None, email: str = 'user@example.com',
+                 password: str = 'secret', challenge_seconds: Optional[float] = None,
+                 checkin_button: bool = True, already_checked_in: bool = False, login_button: bool = True,
+                 welcome_popup: Optional[str] = None, result_popup: str = 'swal2',
+                 reward: str = '获得了 256MB 流量', load_failures: int = 0,
+                 login_redirect: bool = True, login_captcha: Optional[float] = None, load_time: float = 0.3,
+                 proxies: Optional[Dict[str, Dict[str, Any]]] = None,
+                 base_url: str = 'https://hitun.io', browser_version: str = '120.0.6099.71'):
+        self.clock = clock or VirtualClock()
+        self.email = email
+        self.password = password
+        self.challenge_seconds = challenge_seconds
+        self.checkin_button = checkin_button
+        self.login_button = login_button
+        self.already_checked_in = already_checked_in
+        # 已签到的会话 token，多个账号各自签到
+        self.checked_in_tokens = set()
+        self.welcome_popup = welcome_popup
+        self.result_popup = result_popup
+        self.reward = reward
+        self.load_failures = load_failures
+        self.login_redirect = login_redirect
+        self.login_captcha = login_captcha
+        self.load_time = load_time
+        self.proxies = proxies or {}
+        # 代理 (None 为直接连接) -> 页面加载次数
+        self.proxy_loads: Dict[Optional[str], int] = {}
+        self.base_url = base_url.rstrip('/')
+        self.browser_version = browser_version
+        self.domain = urlparse(self.base_url).hostname
+        self.valid_tokens = set()
+        self.drivers: List[FakeDriver] = []
+        self.page_loads = 0
+        self.logins = 0
+        self.checkins = 0
+
+    def new_driver(self, proxy: Optional[str] = None) -> FakeDriver:
+        driver = FakeDriver(self, proxy=proxy)
+        self.drivers.append(driver)
+        return driver
+
+    def issue_session(self) -> Dict[str, Any]:
+        """生成一个有效的会话 cookie (可预先写入 cookies.pkl 模拟已保存的会话)"""
+        token = f"token-{len(self.valid_tokens) + 1}"
+        self.valid_tokens.add(token)
+        return {'name': 'key', 'value': token, 'domain': f".{self.domain}", 'path': '/'}
+
+    def clearance_cookie(self) -> Dict[str, Any]:
+        return {'name': 'cf_clearance', 'value': 'clearance', 'domain': f".{self.domain}", 'path': '/'}
+
+    def expire_sessions(self):
+        self.valid_tokens.clear()
+
+    # ---- 导航 ----
+
+    def _logged_in(self, driver: FakeDriver) -> bool:
+        cookie = driver.cookies.get('key')
+        return bool(cookie and cookie['value'] in self.valid_tokens)
+
+    def navigate(self, driver: FakeDriver, url: str):
+        self.page_loads += 1
+        proxy = driver.window_proxy
+        behaviour = self.proxies.get(proxy, {}) if proxy else {}
+        self.proxy_loads[proxy] = self.proxy_loads.get(proxy, 0) + 1
+        if behaviour.get('down'):
+            self.clock.advance(self.load_time)
+            raise WebDriverException("unknown error: net::ERR_PROXY_CONNECTION_FAILED")
+        cost = self.load_time + behaviour.get('latency', 0)
+        if driver.page_load_timeout is not None and cost > driver.page_load_timeout:
+            # 与 ChromeDriver 一样，等到页面加载超时后报错
+            self.clock.advance(driver.page_load_timeout)
+            raise TimeoutException(
+                f"timeout: Timed out receiving message from renderer: {driver.page_load_timeout:.3f}")
+        self.clock.advance(cost)
+        if self.load_failures > 0:
+            self.load_failures -= 1
+            raise WebDriverException("unknown error: net::ERR_CONNECTION_CLOSED")
+
+        parsed = urlparse(url)
+        path = parsed.path or '/'
+        if path.startswith('/user') and not self._logged_in(driver):
+            path = '/auth/login'
+        driver.current_url = f"{self.base_url}{path}"
+        driver.window_state.clear()
+        driver.form_values.clear()
+        if behaviour.get('challenge_seconds') is not None:
+            driver.window_state['challenge_until'] = self.clock.now + behaviour['challenge_seconds']
+        elif self.challenge_seconds is not None and 'cf_clearance' not in driver.cookies:
+            driver.window_state['challenge_until'] = self.clock.now + self.challenge_seconds
+
+    def _challenge_active(self, driver: FakeDriver) -> bool:
+        until = driver.window_state.get('challenge_until')
+        if until is None:
+            return False
+        if self.clock.now < until:
+            return True
+        # 挑战通过: 下发 clearance，页面自动进入原始内容
+        driver.window_state.pop('challenge_until')
+        driver.cookies['cf_clearance'] = self.clearance_cookie()
+        return False
+
+    # ---- 页面渲染 ----
+
+    def render(self, driver: FakeDriver) -> Dict[str, Any]:
+        if driver.current_url == 'about:blank':
+            return {'title': '', 'source': '<html><head></head><body></body></html>', 'elements': []}
+        if self._challenge_active(driver):
+            return {
+                'title': 'Just a moment...',
+                'source': '<html><head><title>Just a moment...</title></head>'
+                          '<body><div id="cf-turnstile"></div><script>window._cf_chl_opt={}</script></body></html>',
+                'elements': [],
+            }
+        if driver.path.startswith('/auth/login'):
+            return self._render_login(driver)
+        if driver.path.startswith('/user'):
+            return self._render_user(driver)
+        return {'title': 'Hitun', 'source': '<html><body>Hitun 首页</body></html>', 'elements': []}
+
+    def _render_login(self, driver: FakeDriver) -> Dict[str, Any]:
+        state = driver.window_state
+        elements = [
+            FakeElement(driver, 'form', attrs={'id': 'login-form'}),
+            FakeElement(driver, 'input', attrs={'id': 'email', 'type': 'email'}),
+            FakeElement(driver, 'input', attrs={'id': 'passwd', 'type': 'password'}),
+        ]
+        if self.login_button:
+            elements.append(FakeElement(driver, 'button', '登录', attrs={'id': 'login', 'class': 'btn btn-primary'},
+                                        on_click=lambda: self.submit_login(driver)))
+        body = '登录 Hitun'
+        # 用 reCAPTCHA 组件: 页面中出现 turnstile 字样会被当作 Cloudflare 挑战页
+        captcha = '<div class="g-recaptcha"></div>' if self.login_captcha is not None else ''
+        if captcha:
+            elements.append(FakeElement(driver, 'div', attrs={'class': 'g-recaptcha'}))
+        if state.get('error'):
+            elements.append(FakeElement(driver, 'div', state['error'], attrs={'class': 'alert alert-danger'}))
+            body += f" {state['error']}"
+        if state.get('welcome'):
+            body += ' 欢迎回来'
+            elements.append(FakeElement(driver, 'div', '欢迎回来', attrs={'class': 'welcome'}))
+        elements.append(FakeElement(driver, 'body', body))
+        return {
+            'title': '登录 — Hitun',
+            'source': f"<html><head><title>登录</title></head><body>{body}"
+                      f"<form><input id=\"email\"><input id=\"passwd\">{captcha}<button id=\"login\">登录</button></form>"
+                      f"</body></html>",
+            'elements': elements,
+        }
+
+    def _render_user(self, driver: FakeDriver) -> Dict[str, Any]:
+        state = driver.window_state
+        elements: List[FakeElement] = []
+        body = '用户中心 剩余流量 10GB'
+
+        if state.get('welcome_popup'):
+            style = state['welcome_popup']
+            dismiss = lambda: state.pop('welcome_popup', None)
+            if style == 'ok_text':
+                elements.append(FakeElement(driver, 'button', 'OK', on_click=dismiss))
+            elif style == 'swal2':
+                elements.append(FakeElement(driver, 'button', '好的', attrs={'class': 'swal2-confirm'}, on_click=dismiss))
+            elif style == 'confirm_class':
+                elements.append(FakeElement(driver, 'button', '知道了', attrs={'class': 'btn-confirm'}, on_click=dismiss))
+
+        if self.checkin_button:
+            checked_in = self._checked_in(driver)
+            label = '今日已签到' if checked_in else '>_ 签到'
+            elements.append(FakeElement(driver, 'button', label, attrs={'id': 'checkin', 'class': 'btn'},
+                                        enabled=not checked_in,
+                                        on_click=lambda: self._do_checkin(driver)))
+            body += f" {label}"
+
+        if state.get('result'):
+            text = state['result']
+            popup_class = {
+                'swal2': 'swal2-html-container',
+                'modal': 'modal-body',
+                'alert': 'alert alert-success',
+            }.get(self.result_popup)
+            if popup_class:
+                elements.append(FakeElement(driver, 'div', text, attrs={'class': popup_class}))
+            body += f" 签到成功，{text}"
+
+        elements.append(FakeElement(driver, 'body', body))
+        return {
+            'title': '用户中心 — Hitun',
+            'source': f"<html><head><title>用户中心</title></head><body>{body}</body></html>",
+            'elements': elements,
+        }
+
+    # ---- 交互 ----
+
+    def submit_login(self, driver: FakeDriver):
+        self.logins += 1
+        email = driver.form_values.get('email', '')
+        password = driver.form_values.get('passwd', '')
+        if email != self.email or password != self.password:
+            driver.window_state['error'] = '密码错误'
+            return
+        cookie = self.issue_session()
+        driver.cookies[cookie['name']] = cookie
+        if self.login_redirect:
+            driver.current_url = f"{self.base_url}/user"
+            driver.window_state.clear()
+            if self.welcome_popup:
+                driver.window_state['welcome_popup'] = self.welcome_popup
+        else:
+            driver.window_state['welcome'] = True
+
+    def _checked_in(self, driver: FakeDriver) -> bool:
+        if self.already_checked_in:
+            return True
+        cookie = driver.cookies.get('key')
+        return bool(cookie and cookie['value'] in self.checked_in_tokens)
+
+    def _do_checkin(self, driver: FakeDriver):
+        if self._checked_in(driver):
+            return
+        self.checked_in_tokens.add(driver.cookies['key']['value'])
+        self.checkins += 1
+        driver.window_state['result'] = self.reward
+
+    def execute_script(self, driver: FakeDriver, script: str, args: tuple) -> Any:
+        if 'navigator.platform' in script:
+            return {
+                'userAgent': driver.user_agent,
+                'platform': 'Linux x86_64',
+                'languages': ['zh-CN', 'zh'],
+                'hardwareConcurrency': 4,
+                'screen': [1920, 1080],
+                'timezone': 'Asia/Shanghai',
+            }
+        if 'navigator.userAgent' in script:
+            return driver.user_agent
+        if "getEntriesByType('navigation')" in script:
+            load_ms = self.load_time * 1000
+            return {
+                'navigation': {
+                    'dns': 5, 'connect': 20, 'tls': 12, 'ttfb': load_ms * 0.4, 'response': 10,
+                    'domContentLoaded': load_ms * 0.7, 'load': load_ms,
+                    'transferSize': 18000, 'redirectCount': 0,
+                },
+                'resources': [
+                    [f"{self.base_url}/theme/app.js", 'script', 120, 90000],
+                    [f"{self.base_url}/theme/app.css", 'link', 60, 30000],
+                    [f"{self.base_url}/user/ajax_data", 'xmlhttprequest', 200, 2000],
+                ],
+            }
+        if "getElementById('passwd')" in script:
+            return self._fill_login(driver, *args)
+        if 'g-recaptcha-response' in script:
+            return self.clock.now >= driver.window_state.get('captcha_ready', float('inf'))
+        if "getElementById('login')" in script:
+            if not driver.path.startswith('/auth/login') or not self.login_button:
+                return None
+            self.submit_login(driver)
+            return 'button'
+        if 'arguments[0].click()' in script and args:
+            args[0].click()
+        elif 'arguments[0].submit()' in script:
+            self.submit_login(driver)
+        return None
+
+    def _fill_login(self, driver: FakeDriver, email: str, password: str, captcha_selector: str) -> Dict[str, Any]:
+        """快速提交脚本: 填写表单，没有验证码时直接提交"""
+        if not driver.path.startswith('/auth/login') or self._challenge_active(driver):
+            return {'fields': False}
+        driver.form_values['email'] = email
+        driver.form_values['passwd'] = password
+        if self.login_captcha is not None:
+            driver.window_state.setdefault('captcha_ready', self.clock.now + self.login_captcha)
+            return {'fields': True, 'captcha': 'g-recaptcha', 'submitted': None}
+        self.submit_login(driver)
+        return {'fields': True, 'captcha': None, 'submitted': 'button'}
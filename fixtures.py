@@ -0,0 +1,557 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+录制与回放模块
+录制: 开启 record_fixtures 后，一次真实运行中浏览器 (Chrome performance 日志 + CDP 取响应体)
+和 HTTP 会话访问站点的全部请求/响应 (HTML、XHR JSON、脚本样式、重定向、cookie 名称)
+保存为一个夹具包，邮箱、密码和 cookie 值在写入前替换掉。
+
+回放: ReplayServer 在本地按录制顺序重放夹具包，页面中的站点地址改写为本地地址，
+站点改版后可以离线对 login()/checkin() 做回归测试和基准测试。
+
+夹具包结构:
+    <包目录>/manifest.json    元数据与请求列表
+    <包目录>/bodies/NNN.ext   响应体
+
+用法:
+    python fixtures.py list logs/fixtures
+    python fixtures.py serve logs/fixtures/20261019_080001_main --port 8080
+    python fixtures.py check logs/fixtures/20261019_080001_main --runs 3
+"""
+
+import argparse
+import base64
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from storage import atomic_write_bytes, load_json, save_json
+
+FORMAT_VERSION = 1
+
+# 录制的资源类型 (图片、字体等不影响登录和签到流程，不录制)
+RECORDED_TYPES = {'Document', 'XHR', 'Fetch', 'Script', 'Stylesheet', 'Other'}
+
+# 录制时替换账号信息的占位值，回放时用它们登录
+PLACEHOLDER_EMAIL = 'user@example.com'
+PLACEHOLDER_PASSWORD = 'fixture-password'
+
+# 按 MIME 类型选择响应体文件的扩展名
+EXTENSIONS = [
+    ('html', '.html'), ('json', '.json'), ('javascript', '.js'), ('css', '.css'), ('text', '.txt'),
+]
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _is_text(mime: str) -> bool:
+    return any(kind in (mime or '') for kind in ('text', 'json', 'javascript', 'xml'))
+
+
+def _cookie_names(header: Optional[str]) -> List[str]:
+    """Cookie 请求头中的 cookie 名称"""
+    names = []
+    for part in (header or '').split(';'):
+        name = part.strip().split('=', 1)[0]
+        if name:
+            names.append(name)
+    return names
+
+
+def _header(headers: Dict[str, Any], name: str) -> Optional[str]:
+    """大小写不敏感地读取响应头"""
+    for key, value in (headers or {}).items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+class FixtureRecorder:
+    """录制一次运行中与站点之间的请求和响应
+
+    浏览器请求来自 Chrome 的 performance 日志，需在启动浏览器时设置 chrome_capability()，
+    并在导航后和关闭浏览器前调用 drain()；HTTP 会话通过 attach() 挂上响应钩子。
+    """
+
+    def __init__(self, directory: Path, base_url: str, secrets: Optional[List[str]] = None,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            directory: 夹具包目录 (save() 时创建)
+            base_url: 站点地址，只录制同源的请求
+            secrets: 需要从请求和响应中替换掉的字符串 (邮箱、密码)
+            logger: 日志记录器
+        """
+        self.directory = Path(directory)
+        self.origin = _origin(base_url)
+        self.replacements = []
+        for secret, placeholder in zip(secrets or [], (PLACEHOLDER_EMAIL, PLACEHOLDER_PASSWORD)):
+            if secret:
+                self.replacements.append((secret, placeholder))
+        self.logger = logger or logging.getLogger('HitunCheckin')
+        self.entries: List[Dict[str, Any]] = []
+        self.bodies: Dict[str, bytes] = {}
+        # 站点通过 Set-Cookie 下发过的 cookie 名称，回放时据此判断请求是否已登录
+        self.session_cookies = set()
+        # 浏览器请求 ID -> 尚未完成的请求
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def chrome_capability() -> Tuple[str, Dict[str, str]]:
+        """开启 performance 日志的 Chrome capability"""
+        return 'goog:loggingPrefs', {'performance': 'ALL'}
+
+    def _redact(self, text: str) -> str:
+        for secret, placeholder in self.replacements:
+            text = text.replace(secret, placeholder)
+        return text
+
+    def _add(self, source: str, method: str, url: str, status: int, mime: str,
+             headers: Dict[str, Any], body: Optional[bytes], request_body: Optional[str],
+             sent_cookies: List[str], set_cookies: List[str]):
+        """追加一条记录 (响应体在 save() 时写入)"""
+        if _origin(url) != self.origin:
+            return
+        parts = urlsplit(url)
+        with self._lock:
+            seq = len(self.entries) + 1
+            entry = {
+                'seq': seq,
+                'source': source,
+                'method': method.upper(),
+                'path': parts.path or '/',
+                'query': parts.query,
+                'status': status,
+                'mime': mime or '',
+                'location': _header(headers, 'location'),
+                'request_body': self._redact(request_body) if request_body else None,
+                'sent_cookies': sorted(set(sent_cookies)),
+                'set_cookies': sorted(set(set_cookies)),
+                'body': None,
+            }
+            if body:
+                extension = next((ext for kind, ext in EXTENSIONS if kind in entry['mime']), '.bin')
+                name = f"bodies/{seq:03d}{extension}"
+                if _is_text(entry['mime']):
+                    body = self._redact(body.decode('utf-8', errors='replace')).encode('utf-8')
+                self.bodies[name] = body
+                entry['body'] = name
+            self.session_cookies.update(set_cookies)
+            self.entries.append(entry)
+
+    # ---- 浏览器 ----
+
+    def drain(self, driver):
+        """处理浏览器 performance 日志中积累的网络事件
+
+        响应体要在页面仍然存活时读取，因此每次导航完成后和关闭浏览器前各调用一次。
+        不支持 performance 日志的驱动 (假浏览器等) 直接跳过。
+        """
+        try:
+            logs = driver.get_log('performance')
+        except Exception:
+            return
+        for item in logs:
+            try:
+                message = json.loads(item['message'])['message']
+            except (KeyError, TypeError, ValueError):
+                continue
+            params = message.get('params') or {}
+            request_id = params.get('requestId')
+            if not request_id:
+                continue
+            method = message.get('method')
+            if method == 'Network.requestWillBeSent':
+                previous = self._pending.get(request_id)
+                redirect = params.get('redirectResponse')
+                if previous and redirect:
+                    # 同一请求 ID 的重定向: 上一跳以 3xx 结束
+                    previous.update(status=redirect.get('status'), headers=redirect.get('headers') or {},
+                                    mime=redirect.get('mimeType', ''))
+                    self._finish_browser(previous, None)
+                request = params.get('request') or {}
+                self._pending[request_id] = {
+                    'method': request.get('method', 'GET'),
+                    'url': request.get('url', ''),
+                    'post_data': request.get('postData'),
+                    'type': params.get('type', 'Other'),
+                    'sent_cookies': [],
+                    'set_cookies': [],
+                }
+            elif method == 'Network.requestWillBeSentExtraInfo':
+                pending = self._pending.setdefault(request_id, {'sent_cookies': [], 'set_cookies': []})
+                pending['sent_cookies'] = _cookie_names(_header(params.get('headers') or {}, 'cookie'))
+            elif method == 'Network.responseReceivedExtraInfo':
+                pending = self._pending.setdefault(request_id, {'sent_cookies': [], 'set_cookies': []})
+                set_cookie = _header(params.get('headers') or {}, 'set-cookie') or ''
+                pending['set_cookies'] = [line.split('=', 1)[0].strip() for line in set_cookie.split('\n') if '=' in line]
+            elif method == 'Network.responseReceived':
+                response = params.get('response') or {}
+                pending = self._pending.setdefault(request_id, {'sent_cookies': [], 'set_cookies': []})
+                pending.update(status=response.get('status'), headers=response.get('headers') or {},
+                               mime=response.get('mimeType', ''), type=params.get('type', pending.get('type')))
+                pending.setdefault('url', response.get('url', ''))
+            elif method == 'Network.loadingFinished':
+                pending = self._pending.pop(request_id, None)
+                if pending and pending.get('status') and pending.get('type') in RECORDED_TYPES:
+                    self._finish_browser(pending, self._response_body(driver, request_id))
+            elif method == 'Network.loadingFailed':
+                self._pending.pop(request_id, None)
+
+    def _response_body(self, driver, request_id: str) -> Optional[bytes]:
+        try:
+            result = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+        except Exception as e:
+            self.logger.debug("读取响应体失败 %s: %s", request_id, e)
+            return None
+        if result.get('base64Encoded'):
+            return base64.b64decode(result.get('body', ''))
+        return (result.get('body') or '').encode('utf-8')
+
+    def _finish_browser(self, pending: Dict[str, Any], body: Optional[bytes]):
+        if not pending.get('url') or not pending.get('status'):
+            return
+        self._add('browser', pending['method'], pending['url'], pending['status'], pending.get('mime', ''),
+                  pending.get('headers') or {}, body, pending.get('post_data'),
+                  pending.get('sent_cookies') or [], pending.get('set_cookies') or [])
+
+    # ---- HTTP 会话 ----
+
+    def attach(self, session):
+        """给 requests 会话挂上响应钩子，录制无浏览器路径 (HTTP 签到、会话保活) 的请求"""
+        session.hooks.setdefault('response', []).append(self._record_response)
+
+    def _record_response(self, response, *args, **kwargs):
+        for hop in [*response.history, response]:
+            request = hop.request
+            body = request.body.decode('utf-8', errors='replace') if isinstance(request.body, bytes) else request.body
+            set_cookies = [cookie.name for cookie in hop.cookies]
+            self._add('http', request.method, hop.url, hop.status_code, hop.headers.get('Content-Type', ''),
+                      dict(hop.headers), hop.content if not hop.is_redirect else None, body,
+                      _cookie_names(request.headers.get('Cookie')), set_cookies)
+        return response
+
+    # ---- 保存 ----
+
+    def save(self, **meta) -> Optional[Path]:
+        """写入夹具包
+
+        Args:
+            meta: 写入 manifest 的运行信息 (账号、结果、流量等)
+
+        Returns:
+            夹具包目录，没有录制到任何请求时返回 None
+        """
+        with self._lock:
+            if not self.entries:
+                return None
+            for name, body in self.bodies.items():
+                atomic_write_bytes(self.directory / name, body)
+            save_json(self.directory / 'manifest.json', {
+                'version': FORMAT_VERSION,
+                'recorded_at': datetime.now().isoformat(timespec='seconds'),
+                'origin': self.origin,
+                'email': PLACEHOLDER_EMAIL,
+                'password': PLACEHOLDER_PASSWORD,
+                'session_cookies': sorted(self.session_cookies),
+                **meta,
+                'entries': self.entries,
+            })
+        return self.directory
+
+
+class FixtureBundle:
+    """读取夹具包"""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.manifest = load_json(self.directory / 'manifest.json')
+        if not self.manifest or 'entries' not in self.manifest:
+            raise ValueError(f"不是有效的夹具包: {self.directory}")
+        self.entries: List[Dict[str, Any]] = self.manifest['entries']
+        self.origin: str = self.manifest['origin']
+        self.session_cookies = set(self.manifest.get('session_cookies') or [])
+        # (方法, 路径) -> 按录制顺序排列的记录
+        self.routes: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        for entry in self.entries:
+            self.routes.setdefault((entry['method'], entry['path']), []).append(entry)
+
+    def body(self, entry: Dict[str, Any]) -> bytes:
+        if not entry.get('body'):
+            return b''
+        return (self.directory / entry['body']).read_bytes()
+
+    def summary(self) -> str:
+        manifest = self.manifest
+        result = {True: '成功', False: '失败'}.get(manifest.get('success'), '未知')
+        return (f"{self.directory.name}: {manifest.get('recorded_at')} 账号 {manifest.get('account', '-')} "
+                f"{len(self.entries)} 个请求，结果 {result}，流量 {manifest.get('traffic') or '-'}")
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """在本地回放夹具包
+
+    请求按 (方法, 路径) 匹配录制的响应，同一路由有多条记录时依次返回、用完后重复最后一条。
+    请求携带了站点下发过的会话 cookie 时优先匹配录制时同样已登录的记录 (如 /user 登录前
+    录到的是重定向，登录后录到的是用户页)。文本响应中的站点地址改写为本地地址。
+
+    Args:
+        bundle: 夹具包
+        address: 监听地址，端口为 0 时自动分配
+        latency_ms: 每个请求附加的延迟 (毫秒)
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, bundle: FixtureBundle, address: Tuple[str, int] = ('127.0.0.1', 0), latency_ms: float = 0):
+        super().__init__(address, _ReplayHandler)
+        self.bundle = bundle
+        self.latency_ms = latency_ms
+        self.lock = threading.Lock()
+        self._cursors: Dict[tuple, int] = {}
+        self.stats: Dict[str, int] = {'requests': 0, 'replayed': 0, 'missing': 0}
+        # 回放时未录制到的路由，便于发现站点改版后流程走到了新的页面
+        self.missing: List[str] = []
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'ReplayServer':
+        """在后台线程中运行"""
+        threading.Thread(target=self.serve_forever, name='fixture-replay', daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def reset(self):
+        """回到录制顺序的起点 (每轮回放前调用)"""
+        with self.lock:
+            self._cursors.clear()
+            self.missing.clear()
+            for key in self.stats:
+                self.stats[key] = 0
+
+    def match(self, method: str, path: str, query: str, cookie_header: Optional[str]) -> Optional[Dict[str, Any]]:
+        """为请求选出要回放的记录"""
+        candidates = self.bundle.routes.get((method, path))
+        if not candidates:
+            return None
+        logged_in = bool(set(_cookie_names(cookie_header)) & self.bundle.session_cookies)
+        same_state = [e for e in candidates if bool(set(e['sent_cookies']) & self.bundle.session_cookies) == logged_in]
+        candidates = same_state or candidates
+        same_query = [e for e in candidates if e['query'] == query]
+        candidates = same_query or candidates
+        key = (method, path, logged_in, query if same_query else None)
+        with self.lock:
+            index = self._cursors.get(key, 0)
+            self._cursors[key] = index + 1
+        return candidates[min(index, len(candidates) - 1)]
+
+    def rewrite(self, data: bytes) -> bytes:
+        """把文本中的站点地址改写为本地地址"""
+        origin = self.bundle.origin
+        text = data.decode('utf-8', errors='replace')
+        text = text.replace(origin, self.base_url).replace(origin.replace('/', '\\/'), self.base_url.replace('/', '\\/'))
+        return text.encode('utf-8')
+
+    def count(self, key: str):
+        with self.lock:
+            self.stats[key] = self.stats.get(key, 0) + 1
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    server: ReplayServer
+    server_version = 'HitunReplay'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _replay(self):
+        server = self.server
+        server.count('requests')
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+        if server.latency_ms:
+            time.sleep(server.latency_ms / 1000)
+
+        parts = urlsplit(self.path)
+        entry = server.match(self.command, parts.path or '/', parts.query, self.headers.get('Cookie'))
+        if entry is None:
+            server.count('missing')
+            with server.lock:
+                server.missing.append(f"{self.command} {parts.path}")
+            self._send(404, b'Not recorded', 'text/plain')
+            return
+
+        server.count('replayed')
+        body = server.bundle.body(entry)
+        if _is_text(entry['mime']):
+            body = server.rewrite(body)
+        headers = {}
+        if entry.get('location'):
+            headers['Location'] = server.rewrite(entry['location'].encode('utf-8')).decode('utf-8')
+        cookies = [f"{name}=replay-{entry['seq']}; Path=/" for name in entry.get('set_cookies') or []]
+        content_type = entry['mime'] or 'application/octet-stream'
+        if _is_text(content_type):
+            content_type += '; charset=utf-8'
+        self._send(entry['status'], body, content_type, headers, cookies)
+
+    def _send(self, status: int, data: bytes, content_type: str, headers: Optional[Dict[str, str]] = None,
+              cookies: Optional[List[str]] = None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        for cookie in cookies or []:
+            self.send_header('Set-Cookie', cookie)
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_PUT = do_DELETE = do_HEAD = _replay
+
+
+def check_bundle(bundle_dir: Path, runs: int = 1, base_config: Optional[Dict[str, Any]] = None,
+                 latency_ms: float = 0) -> Dict[str, Any]:
+    """对夹具包回放完整的 run()，每次使用全新的数据目录 (走密码登录)
+
+    Args:
+        bundle_dir: 夹具包目录
+        runs: 回放次数
+        base_config: 基础配置 (浏览器路径等)，站点地址、数据目录等由回放覆盖
+        latency_ms: 每个请求附加的延迟
+
+    Returns:
+        每次回放的结果、耗时与录制结果的对比
+    """
+    import tempfile
+
+    from hitun_checkin import HitunCheckin
+    from run_history import percentile
+
+    bundle = FixtureBundle(bundle_dir)
+    server = ReplayServer(bundle, latency_ms=latency_ms).start()
+    results = []
+    try:
+        with tempfile.TemporaryDirectory(prefix='replay_') as tmp:
+            for index in range(runs):
+                server.reset()
+                workdir = Path(tmp) / f"run{index}"
+                workdir.mkdir()
+                config = {
+                    **(base_config or {}),
+                    'email': bundle.manifest.get('email', PLACEHOLDER_EMAIL),
+                    'password': bundle.manifest.get('password', PLACEHOLDER_PASSWORD),
+                    'accounts': [],
+                    'base_url': server.base_url,
+                    'data_dir': str(workdir / 'data'),
+                    'log_dir': str(workdir / 'logs'),
+                    'preflight': False,
+                    'enable_notification': False,
+                    'record_fixtures': False,
+                    'speculative_http_checkin': False,
+                    'max_retry': 1,
+                    # 本地 http 回放不需要反检测
+                    'use_undetected_chrome': False,
+                }
+                config_path = workdir / 'config.json'
+                config_path.write_text(json.dumps(config, ensure_ascii=False), encoding='utf-8')
+                started = time.perf_counter()
+                checkin = HitunCheckin(str(config_path))
+                success = checkin.run()
+                results.append({
+                    'success': success,
+                    'seconds': round(time.perf_counter() - started, 2),
+                    'traffic': checkin.last_traffic,
+                    'failure': list(checkin.last_failure) if checkin.last_failure and not success else None,
+                    'missing': list(server.missing),
+                })
+    finally:
+        server.stop()
+
+    durations = [r['seconds'] for r in results]
+    recorded_traffic = bundle.manifest.get('traffic')
+    return {
+        'bundle': str(bundle_dir),
+        'recorded_success': bundle.manifest.get('success'),
+        'recorded_traffic': recorded_traffic,
+        'runs': results,
+        'succeeded': sum(1 for r in results if r['success']),
+        'p50_seconds': percentile(durations, 50),
+        'max_seconds': max(durations) if durations else None,
+        'traffic_matches': all(str(r['traffic']) == str(recorded_traffic) for r in results if r['success']),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='夹具包回放 (离线回归测试与基准测试)')
+    sub = parser.add_subparsers(dest='command', required=True)
+    list_parser = sub.add_parser('list', help='列出夹具包')
+    list_parser.add_argument('directory', nargs='?', default='logs/fixtures')
+    serve_parser = sub.add_parser('serve', help='在本地回放夹具包')
+    serve_parser.add_argument('bundle')
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8080)
+    serve_parser.add_argument('--latency-ms', type=float, default=0, help='每个请求附加的延迟')
+    check_parser = sub.add_parser('check', help='对夹具包回放完整的签到流程 (需要 Chrome)')
+    check_parser.add_argument('bundle')
+    check_parser.add_argument('--runs', type=int, default=1, help='回放次数 (默认 1)')
+    check_parser.add_argument('--config', help='基础配置文件 (浏览器/驱动路径等)')
+    check_parser.add_argument('--latency-ms', type=float, default=0, help='每个请求附加的延迟')
+    args = parser.parse_args()
+
+    if args.command == 'list':
+        directory = Path(args.directory)
+        bundles = sorted(path for path in directory.iterdir() if (path / 'manifest.json').exists()) \
+            if directory.is_dir() else []
+        for path in bundles:
+            print(FixtureBundle(path).summary())
+        if not bundles:
+            print(f"{directory} 下没有夹具包")
+        return 0
+
+    if args.command == 'serve':
+        bundle = FixtureBundle(Path(args.bundle))
+        server = ReplayServer(bundle, (args.host, args.port), latency_ms=args.latency_ms)
+        print(bundle.summary())
+        print(f"回放地址 {server.base_url} (原站点 {bundle.origin})")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    base_config = load_json(args.config, {}) if args.config and os.path.exists(args.config) else {}
+    report = check_bundle(Path(args.bundle), runs=args.runs, base_config=base_config, latency_ms=args.latency_ms)
+    for index, run in enumerate(report['runs'], 1):
+        line = f"第 {index} 次: {'成功' if run['success'] else '失败'} {run['seconds']}s 流量 {run['traffic'] or '-'}"
+        if run['failure']:
+            line += f" ({run['failure'][0]}: {run['failure'][1]})"
+        if run['missing']:
+            line += f" 未录制的请求: {', '.join(run['missing'][:5])}"
+        print(line)
+    print(f"成功 {report['succeeded']}/{len(report['runs'])}，P50 {report['p50_seconds']}s，"
+          f"录制时流量 {report['recorded_traffic'] or '-'}，流量一致: {'是' if report['traffic_matches'] else '否'}")
+    return 0 if report['succeeded'] == len(report['runs']) and report['traffic_matches'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -5,31 +5,35 @@ Hitun.io 自动签到工具
 每日自动登录并签到获取流量奖励
 """
 
+import importlib.util
 import json
 import logging
 import os
-import pickle
+import random
+import re
+import socket
+import signal
 import sys
+import threading
 import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import TYPE_CHECKING, Optional, Dict, Any, List, Callable
 
-from selenium import webdriver
+# selenium 的 By 和异常类导入开销很小；WebDriver、等待工具和 undetected-chromedriver
+# 较重，在启动浏览器或等待元素时才通过 lazy_import 导入
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
 
-# 尝试导入 undetected-chromedriver (用于绑过 Cloudflare)
-try:
-    import undetected_chromedriver as uc
-    UC_AVAILABLE = True
-except ImportError:
-    UC_AVAILABLE = False
+if TYPE_CHECKING:
+    from selenium import webdriver
+
+    from fixtures import FixtureRecorder
+
+# undetected-chromedriver (用于绑过 Cloudflare) 只检查是否安装，使用时再导入
+UC_AVAILABLE = importlib.util.find_spec('undetected_chromedriver') is not None
 
 # 导入通知模块
 try:
@@ -39,6 +43,82 @@ except ImportError:
     NOTIFICATION_AVAILABLE = False
     logging.warning("通知模块不可用,将跳过推送功能")
 
+from artifacts import ArtifactWriter
+from checkin_parser import CheckinResult, parse_message, parse_page
+from config_model import validate_config
+from deadline import DeadlineExceeded, RunDeadline
+from browser_pool import SharedBrowser
+from driver_resolver import DriverResolver
+from http_session import (
+    CLOUDFLARE_INDICATORS, build_session, export_cookies, is_challenge,
+    is_logged_in, is_proxy_error, post_checkin,
+)
+from logging_setup import setup_logging, set_log_context
+from page_timing import TimingReport, collect_timing, summarize
+from preflight import PreflightResult, check_proxy, check_site
+from proxy_pool import DIRECT, ProxyPool
+from startup_profile import lazy_import, process_age, record, report, timed
+from run_history import RunHistory, percentile
+from run_lock import RunLock
+from session_store import create_session_store
+from storage import load_json, save_json
+from strategy_cache import StrategyCache
+
+
+def load_config(config_path: str, require_credentials: bool = True) -> Dict[str, Any]:
+    """加载并校验配置文件
+
+    Args:
+        config_path: 配置文件路径
+        require_credentials: 是否要求配置中包含账号 (协调者模式下账号来自共享账号表，可以不配置)
+
+    Returns:
+        配置字典
+    """
+    if not os.path.exists(config_path):
+        raise FileNotFoundError(
+            f"配置文件不存在: {config_path}\n"
+            f"请复制 config.json.example 为 config.json 并填入登录信息"
+        )
+
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    # 验证必需的配置项（多账号模式下逐个账号校验）
+    required_fields = ['email', 'password']
+    accounts = config.get('accounts')
+    if accounts:
+        for index, account in enumerate(accounts, 1):
+            for field in required_fields:
+                if not account.get(field):
+                    raise ValueError(f"配置文件第 {index} 个账号缺少必需字段: {field}")
+    elif require_credentials:
+        for field in required_fields:
+            if not config.get(field):
+                raise ValueError(f"配置文件缺少必需字段: {field}")
+
+    validate_config(config)
+    return config
+
+
+def resolve_account_name(account: Optional[Dict[str, Any]]) -> str:
+    """账号标识，用于区分各账号的 cookie 文件和日志 (未指定账号时为 default)"""
+    if not account:
+        return 'default'
+    name = account.get('name') or account['email']
+    return re.sub(r'[^\w.@-]', '_', name)
+
+
+def load_accounts(config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """获取需要签到的账号列表
+
+    未配置 accounts 时，顶层的 email/password 视为唯一账号（兼容旧配置）。
+    """
+    accounts = config.get('accounts')
+    if accounts:
+        return accounts
+    return [{'email': config['email'], 'password': config['password']}]
+
 
 class HitunCheckin:
     """Hitun.io 自动签到类"""
@@ -47,16 +127,135 @@ class HitunCheckin:
     MAX_PAGE_LOAD_RETRIES = 3
     PAGE_LOAD_RETRY_DELAY = 5  # 秒
 
-    def __init__(self, config_path: str = "config.json"):
+    # 使用代理时，这些页面加载错误计为代理连接失败
+    PROXY_ERRORS = ('ERR_PROXY', 'ERR_TUNNEL_CONNECTION_FAILED', 'ERR_SOCKS', 'ERR_TIMED_OUT', 'timeout')
+
+    # 自适应超时的默认上下限 (秒)，可通过 adaptive_timeout_limits 覆盖
+    ADAPTIVE_TIMEOUT_LIMITS = {
+        'page_load': (10, 120),
+        'cloudflare': (10, 120),
+        'element': (3, 30),
+        'page_load_recovery': (1, 15),
+    }
+
+    # 登录表单中可能出现的验证码组件
+    CAPTCHA_SELECTOR = (
+        '.cf-turnstile, .g-recaptcha, .h-captcha, '
+        'iframe[src*="turnstile"], iframe[src*="recaptcha"], iframe[src*="hcaptcha"]'
+    )
+
+    # 提交登录表单: 优先点击登录按钮 (保留站点自己的提交处理)，没有按钮时提交表单
+    LOGIN_SUBMIT_JS = """
+        const button = document.getElementById('login');
+        if (button) { button.click(); return 'button'; }
+        const form = (document.getElementById('email') || {}).form || document.querySelector('form');
+        if (form && form.requestSubmit) { form.requestSubmit(); return 'requestSubmit'; }
+        if (form) { form.submit(); return 'submit'; }
+        return null;
+    """
+
+    # 一次往返内填写邮箱和密码、触发 input/change 事件，没有验证码时直接提交
+    LOGIN_FILL_SCRIPT = """
+        const [email, password, captchaSelector] = arguments;
+        const emailInput = document.getElementById('email');
+        const passwordInput = document.getElementById('passwd');
+        if (!emailInput || !passwordInput) { return {fields: false}; }
+        const setValue = (input, value) => {
+            // 通过原型上的 setter 赋值，使用数据绑定的前端框架才能感知到变化
+            const setter = Object.getOwnPropertyDescriptor(Object.getPrototypeOf(input), 'value').set;
+            setter.call(input, value);
+            input.dispatchEvent(new Event('input', {bubbles: true}));
+            input.dispatchEvent(new Event('change', {bubbles: true}));
+        };
+        setValue(emailInput, email);
+        setValue(passwordInput, password);
+        const captcha = document.querySelector(captchaSelector);
+        if (captcha) { return {fields: true, captcha: captcha.className || captcha.tagName, submitted: null}; }
+        const submitted = (function () {""" + LOGIN_SUBMIT_JS + """})();
+        return {fields: true, captcha: null, submitted: submitted};
+    """
+
+    # 验证码是否已经给出 token
+    CAPTCHA_TOKEN_SCRIPT = """
+        const token = document.querySelector(
+            '[name="cf-turnstile-response"], [name="g-recaptcha-response"], [name="h-captcha-response"]'
+        );
+        return !!(token && token.value);
+    """
+
+    # 与 cf_clearance 绑定的浏览器指纹属性
+    FINGERPRINT_SCRIPT = """
+        return {
+            userAgent: navigator.userAgent,
+            platform: navigator.platform,
+            languages: navigator.languages,
+            hardwareConcurrency: navigator.hardwareConcurrency,
+            screen: [screen.width, screen.height],
+            timezone: Intl.DateTimeFormat().resolvedOptions().timeZone
+        };
+    """
+
+    def __init__(self, config_path: str = "config.json",
+                 account: Optional[Dict[str, Any]] = None,
+                 browser: Optional[SharedBrowser] = None,
+                 driver_factory: Optional[Callable[[], Any]] = None):
         """初始化签到工具
 
         Args:
             config_path: 配置文件路径
+            account: 多账号模式下的账号配置，覆盖顶层的同名配置项
+            browser: 共享浏览器，提供时在其中为本账号创建隔离上下文而不是启动新的 Chrome
+            driver_factory: 自定义 WebDriver 工厂 (如 fake_driver 的假浏览器)，提供时不启动 Chrome
         """
         self.config_path = config_path
+        self.account = account
         self.config = self._load_config()
-        self.driver: Optional[webdriver.Chrome] = None
+        if account:
+            self.config = {**self.config, **account}
+        self.account_name = self._resolve_account_name()
+        self.browser = browser
+        self.driver_factory = driver_factory
+        self.base_url = self.config.get('base_url', 'https://hitun.io').rstrip('/')
+        self.driver: Optional['webdriver.Chrome'] = None
+        # 最近一次失败的阶段和原因，用于重试决策和失败通知
+        self.last_failure: Optional[tuple] = None
+        # 最近一次登录使用的方式: cookie / password
+        self.login_method: Optional[str] = None
+        # 最近一次运行获得的流量 (MB)
+        self.last_traffic: Optional[str] = None
+        # 最近一次运行各阶段的耗时 (RunHistory.pending_summary)
+        self.last_phases: Dict[str, Dict[str, Any]] = {}
+        self._context_id: Optional[str] = None
+        self._driver_lock = threading.Lock()
+        # 最近一次读取的会话版本，写入会话时用于比较并交换
+        self._session_version: Optional[int] = None
+        # 本次运行的页面计时报告，启用 timing_report 时在 run() 中创建
+        self.timing: Optional[TimingReport] = None
+        # 本次运行的请求录制，启用 record_fixtures 时在 run() 中创建
+        self.recorder: Optional['FixtureRecorder'] = None
+        # 本次运行的整体时限，run() 开始时按 run_deadline 创建，其他入口不限时
+        self.deadline = RunDeadline(None)
         self._setup_logging()
+        self.history = RunHistory(
+            Path(self.config.get('data_dir', 'data')) / 'run_history.json',
+            min_samples=self.config.get('adaptive_min_samples', 5),
+            margin=self.config.get('adaptive_timeout_margin', 1.5),
+        )
+        self.sessions = create_session_store(self.config.get('session_store'),
+                                             Path(self.config.get('data_dir', 'data')))
+        self.strategies = StrategyCache(Path(self.config.get('data_dir', 'data')) / 'strategy_cache.json')
+        # 出口代理池 (配置了 proxies 时)，同一 data_dir 的各账号共用
+        self.proxies = ProxyPool.shared(self.config, clock=lambda: time.time(), logger=self.logger)
+        # 本次运行使用的出口代理，None 表示直接连接
+        self.proxy: Optional[str] = None
+        log_dir = Path(self.config.get('log_dir', 'logs'))
+        self.artifacts = ArtifactWriter(
+            log_dir / 'artifacts',
+            max_age_days=self.config.get('artifact_max_age_days', 14),
+            max_total_mb=self.config.get('artifact_max_total_mb', 50),
+            legacy_dir=log_dir,
+            logger=self.logger,
+        )
         
         # 初始化通知器
         self.notifier = None
@@ -69,63 +268,139 @@ class HitunCheckin:
                 self.logger.warning(f"初始化通知器失败: {e}")
         
     def _load_config(self) -> Dict[str, Any]:
-        """加载配置文件"""
-        if not os.path.exists(self.config_path):
-            raise FileNotFoundError(
-                f"配置文件不存在: {self.config_path}\n"
-                f"请复制 config.json.example 为 config.json 并填入登录信息"
-            )
-        
-        with open(self.config_path, 'r', encoding='utf-8') as f:
-            config = json.load(f)
-        
-        # 验证必需的配置项
-        required_fields = ['email', 'password']
-        for field in required_fields:
-            if not config.get(field):
-                raise ValueError(f"配置文件缺少必需字段: {field}")
-        
-        return config
+        """加载配置文件 (指定了账号时配置文件本身可以不包含账号)"""
+        return load_config(self.config_path, require_credentials=self.account is None)
+
+    def _resolve_account_name(self) -> str:
+        """账号标识，用于区分各账号的 cookie 文件和日志"""
+        return resolve_account_name(self.account)
+
+    def apply_config(self, config: Dict[str, Any], account: Optional[Dict[str, Any]] = None):
+        """在不重建实例的情况下换用新配置 (常驻模式热加载，调用方保证此时没有进行中的运行)
+
+        会话存储、数据目录等需要重启才能生效的配置项由调用方沿用旧值。
+
+        Args:
+            config: 已校验的新配置
+            account: 本账号在新配置中的账号配置
+        """
+        self.account = account
+        self.config = {**config, **account} if account else config
+        self.base_url = self.config.get('base_url', 'https://hitun.io').rstrip('/')
+        self._setup_logging()
+        self.history.min_samples = self.config.get('adaptive_min_samples', 5)
+        self.history.margin = self.config.get('adaptive_timeout_margin', 1.5)
+        self.artifacts.max_age_days = self.config.get('artifact_max_age_days', 14)
+        self.artifacts.max_total_mb = self.config.get('artifact_max_total_mb', 50)
+        self.proxies = ProxyPool.shared(self.config, clock=lambda: time.time(), logger=self.logger)
+        if NOTIFICATION_AVAILABLE:
+            try:
+                self.notifier = create_notifier(self.config)
+            except Exception as e:
+                self.logger.warning(f"初始化通知器失败: {e}")
     
     def _setup_logging(self):
-        """设置日志系统"""
-        log_dir = Path(self.config.get('log_dir', 'logs'))
-        log_dir.mkdir(exist_ok=True)
-        
-        log_file = log_dir / 'checkin.log'
-        log_level = getattr(logging, self.config.get('log_level', 'INFO'))
-        
-        # 配置日志格式
-        formatter = logging.Formatter(
-            '%(asctime)s - %(levelname)s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
-        
-        # 文件处理器
-        file_handler = logging.FileHandler(log_file, encoding='utf-8')
-        file_handler.setFormatter(formatter)
-        
-        # 控制台处理器
-        console_handler = logging.StreamHandler()
-        console_handler.setFormatter(formatter)
-        
-        # 配置 logger
-        self.logger = logging.getLogger('HitunCheckin')
-        self.logger.setLevel(log_level)
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
+        """设置日志系统 (队列化、可轮转，进程内只配置一次)"""
+        self.logger = setup_logging(self.config)
     
+    def _timeout(self, phase: str, default: float, pct: float = 95) -> float:
+        """获取某阶段的超时时间
+
+        开启 adaptive_timeouts 时根据历史耗时分位数推导，
+        样本不足或未开启时返回静态默认值。
+        带步骤后缀的阶段 (如 element:email) 使用其所属阶段的上下限。
+        """
+        if not self.config.get('adaptive_timeouts', True):
+            return default
+        kind = phase.partition(':')[0]
+        limits = self.config.get('adaptive_timeout_limits', {})
+        floor, ceiling = limits.get(kind, self.ADAPTIVE_TIMEOUT_LIMITS[kind])
+        return self.history.timeout(phase, default, floor, ceiling, pct=pct)
+
+    def _should_capture_login_snapshot(self) -> bool:
+        """是否保存登录页面快照：调试模式下总是保存，否则按采样率保存"""
+        if self.config.get('debug_artifacts', False):
+            return True
+        return random.random() < self.config.get('login_snapshot_sample_rate', 0.0)
+
+    def _save_failure_artifacts(self, name: str, description: str):
+        """保存失败现场的截图和 HTML (写盘在后台线程完成)"""
+        try:
+            screenshot_path = self.artifacts.save_png(name, self.driver.get_screenshot_as_png())
+            self.logger.info(f"已保存{description}截图: {screenshot_path}")
+            html_path = self.artifacts.save_html(name, self.driver.page_source)
+            self.logger.info(f"已保存{description}页面HTML: {html_path}")
+        except Exception as e:
+            self.logger.warning(f"保存{description}现场失败: {e}")
+
+    def _try_strategies(self, step: str, strategies: Dict[str, Callable[[], Any]],
+                        fallback_delay: float = 0, log_level: int = logging.WARNING, optional: bool = False):
+        """按近期成功率依次尝试一组定位/点击策略
+
+        策略返回假值或抛出异常视为失败，结果记录到策略缓存。
+
+        Args:
+            step: 步骤名称
+            strategies: 策略名 -> 策略函数 (按默认优先级排列)
+            fallback_delay: 执行后备策略前的等待时间(秒)
+            log_level: 策略失败时的日志级别
+            optional: 元素可能本来就不存在 (如欢迎弹窗)，全部策略失败时不记录结果，
+                只有某个策略成功时才把排在它前面的失败计入缓存
+
+        Returns:
+            (成功的策略名, 策略返回值)，全部失败时为 (None, None)
+        """
+        misses = []
+        for index, name in enumerate(self.strategies.order(step, list(strategies))):
+            if index and fallback_delay:
+                time.sleep(self.deadline.cap(fallback_delay, 'element'))
+            try:
+                result = strategies[name]()
+            except DeadlineExceeded:
+                # 时限已用完，不再尝试其余策略
+                raise
+            except Exception as e:
+                self.logger.log(log_level, "%s 策略 %s 失败: %s", step, name, e)
+                result = None
+            if result:
+                for missed in misses:
+                    self.strategies.record(step, missed, False)
+                self.strategies.record(step, name, True)
+                return name, result
+            if optional:
+                misses.append(name)
+            else:
+                self.strategies.record(step, name, False)
+        return None, None
+
     def _init_driver(self):
         """初始化 Chrome WebDriver
 
-        优先使用 undetected-chromedriver 来绑过 Cloudflare 检测
+        优先使用 undetected-chromedriver 来绑过 Cloudflare 检测。
+        使用共享浏览器时，只在已有的 Chrome 中新建一个隔离的浏览器上下文。
         """
+        if self.browser:
+            self._context_id = self.browser.open_context(self.account_name, proxy=self.proxy)
+            self.driver = self.browser.driver
+            self.logger.info(f"已在共享浏览器中创建隔离上下文: {self._context_id}")
+            self._apply_fingerprint()
+            return
+
+        if self.driver_factory:
+            self.driver = self.driver_factory(proxy=self.proxy) if self.proxy else self.driver_factory()
+            self.driver.set_page_load_timeout(self._timeout('page_load', self.config.get('timeout', 60)))
+            self._apply_fingerprint()
+            return
+
         use_uc = self.config.get('use_undetected_chrome', True) and UC_AVAILABLE
         headless = self.config.get('headless', True)
+        resolved = self._resolve_browser()
+        major = (resolved.get('browser_version') or '').split('.')[0]
 
         if use_uc:
             self.logger.info("使用 undetected-chromedriver (反检测模式)")
             try:
+                uc = lazy_import('undetected_chromedriver')
                 options = uc.ChromeOptions()
 
                 # 无头模式
@@ -137,33 +412,31 @@ class HitunCheckin:
                 options.add_argument('--disable-dev-shm-usage')
                 options.add_argument('--disable-gpu')
                 options.add_argument('--window-size=1920,1080')
+                for argument in self._proxy_arguments():
+                    options.add_argument(argument)
+                if self.recorder:
+                    options.set_capability(*self.recorder.chrome_capability())
 
                 # 明确指定浏览器和驱动路径，避免下载挂起
-                # 按优先级查找 chromium 可执行文件
-                browser_candidates = ['/usr/bin/chromium', '/usr/bin/chromium-browser', '/usr/bin/google-chrome-stable']
-                browser_path = None
-                for candidate in browser_candidates:
-                    if os.path.exists(candidate):
-                        browser_path = candidate
-                        break
-
-                driver_path = '/usr/bin/chromedriver'
-
                 self.driver = uc.Chrome(
                     options=options,
-                    browser_executable_path=browser_path,
-                    driver_executable_path=driver_path if os.path.exists(driver_path) else None,
+                    browser_executable_path=resolved['browser_path'],
+                    driver_executable_path=resolved['driver_path'],
+                    version_main=int(major) if major.isdigit() else None,
                     use_subprocess=True
                 )
-                self.driver.set_page_load_timeout(self.config.get('timeout', 60))
+                self.driver.set_page_load_timeout(self._timeout('page_load', self.config.get('timeout', 60)))
                 self.logger.info("undetected-chromedriver 初始化成功")
+                self._apply_fingerprint()
                 return
             except Exception as e:
                 self.logger.warning(f"undetected-chromedriver 初始化失败: {e}")
                 self.logger.info("回退到普通 Chrome WebDriver...")
 
         # 普通 Chrome WebDriver
-        chrome_options = Options()
+        webdriver = lazy_import('selenium.webdriver')
+        Service = lazy_import('selenium.webdriver.chrome.service').Service
+        chrome_options = webdriver.ChromeOptions()
 
         # 无头模式配置
         if headless:
@@ -175,35 +448,186 @@ class HitunCheckin:
         chrome_options.add_argument('--disable-dev-shm-usage')
         chrome_options.add_argument('--disable-blink-features=AutomationControlled')
         chrome_options.add_argument('--window-size=1920,1080')
-        chrome_options.add_argument('--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+        for argument in self._proxy_arguments():
+            chrome_options.add_argument(argument)
 
         # 禁用自动化检测
         chrome_options.add_experimental_option('excludeSwitches', ['enable-automation', 'enable-logging'])
         chrome_options.add_experimental_option('useAutomationExtension', False)
+        if self.recorder:
+            chrome_options.set_capability(*self.recorder.chrome_capability())
 
         try:
-            # 指定 chromium 二进制路径
-            browser_candidates = ['/usr/bin/chromium', '/usr/bin/chromium-browser', '/usr/bin/google-chrome-stable']
-            for candidate in browser_candidates:
-                if os.path.exists(candidate):
-                    chrome_options.binary_location = candidate
-                    break
+            # 指定 chromium 二进制和匹配的驱动路径
+            if resolved['browser_path']:
+                chrome_options.binary_location = resolved['browser_path']
+            service = Service(resolved['driver_path']) if resolved['driver_path'] else Service()
 
-            # 优先尝试使用已安装的 chromedriver
-            if os.path.exists('/usr/bin/chromedriver'):
-                service = Service('/usr/bin/chromedriver')
-            else:
-                service = Service(ChromeDriverManager().install())
-            
             self.driver = webdriver.Chrome(service=service, options=chrome_options)
             self.driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
                 'source': 'Object.defineProperty(navigator, "webdriver", {get: () => undefined})'
             })
-            self.driver.set_page_load_timeout(self.config.get('timeout', 60))
+            self.driver.set_page_load_timeout(self._timeout('page_load', self.config.get('timeout', 60)))
             self.logger.info("WebDriver 初始化成功")
         except Exception as e:
             self.logger.error(f"WebDriver 初始化失败: {e}")
             raise
+        self._apply_fingerprint()
+
+    def _proxy_arguments(self) -> List[str]:
+        """出口代理的 Chrome 启动参数"""
+        if not self.proxy:
+            return []
+        # <-loopback> 让发往本机地址的请求也走代理 (Chrome 默认绕过)，本地替身站点测试时需要
+        return [f'--proxy-server={self.proxy}', '--proxy-bypass-list=<-loopback>']
+
+    def _select_proxy(self):
+        """确定出口代理: 配置的 proxy 优先 ("direct" 表示直接连接)，否则从代理池按账号分配"""
+        fixed = self.config.get('proxy')
+        if fixed:
+            proxy = None if fixed == DIRECT else fixed
+        elif self.proxies:
+            proxy = self.proxies.assign(self.account_name)
+        else:
+            proxy = None
+        if proxy != self.proxy:
+            self.logger.info(f"出口代理: {proxy or '直接连接'}")
+        self.proxy = proxy
+        if self.notifier and self.config.get('notification_proxy') == 'account':
+            self.notifier.proxy = proxy
+
+    def _record_proxy(self, seconds: Optional[float] = None, failed: bool = False, challenge: bool = False):
+        """把一次访问的结果计入代理池 (没有使用代理池时忽略)"""
+        if not self.proxies or not self.proxy:
+            return
+        if challenge:
+            self.proxies.record_challenge(self.proxy)
+        else:
+            self.proxies.record(self.proxy, seconds, failed=failed)
+
+    def _preflight(self) -> PreflightResult:
+        """网络预检: 直接连接时检查站点，使用代理时检查代理
+
+        代理预检失败时暂停该代理并换用代理池中的下一个，直到找到可用的代理或全部试过。
+        """
+        timeout = self.config.get('preflight_timeout', 5)
+        tried = set()
+        result = None
+        while self.proxy and self.proxy not in tried:
+            tried.add(self.proxy)
+            result = check_proxy(self.proxy, self.base_url, timeout=timeout)
+            if result.ok or not self.proxies or self.proxy not in self.proxies.proxies:
+                return result
+            self.logger.warning(f"代理 {self.proxy} 预检失败: {result.summary()}")
+            self.proxies.sideline(self.proxy, f"预检失败: {result.error}")
+            self._select_proxy()
+        if self.proxy:
+            return result
+        return check_site(self.base_url, timeout=timeout)
+
+    def _resolve_browser(self) -> Dict[str, Any]:
+        """定位浏览器和匹配的 chromedriver (结果缓存在 data_dir，缓存有效时不访问网络)"""
+        resolver = DriverResolver(
+            Path(self.config.get('data_dir', 'data')) / 'driver_cache.json',
+            browser_path=self.config.get('browser_path'),
+            driver_path=self.config.get('driver_path'),
+            allow_download=self.config.get('driver_download', True),
+            logger=self.logger,
+        )
+        return resolver.resolve()
+
+    def _get_fingerprint_path(self) -> Path:
+        """获取浏览器指纹文件路径 (与 cookie 文件放在一起)"""
+        return self._account_file('fingerprint', '.json')
+
+    def _browser_major_version(self) -> str:
+        """当前浏览器主版本号"""
+        version = (self.driver.capabilities or {}).get('browserVersion', '')
+        return version.split('.')[0]
+
+    def _apply_fingerprint(self):
+        """重新应用上次保存 cookies 时的浏览器指纹
+
+        cf_clearance 与 UA/指纹绑定，指纹变化会导致重新挑战。
+        浏览器主版本变化时保存的 UA 已与实际内核不符，此时放弃旧指纹。
+        没有可用指纹时去掉无头模式 UA 中的 HeadlessChrome 标记，
+        两种驱动路径都基于实际浏览器版本生成一致的 UA。
+        """
+        fingerprint = self._session_fingerprint(self._peek_session())
+        if fingerprint and fingerprint.get('browserMajor') != self._browser_major_version():
+            self.logger.info(
+                f"浏览器版本已变化 ({fingerprint.get('browserMajor')} -> {self._browser_major_version()})，"
+                f"放弃已保存的指纹"
+            )
+            fingerprint = None
+
+        try:
+            if fingerprint:
+                override = {'userAgent': fingerprint['userAgent']}
+                if fingerprint.get('platform'):
+                    override['platform'] = fingerprint['platform']
+                if fingerprint.get('languages'):
+                    override['acceptLanguage'] = ','.join(fingerprint['languages'])
+                self.driver.execute_cdp_cmd('Emulation.setUserAgentOverride', override)
+                if fingerprint.get('timezone'):
+                    try:
+                        self.driver.execute_cdp_cmd('Emulation.setTimezoneOverride', {
+                            'timezoneId': fingerprint['timezone']
+                        })
+                    except Exception as e:
+                        self.logger.debug("设置时区失败: %s", e)
+                self.logger.info(f"已应用保存的浏览器指纹: {fingerprint['userAgent']}")
+                return
+
+            user_agent = self.driver.execute_script("return navigator.userAgent;")
+            if 'HeadlessChrome' in user_agent:
+                self.driver.execute_cdp_cmd('Emulation.setUserAgentOverride', {
+                    'userAgent': user_agent.replace('HeadlessChrome', 'Chrome')
+                })
+        except Exception as e:
+            self.logger.warning(f"应用浏览器指纹失败: {e}")
+
+    def _save_fingerprint(self) -> Optional[Dict[str, Any]]:
+        """保存当前浏览器指纹，与 cookies 一起在下次运行时复用
+
+        Returns:
+            当前指纹，读取失败时返回 None
+        """
+        try:
+            fingerprint = self.driver.execute_script(self.FINGERPRINT_SCRIPT)
+            fingerprint['browserMajor'] = self._browser_major_version()
+            path = self._get_fingerprint_path()
+            state = load_json(path, {})
+            state['fingerprint'] = fingerprint
+            save_json(path, state)
+            return fingerprint
+        except Exception as e:
+            self.logger.warning(f"保存浏览器指纹失败: {e}")
+            return None
+
+    def _record_clearance_outcome(self):
+        """统计已保存的 cf_clearance 被复用还是被重新挑战"""
+        challenged = self._check_cloudflare_challenge()
+        path = self._get_fingerprint_path()
+        state = load_json(path, {})
+        stats = state.setdefault('clearance', {'reused': 0, 'challenged': 0})
+        if challenged:
+            stats['challenged'] += 1
+            stats['last_challenged'] = datetime.now().isoformat(timespec='seconds')
+        else:
+            stats['reused'] += 1
+        try:
+            save_json(path, state)
+        except Exception as e:
+            self.logger.debug("保存 clearance 统计失败: %s", e)
+
+        total = stats['reused'] + stats['challenged']
+        cf_timeout = self.config.get('cloudflare_timeout', 30)
+        self.logger.info(
+            f"cf_clearance {'被重新挑战' if challenged else '复用成功'} "
+            f"(累计复用 {stats['reused']}/{total} 次，复用率 {stats['reused'] * 100 // total}%，"
+            f"最多节省 {stats['reused'] * cf_timeout}s 挑战等待)"
+        )
     
     def _wait_for_element(self, by: By, value: str, timeout: int = 10):
         """等待元素出现
@@ -211,18 +635,28 @@ class HitunCheckin:
         Args:
             by: 定位方式
             value: 定位值
-            timeout: 超时时间(秒)
+            timeout: 默认超时时间(秒)，开启自适应超时后由历史耗时推导
 
         Returns:
             找到的元素
         """
+        # 按定位值分别统计：表单字段在页面加载后几乎立即出现，登录按钮、弹窗等要慢得多，
+        # 混在一起时快的步骤会把慢步骤的超时压到下限
+        phase = f"element:{value}"
+        timeout = self.deadline.cap(self._timeout(phase, timeout), 'element')
+        start_time = time.time()
+        ui = lazy_import('selenium.webdriver.support.ui')
+        conditions = lazy_import('selenium.webdriver.support.expected_conditions')
         try:
-            element = WebDriverWait(self.driver, timeout).until(
-                EC.presence_of_element_located((by, value))
+            element = ui.WebDriverWait(self.driver, timeout).until(
+                conditions.presence_of_element_located((by, value))
             )
+            self.history.record(phase, time.time() - start_time)
             return element
         except TimeoutException:
-            self.logger.error(f"等待元素超时: {by}={value}")
+            self.history.record(phase, time.time() - start_time, ok=False, timed_out=True)
+            self.logger.error(f"等待元素超时: {by}={value} ({timeout:.0f}s)")
+            self.deadline.check('element')
             raise
 
     def _safe_get(self, url: str, retries: int = None) -> bool:
@@ -238,12 +672,40 @@ class HitunCheckin:
         if retries is None:
             retries = self.MAX_PAGE_LOAD_RETRIES
 
+        first_failure = None
+        slept = 0.0
+        page_timeout = self._timeout('page_load', self.config.get('timeout', 60))
         for attempt in range(1, retries + 1):
+            budget = self.deadline.cap(page_timeout, 'page_load')
+            shortened = budget < page_timeout
+            if shortened:
+                # 剩余时限不足一次完整的页面加载超时，本次加载缩短驱动的加载超时
+                self.driver.set_page_load_timeout(max(int(budget), 1))
+            start_time = time.time()
             try:
-                self.driver.get(url)
+                try:
+                    self.driver.get(url)
+                finally:
+                    if shortened:
+                        self.driver.set_page_load_timeout(page_timeout)
+                self.history.record('page_load', time.time() - start_time)
+                self._record_proxy(time.time() - start_time)
+                self._capture_timing(url, time.time() - start_time)
+                if self.recorder:
+                    self.recorder.drain(self.driver)
+                if first_failure is not None:
+                    # 从首次失败到恢复的耗时 (不含重试间隔本身)，用于推导重试间隔；
+                    # 计入等待时间会让间隔随自身的取值不断放大
+                    self.history.record('page_load_recovery', time.time() - first_failure - slept)
                 return True
             except Exception as e:
                 error_msg = str(e)
+                self.history.record('page_load', time.time() - start_time, ok=False,
+                                    timed_out=isinstance(e, TimeoutException) or 'Timed out' in error_msg)
+                if first_failure is None:
+                    first_failure = start_time
+                if any(kw in error_msg for kw in self.PROXY_ERRORS):
+                    self._record_proxy(failed=True)
                 is_transient = any(kw in error_msg for kw in [
                     'ERR_CONNECTION_CLOSED',
                     'ERR_CONNECTION_RESET',
@@ -257,25 +719,67 @@ class HitunCheckin:
                     self.logger.warning(
                         f"页面加载失败 (尝试 {attempt}/{retries}): {error_msg[:120]}"
                     )
-                    time.sleep(self.PAGE_LOAD_RETRY_DELAY * attempt)
+                    retry_delay = self._timeout('page_load_recovery', self.PAGE_LOAD_RETRY_DELAY, pct=50)
+                    delay = self.deadline.cap(retry_delay * attempt, 'page_load')
+                    time.sleep(delay)
+                    slept += delay
+                    self.deadline.check('page_load')
                 else:
                     self.logger.error(
                         f"页面加载最终失败 ({attempt}/{retries}): {error_msg[:200]}"
                     )
                     raise
 
-    def _get_cookie_path(self) -> Path:
-        """获取 cookie 文件路径"""
+    def _capture_timing(self, url: str, load_seconds: float):
+        """把本次导航的浏览器侧计时追加到计时报告"""
+        if not self.timing:
+            return
+        timing = None
+        try:
+            timing = collect_timing(
+                self.driver,
+                top_n=self.config.get('timing_top_requests', 10),
+                include_requests=self.config.get('timing_request_summary', True),
+            )
+            if timing:
+                self.logger.info(f"页面计时 {url}: {summarize(timing)}")
+        except Exception as e:
+            self.logger.debug("读取页面计时失败: %s", e)
+        self.timing.add(url, load_seconds, timing)
+
+    def _close_driver(self):
+        """关闭浏览器；共享浏览器只销毁本账号的上下文"""
+        # 取消的后台启动会在启动线程中关闭浏览器，与主线程的清理互斥
+        with self._driver_lock:
+            if not self.driver:
+                return
+            if self.recorder:
+                # 页面关闭后响应体就读不到了
+                self.recorder.drain(self.driver)
+            try:
+                if self.browser:
+                    self.browser.close_context(self._context_id)
+                else:
+                    self.driver.quit()
+            except Exception:
+                pass
+            self.driver = None
+            self._context_id = None
+        self.logger.info("浏览器已关闭")
+
+    def _account_file(self, prefix: str, suffix: str) -> Path:
+        """按账号区分的数据文件路径，默认账号沿用原有文件名"""
         data_dir = Path(self.config.get('data_dir', 'data'))
-        data_dir.mkdir(exist_ok=True)
-        return data_dir / 'cookies.pkl'
+        if self.account_name == 'default':
+            return data_dir / f"{prefix}{suffix}"
+        return data_dir / f"{prefix}_{self.account_name}{suffix}"
 
     def _inject_manual_cookies(self, cookies: list) -> bool:
         """注入手动提供的 cookies 并验证"""
         try:
             # 预访问域名
-            self._safe_get("https://hitun.io")
-            time.sleep(2)
+            self._safe_get(self.base_url)
+            time.sleep(self.deadline.cap(2, 'login'))
 
             for cookie in cookies:
                 # 关键修复：确保域名格式正确
@@ -289,11 +793,11 @@ class HitunCheckin:
                 try:
                     self.driver.add_cookie(cookie)
                 except Exception as e:
-                    self.logger.debug(f"注入 Cookie {cookie.get('name')} 失败: {e}")
+                    self.logger.debug("注入 Cookie %s 失败: %s", cookie.get('name'), e)
             
             self.logger.info("手工 Cookies 注入完成，正在刷新验证...")
-            self._safe_get("https://hitun.io/user") # 注入后直接跳转
-            time.sleep(5)
+            self._safe_get(f"{self.base_url}/user") # 注入后直接跳转
+            time.sleep(self.deadline.cap(5, 'login'))
             
             # 检查是否成功进入后台
             if "user" in self.driver.current_url or "dashboard" in self.driver.current_url:
@@ -304,28 +808,147 @@ class HitunCheckin:
             
             self.logger.warning("手工 Cookies 注入后未能进入后台，可能已失效")
             return False
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             self.logger.error(f"手工 Cookies 注入过程出错: {e}")
             return False
 
+    def _write_cookies(self, cookies: list, fingerprint: Optional[Dict[str, Any]] = None):
+        """把 cookie 列表和绑定的指纹写入会话存储
+
+        以本次运行读取到的版本做比较并交换，其他节点已写入更新的会话时保留对方的会话。
+        """
+        if fingerprint is None:
+            fingerprint = load_json(self._get_fingerprint_path(), {}).get('fingerprint')
+        version = self.sessions.save(self.account_name, cookies, fingerprint,
+                                     expected_version=self._session_version)
+        if version is None:
+            self.logger.info("会话已被其他节点更新，保留较新的会话")
+            self._session_version = None
+            return
+        self._session_version = version
+        self.logger.info(f"Cookies 已保存到: {self.sessions.describe()} (版本 {version})")
+
+    def _peek_session(self) -> Optional[Dict[str, Any]]:
+        """只查看本账号保存的会话 (不记录版本号)；不存在或读取失败时返回 None
+
+        用于检查指纹、cookie 过期时间等，可以在运行之外 (如常驻模式的调度线程) 调用，
+        不影响运行中写入会话时的版本比较。
+        """
+        try:
+            return self.sessions.load(self.account_name)
+        except Exception as e:
+            self.logger.warning(f"读取会话失败 ({self.sessions.describe()}): {e}")
+            return None
+
+    def _read_session(self) -> Optional[Dict[str, Any]]:
+        """读取本账号保存的会话作为本次运行的基础，记录版本号供之后写入时比较
+
+        只在随后会写回会话的路径上调用 (cookie 登录、保活、HTTP 签到)；只读的检查请使用 _peek_session。
+        """
+        try:
+            record = self.sessions.load(self.account_name)
+        except Exception as e:
+            self.logger.warning(f"读取会话失败 ({self.sessions.describe()}): {e}")
+            return None
+        self._session_version = record['version'] if record else 0
+        if record and record.get('node') and record['node'] != socket.gethostname():
+            self.logger.info(f"使用节点 {record['node']} 保存的会话 (版本 {record['version']})")
+        return record
+
+    def _read_cookies(self) -> Optional[list]:
+        """读取已保存的 cookie 列表作为本次运行的基础 (记录版本号)，不存在或损坏时返回 None"""
+        record = self._read_session()
+        return record['cookies'] if record else None
+
+    def _peek_cookies(self) -> Optional[list]:
+        """只查看已保存的 cookie 列表 (不记录版本号)，不存在或损坏时返回 None"""
+        record = self._peek_session()
+        return record['cookies'] if record else None
+
+    def _session_fingerprint(self, record: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """与会话绑定的浏览器指纹: 优先使用会话记录中的 (可能由其他节点产生)，否则使用本地指纹文件"""
+        if record and record.get('fingerprint'):
+            return record['fingerprint']
+        return load_json(self._get_fingerprint_path(), {}).get('fingerprint')
+
     def _save_cookies(self):
         """保存当前会话的 cookies（过滤掉 Cloudflare 相关 cookies）"""
         try:
-            cookie_path = self._get_cookie_path()
             cookies = self.driver.get_cookies()
             # 保留所有 cookies（包括 cf_clearance），同一 undetected-chromedriver 指纹可复用
             self.logger.info(f"保存 {len(cookies)} 个 cookies")
-            with open(cookie_path, 'wb') as f:
-                pickle.dump(cookies, f)
-            self.logger.info(f"Cookies 已保存到: {cookie_path}")
+            self._write_cookies(cookies, self._save_fingerprint())
         except Exception as e:
             self.logger.warning(f"保存 cookies 失败: {e}")
 
+    def refresh_session(self) -> tuple[bool, float]:
+        """不启动浏览器，用保存的 cookie 罐访问用户页面以保持会话活跃
+
+        服务器轮换下发的 cookie 会写回 cookie 文件，让下次签到走快速的 cookie 登录。
+
+        Returns:
+            (会话是否有效, 耗时秒数)
+        """
+        start_time = time.time()
+        lock = self._run_lock()
+        if not lock.acquire(timeout=0, purpose='keepalive'):
+            self.logger.info("保活跳过: 本账号正在签到")
+            return False, 0.0
+        try:
+            return self._refresh_session(start_time)
+        finally:
+            lock.release()
+            if self.proxies:
+                try:
+                    self.proxies.flush()
+                except Exception as e:
+                    self.logger.warning(f"保存代理池状态失败: {e}")
+
+    def _refresh_session(self, start_time: float) -> tuple[bool, float]:
+        """refresh_session 在持有运行锁时的实际逻辑"""
+        record = self._read_session()
+        if not record or not record['cookies']:
+            self.logger.info("保活跳过: 没有保存的 cookies")
+            return False, 0.0
+
+        cookies = record['cookies']
+        fingerprint = self._session_fingerprint(record)
+        self._select_proxy()
+        session = build_session(cookies, (fingerprint or {}).get('userAgent'), proxy=self.proxy)
+        if self.recorder:
+            self.recorder.attach(session)
+        try:
+            response = session.get(f"{self.base_url}/user", timeout=self.config.get('timeout', 60))
+        except Exception as e:
+            self.logger.warning(f"会话保活请求失败: {e}")
+            if is_proxy_error(e):
+                self._record_proxy(failed=True)
+            return False, time.time() - start_time
+        finally:
+            session.close()
+
+        elapsed = time.time() - start_time
+        self._record_proxy(elapsed)
+        if is_challenge(response):
+            self._record_proxy(challenge=True)
+            self.logger.warning(f"会话保活遇到 Cloudflare 挑战 ({elapsed:.1f}s)")
+            return False, elapsed
+        if not is_logged_in(response):
+            self.logger.warning(f"会话保活失败，会话可能已过期: {response.url} ({elapsed:.1f}s)")
+            return False, elapsed
+
+        try:
+            self._write_cookies(export_cookies(session, cookies), fingerprint)
+        except Exception as e:
+            self.logger.warning(f"保存刷新后的 cookies 失败: {e}")
+        self.logger.info(f"会话保活成功 ({elapsed:.1f}s)")
+        return True, elapsed
+
     def _load_cookies(self) -> bool:
         """加载保存的 cookies"""
-        data_dir = Path(self.config.get('data_dir', 'data'))
-        cookie_path = data_dir / 'cookies.pkl'
-        json_cookie_path = data_dir / 'manual_cookies.json'
+        json_cookie_path = self._account_file('manual_cookies', '.json')
 
         if json_cookie_path.exists():
             try:
@@ -334,8 +957,8 @@ class HitunCheckin:
                     manual_cookies = json.load(f)
                 
                 # 预访问域名
-                self._safe_get("https://hitun.io")
-                time.sleep(2)
+                self._safe_get(self.base_url)
+                time.sleep(self.deadline.cap(2, 'login'))
 
                 for cookie in manual_cookies:
                     if 'domain' in cookie and not cookie['domain'].startswith('.'):
@@ -345,11 +968,11 @@ class HitunCheckin:
                     try:
                         self.driver.add_cookie(cookie)
                     except Exception as e:
-                        self.logger.debug(f"注入 Cookie {cookie.get('name')} 失败: {e}")
+                        self.logger.debug("注入 Cookie %s 失败: %s", cookie.get('name'), e)
                 
                 self.logger.info("手工 Cookies 注入完成，正在刷新验证...")
-                self._safe_get("https://hitun.io/user")
-                time.sleep(5)
+                self._safe_get(f"{self.base_url}/user")
+                time.sleep(self.deadline.cap(5, 'login'))
 
                 if "user" in self.driver.current_url or "dashboard" in self.driver.current_url:
                     self.logger.info("✅ 手工 Cookies 验证成功!")
@@ -358,33 +981,41 @@ class HitunCheckin:
                     return True
                 else:
                     self.logger.warning("手工 Cookies 注入后未能进入后台，可能已失效")
+            except DeadlineExceeded:
+                raise
             except Exception as e:
                 self.logger.warning(f"手工 Cookies 注入失败: {e}")
 
-        if not cookie_path.exists():
-            self.logger.info("未找到保存的 cookies")
-            return False
-
         try:
-            with open(cookie_path, 'rb') as f:
-                cookies = pickle.load(f)
+            cookies = self._read_cookies()
+            if not cookies:
+                self.logger.info("未找到保存的 cookies")
+                return False
 
             # 先访问目标域名（仅用于设置域，不等 CF 通过）
-            self._safe_get("https://hitun.io")
-            time.sleep(2)
+            self._safe_get(self.base_url)
+            time.sleep(self.deadline.cap(2, 'login'))
 
             # 立即注入 cookies，不等 Cloudflare（和手动 cookies 流程一致）
             for cookie in cookies:
                 try:
                     self.driver.add_cookie(cookie)
                 except Exception as e:
-                    self.logger.debug(f"添加 cookie 失败: {e}")
+                    self.logger.debug("添加 cookie 失败: %s", e)
 
             self.logger.info(f"已注入 {len(cookies)} 个 cookies，正在导航验证...")
 
             # 注入后直接导航到用户页面验证
-            self._safe_get("https://hitun.io/user")
-            time.sleep(5)
+            self._safe_get(f"{self.base_url}/user")
+            time.sleep(self.deadline.cap(5, 'login'))
+
+            if any(cookie.get('name') == 'cf_clearance' for cookie in cookies):
+                self._record_clearance_outcome()
+
+            # 挑战页面的 URL 仍是 /user，必须等挑战通过后再判断是否登录
+            cf_timeout = self._timeout('cloudflare', self.config.get('cloudflare_timeout', 60))
+            if not self._wait_for_cloudflare(max_wait=cf_timeout):
+                return False
 
             # 检查是否成功进入用户页面
             current_url = self.driver.current_url
@@ -395,6 +1026,8 @@ class HitunCheckin:
 
             self.logger.warning("pkl Cookies 已失效")
             return False
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             self.logger.warning(f"加载 cookies 失败: {e}")
             return False
@@ -410,18 +1043,7 @@ class HitunCheckin:
             title = self.driver.title.lower()
 
             # 检测 Cloudflare 挑战页面的特征
-            cf_indicators = [
-                'checking your browser',
-                'just a moment',
-                'please wait',
-                'cf-browser-verification',
-                'cf_chl_opt',
-                'turnstile',
-                'cf-turnstile',
-                'cloudflare'
-            ]
-
-            for indicator in cf_indicators:
+            for indicator in CLOUDFLARE_INDICATORS:
                 if indicator in page_source or indicator in title:
                     return True
 
@@ -442,16 +1064,21 @@ class HitunCheckin:
             return True
 
         self.logger.warning("检测到 Cloudflare 挑战，等待自动验证...")
+        self._record_proxy(challenge=True)
+        max_wait = self.deadline.cap(max_wait, 'cloudflare')
         start_time = time.time()
 
         while time.time() - start_time < max_wait:
-            time.sleep(2)
+            time.sleep(self.deadline.cap(2, 'cloudflare'))
             if not self._check_cloudflare_challenge():
+                self.history.record('cloudflare', time.time() - start_time)
                 self.logger.info("Cloudflare 挑战已通过")
                 return True
-            self.logger.debug(f"等待 Cloudflare 验证中... ({int(time.time() - start_time)}s)")
+            self.logger.debug("等待 Cloudflare 验证中... (%ds)", time.time() - start_time)
 
-        self.logger.error(f"Cloudflare 挑战等待超时 ({max_wait}s)")
+        self.history.record('cloudflare', time.time() - start_time, ok=False, timed_out=True)
+        self.logger.error(f"Cloudflare 挑战等待超时 ({max_wait:.0f}s)")
+        self.deadline.check('cloudflare')
         return False
 
     def _try_cookie_login(self) -> bool:
@@ -467,11 +1094,11 @@ class HitunCheckin:
                 return True
 
             # 只有未验证时才重新导航
-            self._safe_get("https://hitun.io/user")
-            time.sleep(5)
+            self._safe_get(f"{self.base_url}/user")
+            time.sleep(self.deadline.cap(5, 'login'))
 
             # 等待可能的 Cloudflare 挑战
-            cf_timeout = self.config.get('cloudflare_timeout', 60)
+            cf_timeout = self._timeout('cloudflare', self.config.get('cloudflare_timeout', 60))
             if not self._wait_for_cloudflare(max_wait=cf_timeout):
                 return False
 
@@ -484,49 +1111,77 @@ class HitunCheckin:
 
             self.logger.info("Cookie 已失效，需要重新登录")
             return False
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             self.logger.warning(f"Cookie 登录失败: {e}")
             return False
     
-    def login(self) -> bool:
+    def login(self, skip_cookies: bool = False) -> bool:
         """登录到 Hitun.io
 
+        优先使用保存的 cookies，失败时使用账号密码登录；
+        两种方式的耗时都会记录到运行历史，用于评估会话保活节省的时间。
+
+        Args:
+            skip_cookies: 已确认保存的会话失效时跳过 cookie 登录
+
         Returns:
             登录是否成功
         """
-        try:
-            self.logger.info("开始登录流程...")
+        self.login_method = None
+        self.logger.info("开始登录流程...")
+
+        # 首先尝试使用保存的 cookies 登录
+        if self.config.get('use_cookies', True) and not skip_cookies:
+            start_time = time.time()
+            if self._try_cookie_login():
+                self.history.record('cookie_login', time.time() - start_time)
+                self.login_method = 'cookie'
+                return True
+            self.logger.info("Cookie 登录失败，使用账号密码登录...")
 
-            # 首先尝试使用保存的 cookies 登录
-            if self.config.get('use_cookies', True):
-                if self._try_cookie_login():
-                    return True
-                self.logger.info("Cookie 登录失败，使用账号密码登录...")
+        start_time = time.time()
+        success = self._password_login()
+        self.history.record('password_login', time.time() - start_time, ok=success)
+        if success:
+            self.login_method = 'password'
+        return success
+
+    def _password_login(self) -> bool:
+        """使用账号密码登录
 
+        Returns:
+            登录是否成功
+        """
+        try:
             # 访问登录页面
-            login_url = "https://hitun.io/auth/login"
+            login_url = f"{self.base_url}/auth/login"
             self._safe_get(login_url)
             self.logger.info(f"访问登录页面: {login_url}")
 
             # 等待可能的 Cloudflare 挑战
-            cf_timeout = self.config.get('cloudflare_timeout', 30)
+            cf_timeout = self._timeout('cloudflare', self.config.get('cloudflare_timeout', 30))
             if not self._wait_for_cloudflare(max_wait=cf_timeout):
                 self.logger.error("无法通过 Cloudflare 验证")
                 return False
             
-            # 等待页面加载
-            time.sleep(3)
+            fast_submit = self.config.get('login_submit', 'fast') == 'fast'
+            if fast_submit:
+                # 快速提交只需要表单已经出现，不做固定等待
+                self._wait_for_element(By.ID, 'email', timeout=15)
+            else:
+                # 等待页面加载
+                time.sleep(self.deadline.cap(3, 'login'))
             
-            # 保存初始页面HTML用于调试
-            log_dir = Path('logs')
-            log_dir.mkdir(exist_ok=True)
-            html_path = log_dir / f"login_page_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
-            with open(html_path, 'w', encoding='utf-8') as f:
-                f.write(self.driver.page_source)
-            self.logger.info(f"已保存登录页面HTML: {html_path}")
+            page_source = self.driver.page_source
+
+            # 按调试/采样设置保存初始页面HTML
+            if self._should_capture_login_snapshot():
+                html_path = self.artifacts.save_html('login_page', page_source)
+                self.logger.info(f"已保存登录页面HTML: {html_path}")
             
             # 检查是否有验证码
-            page_source = self.driver.page_source
             if 'turnstile' in page_source.lower() or 'cf-turnstile' in page_source.lower():
                 self.logger.warning("检测到 Cloudflare Turnstile 验证码")
             if 'recaptcha' in page_source.lower():
@@ -534,98 +1189,31 @@ class HitunCheckin:
             if 'hcaptcha' in page_source.lower():
                 self.logger.warning("检测到 hCaptcha 验证码")
             
-            # 输入邮箱
-            email_input = self._wait_for_element(By.ID, 'email', timeout=15)
-            email_input.clear()
-            time.sleep(0.5)
-            email_input.send_keys(self.config['email'])
-            self.logger.info(f"输入邮箱: {self.config['email']}")
-            time.sleep(1)
-            
-            # 输入密码
-            password_input = self._wait_for_element(By.ID, 'passwd', timeout=15)
-            password_input.clear()
-            time.sleep(0.5)
-            password_input.send_keys(self.config['password'])
-            self.logger.info("输入密码")
-            time.sleep(1)
-            
-            # 检查是否有验证码需要等待
-            self.logger.info("等待可能的验证码处理...")
-            time.sleep(5)  # 给验证码更多时间
-            
-            # 尝试多种方式点击登录按钮
-            login_success = False
-            
-            # 方法1: 通过ID点击
-            try:
-                login_button = self._wait_for_element(By.ID, 'login', timeout=10)
-                self.logger.info("找到登录按钮(通过ID)")
-                
-                # 滚动到按钮位置
-                self.driver.execute_script("arguments[0].scrollIntoView(true);", login_button)
-                time.sleep(1)
-                
-                # 尝试点击
-                login_button.click()
-                self.logger.info("点击登录按钮(方法1: 直接点击)")
-                login_success = True
-            except Exception as e:
-                self.logger.warning(f"方法1失败: {e}")
-            
-            # 方法2: 使用JavaScript点击
-            if not login_success:
-                try:
-                    login_button = self.driver.find_element(By.ID, 'login')
-                    self.driver.execute_script("arguments[0].click();", login_button)
-                    self.logger.info("点击登录按钮(方法2: JavaScript点击)")
-                    login_success = True
-                except Exception as e:
-                    self.logger.warning(f"方法2失败: {e}")
-            
-            # 方法3: 提交表单
-            if not login_success:
-                try:
-                    form = self.driver.find_element(By.TAG_NAME, 'form')
-                    self.driver.execute_script("arguments[0].submit();", form)
-                    self.logger.info("提交登录表单(方法3: 表单提交)")
-                    login_success = True
-                except Exception as e:
-                    self.logger.warning(f"方法3失败: {e}")
-            
-            if not login_success:
-                self.logger.error("所有登录方法都失败了")
-                return False
-            
-            # 等待登录完成,检查是否跳转到用户页面
-            self.logger.info("等待登录响应...")
-            time.sleep(5)
+            form_started = time.time()
+            submit_mode = 'fast'
+            if not fast_submit or not self._fast_login_submit():
+                submit_mode = 'classic'
+                if not self._classic_login_submit():
+                    return False
+                # 等待登录完成,检查是否跳转到用户页面
+                self.logger.info("等待登录响应...")
+                time.sleep(self.deadline.cap(5, 'login'))
             
             # 检查是否有欢迎弹窗(登录成功后可能出现)
             try:
-                # 查找可能的弹窗按钮
-                popup_buttons = []
-                
-                # 尝试多种方式查找OK/确认按钮
-                try:
+                # 尝试多种方式查找OK/确认按钮 (按近期成功率排序)
+                _, popup_buttons = self._try_strategies('popup', {
                     # 查找包含"OK"或"确认"的按钮
-                    popup_buttons = self.driver.find_elements(By.XPATH, "//button[contains(text(), 'OK') or contains(text(), '确认') or contains(text(), '确定')]")
-                except:
-                    pass
-                
-                if not popup_buttons:
-                    try:
-                        # 查找swal2按钮(常见的弹窗库)
-                        popup_buttons = self.driver.find_elements(By.CLASS_NAME, 'swal2-confirm')
-                    except:
-                        pass
-                
-                if not popup_buttons:
-                    try:
-                        # 查找其他常见的确认按钮
-                        popup_buttons = self.driver.find_elements(By.XPATH, "//button[@class='confirm' or @class='btn-confirm']")
-                    except:
-                        pass
+                    'confirm_text': lambda: self.driver.find_elements(
+                        By.XPATH, "//button[contains(text(), 'OK') or contains(text(), '确认') or contains(text(), '确定')]"
+                    ),
+                    # 查找swal2按钮(常见的弹窗库)
+                    'swal2_confirm': lambda: self.driver.find_elements(By.CLASS_NAME, 'swal2-confirm'),
+                    # 查找其他常见的确认按钮
+                    'confirm_class': lambda: self.driver.find_elements(
+                        By.XPATH, "//button[@class='confirm' or @class='btn-confirm']"
+                    ),
+                }, log_level=logging.DEBUG, optional=True)
                 
                 # 如果找到弹窗按钮,点击它
                 if popup_buttons:
@@ -634,12 +1222,14 @@ class HitunCheckin:
                             if btn.is_displayed():
                                 self.logger.info(f"发现欢迎弹窗,点击确认按钮: {btn.text}")
                                 btn.click()
-                                time.sleep(2)
+                                time.sleep(self.deadline.cap(2, 'login'))
                                 break
                         except:
                             pass
+            except DeadlineExceeded:
+                raise
             except Exception as e:
-                self.logger.debug(f"检查弹窗时出错(可忽略): {e}")
+                self.logger.debug("检查弹窗时出错(可忽略): %s", e)
             
             # 多次检查URL变化和页面状态
             for i in range(3):
@@ -649,6 +1239,7 @@ class HitunCheckin:
                 # 检查URL是否包含user或dashboard
                 if 'user' in current_url or 'dashboard' in current_url:
                     self.logger.info(f"✅ 登录成功! 当前页面: {current_url}")
+                    self._record_form_latency(submit_mode, time.time() - form_started)
                     # 保存 cookies 供下次使用
                     if self.config.get('use_cookies', True):
                         self._save_cookies()
@@ -662,11 +1253,14 @@ class HitunCheckin:
                         # 检查是否在登录页面但显示欢迎信息(说明登录成功但未跳转)
                         if 'login' in current_url.lower():
                             self.logger.info("检测到登录成功(页面显示欢迎信息),尝试导航到用户页面...")
+                            # 表单耗时截止到出现欢迎信息，之后的导航不计入
+                            form_seconds = time.time() - form_started
                             # 直接导航到用户页面
-                            self._safe_get("https://hitun.io/user")
-                            time.sleep(3)
+                            self._safe_get(f"{self.base_url}/user")
+                            time.sleep(self.deadline.cap(3, 'login'))
                             if 'user' in self.driver.current_url:
                                 self.logger.info(f"✅ 登录成功! 已导航到用户页面")
+                                self._record_form_latency(submit_mode, form_seconds)
                                 # 保存 cookies 供下次使用
                                 if self.config.get('use_cookies', True):
                                     self._save_cookies()
@@ -674,22 +1268,14 @@ class HitunCheckin:
                 except:
                     pass
                 
-                time.sleep(2)
+                time.sleep(self.deadline.cap(2, 'login'))
             
             # 登录失败处理
             current_url = self.driver.current_url
             self.logger.error(f"❌ 登录失败,当前页面: {current_url}")
             
-            # 保存失败截图
-            screenshot_path = log_dir / f"login_failed_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-            self.driver.save_screenshot(str(screenshot_path))
-            self.logger.info(f"已保存登录失败截图: {screenshot_path}")
-            
-            # 保存失败时的HTML
-            html_fail_path = log_dir / f"login_failed_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
-            with open(html_fail_path, 'w', encoding='utf-8') as f:
-                f.write(self.driver.page_source)
-            self.logger.info(f"已保存失败页面HTML: {html_fail_path}")
+            # 保存失败截图和HTML
+            self._save_failure_artifacts('login_failed', "登录失败")
             
             # 尝试查找错误信息
             try:
@@ -740,12 +1326,143 @@ class HitunCheckin:
             
             return False
                 
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             self.logger.error(f"登录过程出错: {e}")
             import traceback
             self.logger.error(f"详细错误: {traceback.format_exc()}")
             return False
     
+    def _classic_login_submit(self) -> bool:
+        """逐字段输入邮箱密码并点击登录按钮 (每步之间固定等待，login_submit 为 classic 时使用)
+
+        Returns:
+            是否成功点击了登录按钮
+        """
+        # 输入邮箱
+        email_input = self._wait_for_element(By.ID, 'email', timeout=15)
+        email_input.clear()
+        time.sleep(self.deadline.cap(0.5, 'login'))
+        email_input.send_keys(self.config['email'])
+        self.logger.info(f"输入邮箱: {self.config['email']}")
+        time.sleep(self.deadline.cap(1, 'login'))
+        
+        # 输入密码
+        password_input = self._wait_for_element(By.ID, 'passwd', timeout=15)
+        password_input.clear()
+        time.sleep(self.deadline.cap(0.5, 'login'))
+        password_input.send_keys(self.config['password'])
+        self.logger.info("输入密码")
+        time.sleep(self.deadline.cap(1, 'login'))
+        
+        # 检查是否有验证码需要等待
+        self.logger.info("等待可能的验证码处理...")
+        time.sleep(self.deadline.cap(5, 'login'))  # 给验证码更多时间
+        
+        # 尝试多种方式点击登录按钮 (按近期成功率排序)
+        def click_by_id():
+            login_button = self._wait_for_element(By.ID, 'login', timeout=10)
+            self.logger.info("找到登录按钮(通过ID)")
+            # 滚动到按钮位置
+            self.driver.execute_script("arguments[0].scrollIntoView(true);", login_button)
+            time.sleep(self.deadline.cap(1, 'login'))
+            login_button.click()
+            self.logger.info("点击登录按钮(直接点击)")
+            return True
+
+        def click_by_js():
+            login_button = self.driver.find_element(By.ID, 'login')
+            self.driver.execute_script("arguments[0].click();", login_button)
+            self.logger.info("点击登录按钮(JavaScript点击)")
+            return True
+
+        def submit_form():
+            form = self.driver.find_element(By.TAG_NAME, 'form')
+            self.driver.execute_script("arguments[0].submit();", form)
+            self.logger.info("提交登录表单(表单提交)")
+            return True
+
+        strategy, _ = self._try_strategies('login_button', {
+            'id_click': click_by_id,
+            'js_click': click_by_js,
+            'form_submit': submit_form,
+        })
+        if not strategy:
+            self.logger.error("所有登录方法都失败了")
+            return False
+        return True
+
+    def _fast_login_submit(self) -> bool:
+        """一次 execute_script 往返内填写表单并提交
+
+        只有页面上确实存在验证码组件时才等待其给出 token (最多 captcha_timeout 秒)，
+        随后提交并等待跳转到用户页面。
+
+        Returns:
+            False 表示页面上找不到表单字段或脚本执行失败，调用方改用逐字段输入
+        """
+        try:
+            result = self.driver.execute_script(
+                self.LOGIN_FILL_SCRIPT, self.config['email'], self.config['password'], self.CAPTCHA_SELECTOR
+            ) or {}
+        except Exception as e:
+            self.logger.warning(f"快速提交登录表单失败，改用逐字段输入: {e}")
+            return False
+        if not result.get('fields'):
+            self.logger.info("快速提交未找到邮箱/密码输入框，改用逐字段输入")
+            return False
+        self.logger.info(f"已填写登录表单: {self.config['email']}")
+
+        if result.get('captcha'):
+            self.logger.info(f"检测到验证码组件 ({result['captcha']})，等待验证完成...")
+            if not self._wait_for_captcha_token():
+                self.logger.warning("验证码未在限定时间内完成，仍尝试提交")
+            result['submitted'] = self.driver.execute_script(self.LOGIN_SUBMIT_JS)
+        if not result.get('submitted'):
+            self.logger.info("快速提交未找到登录按钮或表单，改用逐字段输入")
+            return False
+        self.logger.info(f"提交登录表单 ({result['submitted']})，等待跳转...")
+        self._wait_for_login_redirect()
+        return True
+
+    def _wait_for_captcha_token(self) -> bool:
+        """等待验证码组件给出 token"""
+        timeout = self.deadline.cap(self.config.get('captcha_timeout', 15), 'login')
+        start_time = time.time()
+        while time.time() - start_time < timeout:
+            if self.driver.execute_script(self.CAPTCHA_TOKEN_SCRIPT):
+                self.logger.info(f"验证码已完成 ({time.time() - start_time:.1f}s)")
+                return True
+            time.sleep(self.deadline.cap(0.5, 'login'))
+        self.deadline.check('login')
+        return False
+
+    def _wait_for_login_redirect(self) -> bool:
+        """轮询等待提交后跳转到用户页面，页面出现错误提示时提前结束"""
+        timeout = self.deadline.cap(self.config.get('login_redirect_timeout', 15), 'login')
+        start_time = time.time()
+        while time.time() - start_time < timeout:
+            try:
+                current_url = self.driver.current_url
+                if 'user' in current_url or 'dashboard' in current_url:
+                    return True
+                if self.driver.find_elements(By.CLASS_NAME, 'alert-danger'):
+                    return False
+            except Exception:
+                # 页面跳转过程中的瞬时错误
+                pass
+            time.sleep(self.deadline.cap(0.25, 'login'))
+        self.deadline.check('login')
+        return False
+
+    def _record_form_latency(self, mode: str, seconds: float):
+        """记录从开始填写登录表单到跳转到用户页面的耗时，按提交方式分别统计"""
+        self.history.record(f"login_form_{mode}", seconds)
+        baseline = percentile(self.history.durations('login_form_classic'), 50)
+        comparison = f"，逐字段输入 P50 {baseline:.1f}s" if mode == 'fast' and baseline is not None else ''
+        self.logger.info(f"登录表单到跳转耗时 {seconds:.2f}s ({mode}){comparison}")
+
     def checkin(self) -> tuple[bool, Optional[str]]:
         """执行签到操作
         
@@ -758,42 +1475,38 @@ class HitunCheckin:
             # 确保在用户页面（避免不必要的导航触发 Cloudflare）
             current_url = self.driver.current_url
             if 'user' not in current_url and 'dashboard' not in current_url:
-                self._safe_get("https://hitun.io/user")
-                time.sleep(2)
-            
-            # 查找签到按钮 - 尝试多种方式定位
-            checkin_button = None
-            
-            # 方法1: 通过按钮文本查找
-            try:
-                checkin_button = self.driver.find_element(
-                    By.XPATH, 
-                    "//button[contains(text(), '签到') or contains(text(), '>_ 签到')]"
-                )
-                self.logger.info("通过文本找到签到按钮")
-            except NoSuchElementException:
-                pass
+                self._safe_get(f"{self.base_url}/user")
+                time.sleep(self.deadline.cap(2, 'checkin'))
             
-            # 方法2: 通过 class 查找(根据截图,按钮可能有特定的 class)
-            if not checkin_button:
+            # 查找签到按钮 - 尝试多种方式定位 (按近期成功率排序)
+            def find_by_text():
                 try:
-                    # 等待签到区域加载
-                    time.sleep(2)
-                    buttons = self.driver.find_elements(By.TAG_NAME, 'button')
-                    for btn in buttons:
-                        if '签到' in btn.text:
-                            checkin_button = btn
-                            self.logger.info("通过遍历按钮找到签到按钮")
-                            break
-                except Exception as e:
-                    self.logger.warning(f"遍历按钮时出错: {e}")
+                    button = self.driver.find_element(
+                        By.XPATH,
+                        "//button[contains(text(), '签到') or contains(text(), '>_ 签到')]"
+                    )
+                except NoSuchElementException:
+                    return None
+                self.logger.info("通过文本找到签到按钮")
+                return button
+
+            def find_by_scan():
+                for btn in self.driver.find_elements(By.TAG_NAME, 'button'):
+                    if '签到' in btn.text:
+                        self.logger.info("通过遍历按钮找到签到按钮")
+                        return btn
+                return None
+
+            # 后备策略执行前等待签到区域加载
+            _, checkin_button = self._try_strategies('checkin_button', {
+                'xpath_text': find_by_text,
+                'scan_buttons': find_by_scan,
+            }, fallback_delay=2)
             
             if not checkin_button:
                 self.logger.error("未找到签到按钮")
                 # 保存页面截图用于调试
-                screenshot_path = f"logs/error_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-                self.driver.save_screenshot(screenshot_path)
-                self.logger.info(f"已保存错误截图: {screenshot_path}")
+                self._save_failure_artifacts('error', "错误")
                 return False, None
             
             # 检查按钮是否可点击
@@ -807,7 +1520,7 @@ class HitunCheckin:
             self.logger.info("点击签到按钮")
             
             # 等待签到结果
-            time.sleep(3)
+            time.sleep(self.deadline.cap(3, 'checkin'))
             
             # 尝试获取签到结果信息
             traffic = None
@@ -823,66 +1536,44 @@ class HitunCheckin:
                         (By.XPATH, "//*[contains(@class, 'message')]"),
                     ]
                     
-                    popup_text = None
+                    popup = None
                     for by, value in popup_selectors:
                         try:
                             elements = self.driver.find_elements(by, value)
                             for elem in elements:
                                 if elem.is_displayed():
                                     text = elem.text.strip()
-                                    if text and ('获得' in text or '奖励' in text or '流量' in text):
-                                        popup_text = text
-                                        self.logger.info(f"找到弹窗消息: {popup_text}")
+                                    parsed = parse_message(text) if text else None
+                                    if parsed and (parsed.succeeded or parsed.already_checked_in or '奖励' in text or '流量' in text):
+                                        popup = parsed
+                                        self.logger.info(f"找到弹窗消息: {text}")
                                         break
-                            if popup_text:
+                            if popup:
                                 break
                         except:
                             pass
                     
-                    # 从弹窗文本中提取流量
-                    if popup_text:
-                        import re
-                        # 尝试多种匹配模式
-                        patterns = [
-                            r'获得[了]?\s*(\d+)\s*M',  # 获得 XXM 或 获得了 XXM
-                            r'奖励[了]?\s*(\d+)\s*M',  # 奖励 XXM
-                            r'(\d+)\s*M[B]?\s*流量',   # XXM流量 或 XXMB流量
-                            r'流量[：:]\s*(\d+)\s*M',  # 流量: XXM
-                        ]
-                        
-                        for pattern in patterns:
-                            match = re.search(pattern, popup_text)
-                            if match:
-                                traffic = match.group(1)
-                                self.logger.info(f"✅ 从弹窗提取到流量: {traffic}M (模式: {pattern})")
-                                break
+                    if popup and popup.already_checked_in:
+                        self.logger.info("今天已经签到过了")
+                        return True, None
+                    if popup and popup.traffic:
+                        traffic = self._log_traffic(popup, '弹窗')
                 except Exception as e:
-                    self.logger.debug(f"从弹窗提取流量失败: {e}")
+                    self.logger.debug("从弹窗提取流量失败: %s", e)
                 
-                # 如果从弹窗提取失败,尝试从页面源码提取
+                # 如果从弹窗提取失败,从页面源码提取 (页面源码只取一次，同时用于确认签到结果)
+                page = None
                 if not traffic:
                     page_source = self.driver.page_source
-                    self.logger.debug(f"页面源码片段(用于调试): {page_source[page_source.find('签到') if '签到' in page_source else 0:page_source.find('签到')+500 if '签到' in page_source else 500]}")
-                    
-                    import re
-                    # 尝试多种匹配模式
-                    patterns = [
-                        r'获得[了]?\s*(\d+)\s*M',
-                        r'奖励[了]?\s*(\d+)\s*M',
-                        r'(\d+)\s*M[B]?\s*流量',
-                        r'流量[：:]\s*(\d+)\s*M',
-                    ]
-                    
-                    for pattern in patterns:
-                        match = re.search(pattern, page_source)
-                        if match:
-                            traffic = match.group(1)
-                            self.logger.info(f"✅ 从页面源码提取到流量: {traffic}M (模式: {pattern})")
-                            break
+                    if self.logger.isEnabledFor(logging.DEBUG):
+                        anchor = max(page_source.find('签到'), 0)
+                        self.logger.debug("页面源码片段(用于调试): %s", page_source[anchor:anchor + 500])
+                    page = parse_page(page_source)
+                    if page.traffic:
+                        traffic = self._log_traffic(page, '页面源码')
                 
                 # 检查是否有成功提示
-                page_source = self.driver.page_source
-                if '签到成功' in page_source or '获得' in page_source:
+                if (popup and popup.succeeded) or (page and page.succeeded):
                     self.logger.info("✅ 签到成功!")
                     if traffic:
                         self.logger.info(f"🎉 获得流量: {traffic}M")
@@ -898,10 +1589,97 @@ class HitunCheckin:
                 # 即使获取结果失败,也认为签到成功
                 return True, traffic
                 
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             self.logger.error(f"签到过程出错: {e}")
             return False, None
     
+    def _log_traffic(self, result: CheckinResult, source: str) -> str:
+        """记录从签到结果中提取到的流量 (MB)，返回流量文本"""
+        original = f" (原文: {result.amount}{result.unit}B)" if result.unit != 'M' else ''
+        self.logger.info(f"✅ 从{source}提取到流量: {result.traffic}M (模式: {result.pattern}){original}")
+        return result.traffic
+
+    def http_checkin(self) -> tuple[str, Optional[str]]:
+        """不启动浏览器，用保存的会话直接调用签到接口
+
+        Returns:
+            (结果, 获得的流量)；结果为 ok (签到成功或今天已签到) / expired (没有会话或会话已失效) /
+            failed (Cloudflare 挑战、接口异常等，会话可能仍然有效)
+        """
+        start_time = time.time()
+        record = self._read_session()
+        if not record or not record['cookies']:
+            return 'expired', None
+
+        cookies = record['cookies']
+        fingerprint = self._session_fingerprint(record)
+        session = build_session(cookies, (fingerprint or {}).get('userAgent'), proxy=self.proxy)
+        if self.recorder:
+            self.recorder.attach(session)
+        try:
+            timeout = self.deadline.cap(self.config.get('http_checkin_timeout', 15), 'http_checkin')
+            response = session.get(f"{self.base_url}/user", timeout=timeout)
+            self._record_proxy(time.time() - start_time)
+            if is_challenge(response):
+                self._record_proxy(challenge=True)
+                self.logger.info("HTTP 签到遇到 Cloudflare 挑战，改用浏览器")
+                return 'failed', None
+            if not is_logged_in(response):
+                self.logger.info(f"HTTP 验证会话失效: {response.url}")
+                return 'expired', None
+            result = post_checkin(session, self.base_url, timeout)
+        except Exception as e:
+            self.logger.warning(f"HTTP 签到请求失败: {e}")
+            if is_proxy_error(e):
+                self._record_proxy(failed=True)
+            return 'failed', None
+        finally:
+            session.close()
+
+        message = str(result.get('msg', ''))
+        parsed = parse_message(message)
+        if result.get('ret') == 1:
+            traffic = self._log_traffic(parsed, '签到接口') if parsed.traffic else None
+        elif parsed.already_checked_in:
+            traffic = None
+        else:
+            self.logger.warning(f"HTTP 签到接口返回失败: {message[:100]}")
+            return 'failed', None
+
+        self.history.record('http_checkin', time.time() - start_time)
+        self.logger.info(f"✅ HTTP 签到成功 ({time.time() - start_time:.1f}s): {message[:100]}")
+        try:
+            self._write_cookies(export_cookies(session, cookies), fingerprint)
+        except Exception as e:
+            self.logger.warning(f"保存刷新后的 cookies 失败: {e}")
+        return 'ok', traffic
+
+    def _should_speculate(self) -> bool:
+        """是否在启动浏览器的同时尝试 HTTP 签到
+
+        共享浏览器中创建上下文很快，且后台关闭上下文会与下一个账号争用同一个浏览器，因此不启用。
+        """
+        return (self.config.get('speculative_http_checkin', False)
+                and self.config.get('use_cookies', True)
+                and not self.browser
+                and bool(self._peek_cookies()))
+
+    def _launch_driver_async(self) -> Future:
+        """在后台线程中启动浏览器"""
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='browser-launch')
+        future = executor.submit(self._init_driver)
+        executor.shutdown(wait=False)
+        return future
+
+    def _abandon_launch(self, launch: Future):
+        """HTTP 签到已完成，取消尚未开始的浏览器启动，已在启动的浏览器就绪后立即关闭"""
+        if launch.cancel():
+            return
+        self.logger.info("HTTP 签到已完成，取消浏览器启动")
+        launch.add_done_callback(lambda _: self._close_driver())
+
     def _run_once(self) -> tuple[bool, Optional[str]]:
         """执行一次完整的签到流程（初始化浏览器 -> 登录 -> 签到）
 
@@ -909,13 +1687,45 @@ class HitunCheckin:
             (是否成功, 获得的流量)
         """
         traffic = None
+        self.last_failure = None
+        self._select_proxy()
+
+        # 网络预检：站点 (使用代理时为代理) 不可达时不启动浏览器
+        if self.config.get('preflight', True):
+            with timed('网络预检'):
+                result = self._preflight()
+            if not result.ok:
+                self.logger.warning(f"网络预检失败，跳过本次浏览器启动: {result.summary()}")
+                self.last_failure = ('preflight', result.summary())
+                return False, None
+            self.logger.info(f"网络预检通过: {result.summary()}")
+
+        launch: Optional[Future] = None
+        skip_cookies = False
         try:
-            # 初始化浏览器
-            self._init_driver()
+            if self._should_speculate():
+                # 浏览器在后台启动的同时用 HTTP 验证会话并签到，成功则不再需要浏览器
+                launch = self._launch_driver_async()
+                with timed('HTTP 签到'):
+                    outcome, traffic = self.http_checkin()
+                if outcome == 'ok':
+                    self.login_method = 'cookie'
+                    self._abandon_launch(launch)
+                    return True, traffic
+                # 会话已确认失效时浏览器中的 cookie 登录也必然失败，直接使用密码登录
+                skip_cookies = outcome == 'expired'
+                self.logger.info("HTTP 签到未完成，使用浏览器继续...")
+                with timed('等待浏览器启动'):
+                    launch.result()
+            else:
+                # 初始化浏览器
+                with timed('启动浏览器'):
+                    self._init_driver()
 
             # 登录
-            if not self.login():
+            if not self.login(skip_cookies=skip_cookies):
                 self.logger.error("登录失败")
+                self.last_failure = ('login', "登录失败")
                 return False, None
 
             # 签到
@@ -925,24 +1735,66 @@ class HitunCheckin:
                 return True, traffic
             else:
                 self.logger.error("❌ 签到失败")
+                self.last_failure = ('checkin', "签到失败")
                 return False, traffic
 
+        except DeadlineExceeded as e:
+            self.logger.error(str(e))
+            self.last_failure = ('deadline', self.deadline.describe())
+            return False, traffic
         except Exception as e:
             self.logger.error(f"执行过程中发生错误: {e}")
+            self.last_failure = ('error', str(e)[:200])
             return False, traffic
         finally:
-            # 清理资源
-            if self.driver:
-                try:
-                    self.driver.quit()
-                except Exception:
-                    pass
-                self.driver = None
-                self.logger.info("浏览器已关闭")
+            # 清理资源 (被取消的后台启动由回调在浏览器就绪后关闭)
+            if launch is None or launch.done():
+                self._close_driver()
+
+    def _run_lock(self) -> RunLock:
+        """本账号的运行锁"""
+        return RunLock(self._account_file('run', '.lock'), self._account_file('last_result', '.json'),
+                       logger=self.logger)
 
     def run(self) -> bool:
         """运行完整的签到流程，失败时自动重试
 
+        同一账号同一时间只会有一次运行 (跨进程)；后到的调用等待进行中的运行结束并复用其结果。
+
+        Returns:
+            整体流程是否成功
+        """
+        lock = self._run_lock()
+        requested_at = time.time()
+        if not lock.acquire(timeout=self.config.get('run_lock_timeout', 1800)):
+            self.logger.error("等待其他进程的签到超时，放弃本次运行")
+            self.last_failure = ('lock', "等待其他进程的签到超时")
+            return False
+        try:
+            if lock.waited:
+                shared = lock.result_since(requested_at)
+                if shared:
+                    self.logger.info(
+                        f"复用 pid {shared.get('pid')} 刚完成的签到结果: {'成功' if shared['success'] else '失败'}"
+                    )
+                    self.login_method = None
+                    self.last_traffic = shared.get('traffic')
+                    self.last_failure = tuple(shared['failure']) if shared.get('failure') else None
+                    return shared['success']
+            success = self._run_attempts()
+            lock.write_result({
+                'pid': os.getpid(),
+                'success': success,
+                'traffic': self.last_traffic,
+                'failure': list(self.last_failure) if self.last_failure and not success else None,
+            })
+            return success
+        finally:
+            lock.release()
+
+    def _run_attempts(self) -> bool:
+        """带重试的签到流程，结束后保存运行数据并发送通知
+
         Returns:
             整体流程是否成功
         """
@@ -951,25 +1803,97 @@ class HitunCheckin:
         success = False
         traffic = None
 
+        run_id = uuid.uuid4().hex[:8]
+        set_log_context(run_id=run_id, account=self.account_name)
+        self.deadline = RunDeadline(self.config.get('run_deadline', 900), clock=lambda: time.monotonic())
+        if self.config.get('timing_report', False):
+            self.timing = TimingReport(
+                Path(self.config.get('log_dir', 'logs')) / 'timing', run_id, self.account_name
+            )
+        if self.config.get('record_fixtures', False):
+            fixture_dir = Path(self.config.get('fixture_dir') or Path(self.config.get('log_dir', 'logs')) / 'fixtures')
+            # 录制模块依赖 http.server，只在开启录制时导入
+            self.recorder = lazy_import('fixtures').FixtureRecorder(
+                fixture_dir / f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{self.account_name}_{run_id}",
+                self.base_url,
+                secrets=[self.config.get('email'), self.config.get('password')],
+                logger=self.logger,
+            )
+
         self.logger.info("=" * 50)
         self.logger.info(f"开始执行签到任务 - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        if self.account:
+            self.logger.info(f"账号: {self.account_name}")
+        if self.config.get('adaptive_timeouts', True):
+            self.logger.info(
+                f"自适应超时: 页面加载 {self._timeout('page_load', self.config.get('timeout', 60))}s, "
+                f"Cloudflare {self._timeout('cloudflare', self.config.get('cloudflare_timeout', 30))}s, "
+                f"登录表单元素 {self._timeout('element:email', 15)}s"
+            )
+        if self.deadline.enabled:
+            self.logger.info(f"整体运行时限: {self.deadline.seconds}s")
         self.logger.info("=" * 50)
 
         for attempt in range(1, max_attempts + 1):
             if attempt > 1:
-                self.logger.info(f"--- 第 {attempt}/{max_attempts} 次尝试 (等待 {retry_delay}s) ---")
-                time.sleep(retry_delay)
+                # 预检失败说明站点不可达，按预检重试间隔等待网络恢复
+                delay = retry_delay
+                if self.last_failure and self.last_failure[0] == 'preflight':
+                    delay = self.config.get('preflight_retry_delay', retry_delay)
+                if delay >= self.deadline.remaining():
+                    # 等待结束时预算已经用完，不再重试
+                    self.deadline.exhaust('retry_delay')
+                    self.last_failure = ('deadline', self.deadline.describe())
+                    self.logger.error(f"剩余时限 {self.deadline.remaining():.0f}s 不足以等待 {delay}s 后重试，放弃重试")
+                    break
+                self.logger.info(f"--- 第 {attempt}/{max_attempts} 次尝试 (等待 {delay}s) ---")
+                time.sleep(delay)
 
             success, traffic = self._run_once()
             if success:
                 break
 
             self.logger.warning(f"第 {attempt}/{max_attempts} 次尝试失败")
+            if self.deadline.expired:
+                if not self.last_failure or self.last_failure[0] != 'deadline':
+                    # 个别阶段吞掉了 DeadlineExceeded (如只返回 False)，以时限为准
+                    self.deadline.exhaust(self.last_failure[0] if self.last_failure else 'unknown')
+                    self.last_failure = ('deadline', self.deadline.describe())
+                    self.logger.error(self.deadline.describe())
+                break
+
+        self.last_traffic = traffic if success else None
 
         self.logger.info("=" * 50)
         self.logger.info(f"任务结束 - 状态: {'成功' if success else '失败'}")
         self.logger.info("=" * 50)
 
+        # 保存本次各阶段耗时和定位策略成功率，供后续运行使用
+        self.last_phases = self.history.pending_summary()
+        try:
+            self.history.flush()
+            self.strategies.flush()
+            if self.proxies:
+                self.proxies.flush()
+        except Exception as e:
+            self.logger.warning(f"保存运行历史失败: {e}")
+        if self.timing:
+            try:
+                self.timing.save()
+                self.logger.info(f"页面计时报告: {self.timing.path}")
+            except Exception as e:
+                self.logger.warning(f"保存页面计时报告失败: {e}")
+        if self.recorder:
+            try:
+                path = self.recorder.save(account=self.account_name, run_id=run_id, success=success,
+                                          traffic=traffic if success else None)
+                if path:
+                    self.logger.info(f"请求录制: {path} ({len(self.recorder.entries)} 个请求)")
+            except Exception as e:
+                self.logger.warning(f"保存请求录制失败: {e}")
+            self.recorder = None
+        self.artifacts.flush()
+
         # 发送推送通知
         if self.notifier:
             try:
@@ -980,8 +1904,13 @@ class HitunCheckin:
                         details=f"签到时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
                     )
                 else:
+                    error_msg = "签到流程执行失败"
+                    if self.last_failure and self.last_failure[0] == 'preflight':
+                        error_msg = f"站点不可达 ({self.last_failure[1]})"
+                    elif self.last_failure and self.last_failure[0] == 'deadline':
+                        error_msg = self.last_failure[1]
                     self.notifier.send_checkin_failure(
-                        error_msg="签到流程执行失败",
+                        error_msg=error_msg,
                         details=f"失败时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\\n请查看日志文件获取详细信息"
                     )
             except Exception as e:
@@ -990,6 +1919,89 @@ class HitunCheckin:
         return success
 
 
+def run_accounts(config_path: str, record_fixtures: bool = False) -> bool:
+    """为配置中的所有账号依次执行签到
+
+    开启 shared_browser 时所有账号共用一个 Chrome 进程，
+    每个账号在独立的浏览器上下文 (Target.createBrowserContext) 中运行，
+    cookie 互相隔离，N 个账号只需支付一个浏览器的基础内存。
+
+    Args:
+        config_path: 配置文件路径
+        record_fixtures: 录制本次运行的请求 (相当于配置 record_fixtures)
+
+    Returns:
+        是否所有账号都签到成功
+    """
+    config = load_config(config_path)
+    accounts = load_accounts(config)
+    checkins = [HitunCheckin(config_path, account=account) for account in accounts]
+    logger = checkins[0].logger
+    if record_fixtures:
+        for checkin in checkins:
+            checkin.config['record_fixtures'] = True
+
+    browser = None
+    if config.get('shared_browser', False) and len(checkins) > 1:
+        try:
+            browser = SharedBrowser.launch(checkins[0])
+            logger.info(f"共享浏览器模式: {len(checkins)} 个账号共用一个 Chrome 进程")
+        except Exception as e:
+            logger.warning(f"共享浏览器启动失败，改为每个账号独立启动浏览器: {e}")
+
+    results = {}
+    try:
+        for checkin in checkins:
+            checkin.browser = browser
+            results[checkin.account_name] = checkin.run()
+    finally:
+        if browser:
+            for line in browser.memory_report().splitlines():
+                logger.info(line)
+            browser.quit()
+
+    succeeded = sum(1 for ok in results.values() if ok)
+    logger.info(f"多账号签到完成: {succeeded}/{len(results)} 成功")
+    for name, ok in results.items():
+        logger.info(f"  {name}: {'成功' if ok else '失败'}")
+    return succeeded == len(results)
+
+
+def run_coordinator(args) -> bool:
+    """协调者模式的命令行入口 (--seed-accounts / --coordinator-status / --worker)"""
+    from coordinator import CoordinatorWorker, create_lease_store
+
+    config = load_config(args.config, require_credentials=False)
+    store = create_lease_store(config.get('coordinator'), Path(config.get('data_dir', 'data')))
+    if args.seed_accounts:
+        if not config.get('accounts'):
+            raise ValueError("配置中没有 accounts，无法写入账号表")
+        count = store.register(config['accounts'])
+        print(f"已写入 {count} 个账号到 {store.describe()}")
+    if args.coordinator_status:
+        print(json.dumps(store.status(), ensure_ascii=False, indent=2))
+    if not args.worker:
+        return True
+
+    worker = CoordinatorWorker(args.config, store=store)
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    return worker.run(forever=args.worker_loop, schedule=args.schedule)
+
+
+def run_log_stats(args) -> bool:
+    """统计配置中 log_dir 下的签到日志 (配置文件不存在时使用 logs)"""
+    from log_analytics import analyze, render
+
+    log_dir = 'logs'
+    if os.path.exists(args.config):
+        with open(args.config, 'r', encoding='utf-8') as f:
+            log_dir = json.load(f).get('log_dir', log_dir)
+    rows = analyze(Path(log_dir), args.source, args.since, args.until, args.account)
+    print(render(rows, args.format))
+    return bool(rows)
+
+
 def main():
     """主函数"""
     import argparse
@@ -1005,22 +2017,112 @@ def main():
         action='store_true',
         help='仅测试登录功能'
     )
+    parser.add_argument(
+        '--daemon',
+        action='store_true',
+        help='常驻运行: 按计划签到并在两次签到之间保持会话活跃'
+    )
+    parser.add_argument(
+        '--schedule',
+        help='常驻模式的每日签到时间，如 "30 8 * * *" 或 "08:30" (默认读取配置 schedule)'
+    )
+    parser.add_argument(
+        '--run-on-start',
+        action='store_true',
+        help='常驻模式启动时立即签到一次'
+    )
+    parser.add_argument(
+        '--worker',
+        action='store_true',
+        help='协调者模式: 从共享账号表 (配置 coordinator) 租用待签到的账号，处理完后退出'
+    )
+    parser.add_argument(
+        '--worker-loop',
+        action='store_true',
+        help='与 --worker 一起使用: 持续运行，每天到达签到时间后继续租用账号'
+    )
+    parser.add_argument(
+        '--seed-accounts',
+        action='store_true',
+        help='把配置中的 accounts 写入共享账号表 (替换表中的账号列表)'
+    )
+    parser.add_argument(
+        '--coordinator-status',
+        action='store_true',
+        help='输出共享账号表中各账号的租约与签到状态'
+    )
+    parser.add_argument(
+        '--record-fixtures',
+        action='store_true',
+        help='录制本次运行与站点之间的全部请求和响应，保存为可离线回放的夹具包 (见 fixtures.py)'
+    )
+    parser.add_argument(
+        '--log-stats',
+        action='store_true',
+        help='统计日志目录 (含轮转和 .gz 压缩的日志) 中每天的签到耗时、成功率、重试次数和流量'
+    )
+    parser.add_argument(
+        '--profile-startup',
+        action='store_true',
+        help='结束时输出模块导入和初始化各步骤的耗时'
+    )
+    from log_analytics import add_arguments as add_log_stats_arguments
+    add_log_stats_arguments(parser.add_argument_group('日志统计 (与 --log-stats 一起使用)'))
     
     args = parser.parse_args()
+    age = process_age()
+    if age is not None:
+        record('进程启动到 main() (解释器与模块导入)', age)
     
     try:
-        checkin = HitunCheckin(config_path=args.config)
+        if args.daemon:
+            with timed('import daemon'):
+                from daemon import CheckinDaemon
+            with timed('初始化常驻进程'):
+                daemon = CheckinDaemon(args.config, schedule=args.schedule, run_on_start=args.run_on_start)
+            daemon.run_forever()
+            sys.exit(0)
+
+        if args.log_stats:
+            sys.exit(0 if run_log_stats(args) else 1)
+
+        if args.worker or args.seed_accounts or args.coordinator_status:
+            sys.exit(0 if run_coordinator(args) else 1)
+
+        with timed('加载配置'):
+            config = load_config(args.config)
+        if config.get('accounts') and not args.test_login:
+            # 多账号签到流程
+            success = run_accounts(args.config, record_fixtures=args.record_fixtures)
+            sys.exit(0 if success else 1)
+
+        # 测试登录时多账号配置只使用第一个账号
+        account = config['accounts'][0] if config.get('accounts') else None
+        with timed('初始化签到实例'):
+            checkin = HitunCheckin(config_path=args.config, account=account)
+        if args.record_fixtures:
+            checkin.config['record_fixtures'] = True
         
         if args.test_login:
-            # 仅测试登录
-            checkin._init_driver()
-            success = checkin.login()
-            if success:
-                print("✅ 登录测试成功!")
-                time.sleep(3)  # 让用户看到登录后的页面
-            else:
-                print("❌ 登录测试失败!")
-            checkin.driver.quit()
+            # 仅测试登录 (与签到互斥，避免同时写 cookies)
+            lock = checkin._run_lock()
+            lock.acquire(purpose='test-login')
+            try:
+                # 与正式签到使用同一个出口代理
+                checkin._select_proxy()
+                with timed('启动浏览器'):
+                    checkin._init_driver()
+                success = checkin.login()
+                if success:
+                    print("✅ 登录测试成功!")
+                    time.sleep(3)  # 让用户看到登录后的页面
+                else:
+                    print("❌ 登录测试失败!")
+                checkin.driver.quit()
+            finally:
+                lock.release()
+                if checkin.proxies:
+                    checkin.proxies.flush()
             sys.exit(0 if success else 1)
         else:
             # 完整签到流程
@@ -1030,6 +2132,9 @@ def main():
     except Exception as e:
         print(f"❌ 错误: {e}")
         sys.exit(1)
+    finally:
+        if args.profile_startup:
+            print(report(), file=sys.stderr)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+无浏览器 HTTP 会话模块
+复用浏览器保存的 cookie 罐和 UA，用 requests 直接访问站点，
+用于会话保活等不需要完整浏览器的轻量操作
+"""
+
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from proxy_pool import requests_proxies
+from startup_profile import lazy_import
+
+if TYPE_CHECKING:
+    import requests
+
+# Cloudflare 挑战页面的特征
+CLOUDFLARE_INDICATORS = [
+    'checking your browser',
+    'just a moment',
+    'please wait',
+    'cf-browser-verification',
+    'cf_chl_opt',
+    'turnstile',
+    'cf-turnstile',
+    'cloudflare'
+]
+
+
+def build_session(cookies: List[Dict[str, Any]], user_agent: Optional[str] = None,
+                  proxy: Optional[str] = None) -> 'requests.Session':
+    """根据 Selenium 格式的 cookies 构建 requests 会话
+
+    Args:
+        cookies: driver.get_cookies() 格式的 cookie 列表
+        user_agent: 与 cookies 绑定的浏览器 UA
+        proxy: 出口代理，应与保存 cookies 的浏览器使用同一个 (cf_clearance 与出口 IP 绑定)
+    """
+    session = lazy_import('requests').Session()
+    if proxy:
+        session.proxies.update(requests_proxies(proxy))
+        # 不读取 HTTP(S)_PROXY 等环境变量，避免覆盖账号分到的代理
+        session.trust_env = False
+    if user_agent:
+        session.headers['User-Agent'] = user_agent
+    session.headers['Accept'] = 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8'
+    for cookie in cookies:
+        session.cookies.set(
+            cookie['name'], cookie['value'],
+            domain=cookie.get('domain', ''), path=cookie.get('path', '/'),
+            secure=cookie.get('secure', False), expires=cookie.get('expiry'),
+        )
+    return session
+
+
+def export_cookies(session: 'requests.Session', original: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """把会话中的 cookies 转回 Selenium 格式
+
+    保留原有 cookie 的 httpOnly/sameSite 等属性，只更新值和过期时间，
+    服务器新下发的 cookie 追加到末尾。
+    """
+    # 域名忽略前导点比较: 服务器轮换的 host-only cookie 应覆盖浏览器保存的 .domain cookie
+    merged = {(c['name'], c.get('domain', '').lstrip('.')): dict(c) for c in original}
+    for jar_cookie in session.cookies:
+        key = (jar_cookie.name, jar_cookie.domain.lstrip('.'))
+        entry = merged.setdefault(key, {
+            'name': jar_cookie.name,
+            'domain': jar_cookie.domain,
+            'path': jar_cookie.path,
+            'secure': jar_cookie.secure,
+        })
+        entry['value'] = jar_cookie.value
+        if jar_cookie.expires:
+            entry['expiry'] = int(jar_cookie.expires)
+    return list(merged.values())
+
+
+def is_challenge(response: 'requests.Response') -> bool:
+    """响应是否为 Cloudflare 挑战页面"""
+    if response.headers.get('cf-mitigated') == 'challenge':
+        return True
+    if response.status_code in (403, 503):
+        text = response.text.lower()
+        return any(indicator in text for indicator in CLOUDFLARE_INDICATORS)
+    return False
+
+
+def is_proxy_error(error: Exception) -> bool:
+    """请求失败是否是因为连不上代理或代理无法建立连接"""
+    exceptions = lazy_import('requests').exceptions
+    return isinstance(error, (exceptions.ProxyError, exceptions.ConnectTimeout, exceptions.InvalidSchema))
+
+
+def is_logged_in(response: 'requests.Response') -> bool:
+    """响应是否为已登录的用户页面 (未被重定向到登录页)"""
+    if response.status_code != 200 or is_challenge(response):
+        return False
+    return 'login' not in response.url and ('user' in response.url or 'dashboard' in response.url)
+
+
+def post_checkin(session: 'requests.Session', base_url: str, timeout: float) -> Dict[str, Any]:
+    """调用站点的签到接口 (SSPanel 的 POST /user/checkin)
+
+    Returns:
+        接口返回的 JSON，如 {"ret": 1, "msg": "获得了 256MB 流量"}
+
+    Raises:
+        requests.RequestException / ValueError: 请求失败或返回的不是 JSON (通常是会话失效被重定向)
+    """
+    response = session.post(
+        f"{base_url}/user/checkin",
+        headers={'X-Requested-With': 'XMLHttpRequest', 'Referer': f"{base_url}/user",
+                 'Accept': 'application/json, text/javascript, */*; q=0.01'},
+        timeout=timeout,
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+def earliest_expiry(cookies: List[Dict[str, Any]]) -> Optional[int]:
+    """会话 cookie 中最早的过期时间 (不含 Cloudflare 的 cookie)"""
+    expiries = [
+        c['expiry'] for c in cookies
+        if c.get('expiry') and not c['name'].startswith(('cf_', '__cf'))
+    ]
+    return min(expiries) if expiries else None
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+签到日志统计模块
+以生成器流水线逐行读取当前和已轮转 (含 .gz 压缩) 的签到日志，内存占用与日志总量无关:
+
+    日志文件 -> 文本行 -> 关键事件 -> 单次运行 -> 按天汇总
+
+从运行开始/结束横幅、重试、Cloudflare 等待和流量等日志中还原每次运行，
+输出每天的运行次数、成功率、耗时、重试次数、Cloudflare 等待和流量合计。
+
+用法:
+    python hitun_checkin.py --log-stats
+    python log_analytics.py logs --since 2025-01-01 --format csv
+"""
+
+import argparse
+import csv
+import gzip
+import json
+import re
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from run_history import percentile
+
+# 文本日志行: "2026-10-19 08:00:01 - INFO - 消息"
+LINE_RE = re.compile(r'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) - (\w+) - (.*)$')
+# 只有包含这些关键字的行才需要解析，其余行在正则匹配前就被丢弃
+INTERESTING_RE = re.compile(
+    '开始执行签到任务|任务结束 - 状态|次尝试|账号: |Cloudflare 挑战|提取到流量|获得流量|'
+    '页面加载失败|页面加载最终失败|等待元素超时|登录失败|签到失败|超过整体运行时限|复用 pid'
+)
+START_MARK = '开始执行签到任务'
+END_RE = re.compile(r'任务结束 - 状态: (\S+)')
+ATTEMPT_RE = re.compile(r'--- 第 (\d+)/\d+ 次尝试')
+TRAFFIC_RE = re.compile(r'(?:提取到流量|获得流量): (\d+(?:\.\d+)?)M')
+
+# 各类异常消息 -> 统计字段
+ISSUE_MARKERS = [
+    ('页面加载失败', 'page_load_errors'),
+    ('页面加载最终失败', 'page_load_errors'),
+    ('等待元素超时', 'element_timeouts'),
+    ('Cloudflare 挑战等待超时', 'cloudflare_timeouts'),
+    ('签到失败', 'checkin_failures'),
+    ('超过整体运行时限', 'deadline_exceeded'),
+]
+# 需要按级别和消息开头匹配的异常: (级别, 消息前缀, 统计字段)。
+# "登录失败" 还出现在 "Cookie 登录失败，使用账号密码登录..." 等中间过程的日志里，
+# 只统计每次尝试最终的 ERROR "登录失败"
+EXACT_ISSUE_MARKERS = [
+    ('ERROR', '登录失败', 'login_failures'),
+]
+ISSUE_FIELDS = list(dict.fromkeys(
+    [field for _, field in ISSUE_MARKERS] + [field for _, _, field in EXACT_ISSUE_MARKERS]))
+
+DAY_FIELDS = [
+    'date', 'runs', 'succeeded', 'success_rate', 'avg_seconds', 'p50_seconds', 'max_seconds',
+    'retries', 'cloudflare_waits', 'cloudflare_seconds', 'traffic_mb', 'reused', *ISSUE_FIELDS,
+]
+
+
+def _rotation_key(path: Path, base: str) -> Tuple[int, int, str]:
+    """轮转文件的时间顺序: 编号越大越旧 (checkin.log.3.gz)，日期后缀按日期排序，当前文件最后"""
+    suffix = path.name[len(base):].lstrip('.')
+    if suffix.endswith('.gz'):
+        suffix = suffix[:-3]
+    if not suffix:
+        return 2, 0, ''
+    if suffix.isdigit():
+        return 0, -int(suffix), ''
+    return 1, 0, suffix
+
+
+def log_files(log_dir: Path, base: str = 'checkin.log') -> List[Path]:
+    """按时间顺序 (旧 -> 新) 列出当前日志及其轮转文件"""
+    log_dir = Path(log_dir)
+    if not log_dir.is_dir():
+        return []
+    # .lock 为轮转用的锁文件，.rotating 为正在压缩的轮转文件 (压缩完成后变为 .gz)
+    files = [path for path in log_dir.iterdir()
+             if path.is_file() and (path.name == base or path.name.startswith(base + '.'))
+             and path.suffix not in ('.lock', '.rotating')]
+    return sorted(files, key=lambda path: _rotation_key(path, base))
+
+
+def read_lines(paths: Iterable[Path]) -> Iterator[str]:
+    """依次逐行读取日志文件，.gz 文件流式解压"""
+    for path in paths:
+        opener = gzip.open if path.suffix == '.gz' else open
+        with opener(path, 'rt', encoding='utf-8', errors='replace') as f:
+            yield from f
+
+
+def parse_text(lines: Iterable[str]) -> Iterator[Tuple[str, str, str, Optional[str]]]:
+    """文本日志 -> (时间, 级别, 消息, 运行 ID)；文本日志不含运行 ID，为 None"""
+    for line in lines:
+        if not INTERESTING_RE.search(line):
+            continue
+        match = LINE_RE.match(line.rstrip('\n'))
+        if match:
+            yield match.group(1), match.group(2), match.group(3), None
+
+
+def parse_jsonl(lines: Iterable[str]) -> Iterator[Tuple[str, str, str, Optional[str]]]:
+    """JSON Lines 日志 -> (时间, 级别, 消息, 运行 ID)，并发运行按 run_id 区分"""
+    for line in lines:
+        if not INTERESTING_RE.search(line):
+            continue
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        yield entry.get('time', '')[:19].replace('T', ' '), entry.get('level', ''), \
+            entry.get('message', ''), entry.get('run_id') or None
+
+
+def _seconds_between(start: str, end: str) -> float:
+    return (datetime.fromisoformat(end) - datetime.fromisoformat(start)).total_seconds()
+
+
+def _new_run(started: str) -> Dict[str, Any]:
+    return {
+        'started': started, 'finished': None, 'account': None, 'success': None,
+        'attempts': 1, 'traffic_mb': 0, 'cloudflare_waits': 0, 'cloudflare_seconds': 0.0,
+        'reused': False, 'issues': {}, '_cf_since': None,
+    }
+
+
+def iter_runs(events: Iterable[Tuple[str, str, str, Optional[str]]]) -> Iterator[Dict[str, Any]]:
+    """把事件流还原为单次运行
+
+    同时进行中的运行按运行 ID 区分 (文本日志中视为顺序执行)。没有结束横幅的运行
+    (进程被杀死) 在同一运行 ID 的下一次开始时以 success=None 输出。
+    """
+    open_runs: Dict[Optional[str], Dict[str, Any]] = {}
+    for timestamp, level, message, run_key in events:
+        if START_MARK in message:
+            if run_key in open_runs:
+                yield open_runs.pop(run_key)
+            open_runs[run_key] = _new_run(timestamp)
+            continue
+        run = open_runs.get(run_key)
+        if run is None:
+            continue
+
+        end = END_RE.search(message)
+        if end:
+            run['finished'] = timestamp
+            run['success'] = end.group(1) == '成功'
+            yield open_runs.pop(run_key)
+            continue
+        if message.startswith('账号: '):
+            run['account'] = message[len('账号: '):].strip()
+            continue
+        attempt = ATTEMPT_RE.search(message)
+        if attempt:
+            run['attempts'] = max(run['attempts'], int(attempt.group(1)))
+            continue
+        traffic = TRAFFIC_RE.search(message)
+        if traffic:
+            # 同一次签到会先后记录"提取到流量"和"获得流量"，取最后一个值
+            value = traffic.group(1)
+            run['traffic_mb'] = float(value) if '.' in value else int(value)
+            continue
+        if '检测到 Cloudflare 挑战' in message:
+            run['cloudflare_waits'] += 1
+            run['_cf_since'] = timestamp
+        elif ('Cloudflare 挑战已通过' in message or 'Cloudflare 挑战等待超时' in message) and run['_cf_since']:
+            run['cloudflare_seconds'] += _seconds_between(run['_cf_since'], timestamp)
+            run['_cf_since'] = None
+        if '复用 pid' in message:
+            run['reused'] = True
+        for marker_level, prefix, field in EXACT_ISSUE_MARKERS:
+            if level == marker_level and message.startswith(prefix):
+                run['issues'][field] = run['issues'].get(field, 0) + 1
+                break
+        else:
+            for marker, field in ISSUE_MARKERS:
+                if marker in message:
+                    run['issues'][field] = run['issues'].get(field, 0) + 1
+                    break
+
+    yield from open_runs.values()
+
+
+def filter_runs(runs: Iterable[Dict[str, Any]], since: Optional[str] = None, until: Optional[str] = None,
+                account: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """按日期范围 (YYYY-MM-DD，含两端) 和账号过滤"""
+    for run in runs:
+        day = run['started'][:10]
+        if since and day < since:
+            continue
+        if until and day > until:
+            continue
+        if account and run['account'] != account:
+            continue
+        yield run
+
+
+def daily_stats(runs: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """按运行开始日期汇总 (只保留每天的计数和耗时列表)"""
+    days: Dict[str, Dict[str, Any]] = {}
+    for run in runs:
+        day = days.setdefault(run['started'][:10], {
+            'runs': 0, 'succeeded': 0, 'durations': [], 'retries': 0, 'cloudflare_waits': 0,
+            'cloudflare_seconds': 0.0, 'traffic_mb': 0, 'reused': 0, **{field: 0 for field in ISSUE_FIELDS},
+        })
+        day['runs'] += 1
+        day['succeeded'] += 1 if run['success'] else 0
+        if run['finished']:
+            day['durations'].append(_seconds_between(run['started'], run['finished']))
+        day['retries'] += run['attempts'] - 1
+        day['cloudflare_waits'] += run['cloudflare_waits']
+        day['cloudflare_seconds'] += run['cloudflare_seconds']
+        day['traffic_mb'] += run['traffic_mb'] if run['success'] else 0
+        day['reused'] += 1 if run['reused'] else 0
+        for field, count in run['issues'].items():
+            day[field] += count
+
+    rows = []
+    for date in sorted(days):
+        day = days[date]
+        durations = day.pop('durations')
+        rows.append({
+            'date': date,
+            **{key: day[key] for key in ('runs', 'succeeded')},
+            'success_rate': round(day['succeeded'] / day['runs'], 3),
+            'avg_seconds': round(sum(durations) / len(durations), 1) if durations else None,
+            'p50_seconds': percentile(durations, 50),
+            'max_seconds': max(durations) if durations else None,
+            'retries': day['retries'],
+            'cloudflare_waits': day['cloudflare_waits'],
+            'cloudflare_seconds': round(day['cloudflare_seconds'], 1),
+            'traffic_mb': round(day['traffic_mb'], 2),
+            'reused': day['reused'],
+            **{field: day[field] for field in ISSUE_FIELDS},
+        })
+    return rows
+
+
+def summarize(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """全部天数的合计"""
+    runs = sum(row['runs'] for row in rows)
+    succeeded = sum(row['succeeded'] for row in rows)
+    return {
+        'days': len(rows),
+        'runs': runs,
+        'succeeded': succeeded,
+        'success_rate': round(succeeded / runs, 3) if runs else None,
+        'retries': sum(row['retries'] for row in rows),
+        'cloudflare_waits': sum(row['cloudflare_waits'] for row in rows),
+        'traffic_mb': round(sum(row['traffic_mb'] for row in rows), 2),
+        'slowest_day': max(rows, key=lambda row: row['max_seconds'] or 0)['date'] if rows else None,
+        **{field: sum(row[field] for row in rows) for field in ISSUE_FIELDS},
+    }
+
+
+def analyze(log_dir: Path, source: str = 'text', since: Optional[str] = None, until: Optional[str] = None,
+            account: Optional[str] = None) -> List[Dict[str, Any]]:
+    """统计日志目录中的签到日志，返回按天汇总的行
+
+    Args:
+        log_dir: 日志目录
+        source: text (checkin.log*) 或 jsonl (checkin.jsonl*，并发运行按 run_id 区分)
+        since/until: 日期范围 YYYY-MM-DD
+        account: 只统计某个账号
+    """
+    if source == 'jsonl':
+        events = parse_jsonl(read_lines(log_files(log_dir, 'checkin.jsonl')))
+    else:
+        events = parse_text(read_lines(log_files(log_dir, 'checkin.log')))
+    return daily_stats(filter_runs(iter_runs(events), since, until, account))
+
+
+def _format_table(rows: List[Dict[str, Any]]) -> str:
+    header = f"{'日期':<10} {'运行':>4} {'成功率':>7} {'平均s':>7} {'最长s':>7} {'重试':>4} {'CF等待':>6} {'CF秒':>7} {'流量MB':>7}"
+    lines = [header]
+    for row in rows:
+        lines.append(
+            f"{row['date']:<10} {row['runs']:>4} {row['success_rate']:>7.0%} "
+            f"{row['avg_seconds'] if row['avg_seconds'] is not None else '-':>7} "
+            f"{row['max_seconds'] if row['max_seconds'] is not None else '-':>7} "
+            f"{row['retries']:>4} {row['cloudflare_waits']:>6} {row['cloudflare_seconds']:>7} {row['traffic_mb']:>7}"
+        )
+    total = summarize(rows)
+    lines.append(
+        f"合计 {total['days']} 天 {total['runs']} 次运行，成功率 "
+        f"{'-' if total['success_rate'] is None else format(total['success_rate'], '.1%')}，"
+        f"重试 {total['retries']} 次，Cloudflare 等待 {total['cloudflare_waits']} 次，流量 {total['traffic_mb']}MB"
+    )
+    issues = '，'.join(f"{field} {total[field]}" for field in ISSUE_FIELDS if total[field])
+    if issues:
+        lines.append(f"异常: {issues}")
+    return '\n'.join(lines)
+
+
+def render(rows: List[Dict[str, Any]], fmt: str = 'table') -> str:
+    """输出为 table / json / csv"""
+    if fmt == 'json':
+        return json.dumps({'days': rows, 'total': summarize(rows)}, ensure_ascii=False, indent=2)
+    if fmt == 'csv':
+        import io
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=DAY_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+        return buffer.getvalue()
+    return _format_table(rows)
+
+
+def add_arguments(parser):
+    """日志统计的命令行参数 (log_analytics.py 与 hitun_checkin.py --log-stats 共用)"""
+    parser.add_argument('--since', help='起始日期 YYYY-MM-DD')
+    parser.add_argument('--until', help='结束日期 YYYY-MM-DD')
+    parser.add_argument('--account', help='只统计某个账号')
+    parser.add_argument('--source', choices=['text', 'jsonl'], default='text',
+                        help='读取 checkin.log* (默认) 或 checkin.jsonl* (需开启 log_json)')
+    parser.add_argument('--format', choices=['table', 'json', 'csv'], default='table', help='输出格式')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='签到日志统计 (支持轮转与 .gz 压缩的日志)')
+    parser.add_argument('log_dir', nargs='?', default='logs', help='日志目录 (默认 logs)')
+    add_arguments(parser)
+    args = parser.parse_args()
+    rows = analyze(Path(args.log_dir), args.source, args.since, args.until, args.account)
+    print(render(rows, args.format))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
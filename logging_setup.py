@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日志配置模块
+业务线程只把日志记录放入队列 (QueueHandler)，由后台 QueueListener 统一写入
+按大小或时间轮转的日志文件、控制台以及可选的 JSON Lines 文件。
+同一进程内多次调用只配置一次，避免多个签到实例重复输出。
+定时任务、常驻进程和手动运行可能同时写同一个日志文件，轮转在文件锁内进行，
+其他进程发现文件已被轮转后重新打开 (WatchedFileHandler 语义)
+"""
+
+import atexit
+import contextvars
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+LOGGER_NAME = 'HitunCheckin'
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# 当前线程/上下文所在的运行 ID 和账号，写入每条日志记录
+_log_context: contextvars.ContextVar = contextvars.ContextVar('log_context', default={})
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def stop_logging():
+    """停止后台日志线程并写出队列中剩余的日志"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def set_log_context(**fields):
+    """绑定当前上下文的日志字段 (如 run_id、account)"""
+    _log_context.set({**_log_context.get(), **fields})
+
+
+class ContextFilter(logging.Filter):
+    """把运行上下文字段附加到日志记录上 (在产生日志的线程中执行)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _log_context.get()
+        record.run_id = context.get('run_id', '')
+        record.account = context.get('account', '')
+        return True
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """每条日志输出为一行 JSON"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'run_id': getattr(record, 'run_id', ''),
+            'account': getattr(record, 'account', ''),
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def _gzip_rotator(source: str, dest: str):
+    """轮转时把旧日志压缩为 .gz
+
+    先把日志改名再压缩：其他进程在发现轮转前写入的行仍落在改名后的文件中并被一起压缩，
+    而不是写进复制之后才删除的文件。
+    """
+    rotating = f"{source}.rotating"
+    os.replace(source, rotating)
+    with open(rotating, 'rb') as src, gzip.open(dest, 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(rotating)
+
+
+class _SharedRotationMixin:
+    """允许多个进程写同一个日志文件的轮转处理
+
+    每次写入前检查文件是否已被其他进程轮转 (路径指向的不再是打开的文件)，是则重新打开；
+    轮转在文件锁内进行，拿到锁后重新判断，已被其他进程轮转时不再重复轮转。
+    """
+
+    def _reopen_if_rotated(self) -> bool:
+        """文件已被其他进程轮转时关闭旧文件 (下次写入时重新打开)，返回是否发生了轮转"""
+        if self.stream is None:
+            return False
+        try:
+            current = os.stat(self.baseFilename)
+        except FileNotFoundError:
+            current = None
+        opened = os.fstat(self.stream.fileno())
+        if current is not None and (current.st_dev, current.st_ino) == (opened.st_dev, opened.st_ino):
+            return False
+        self.stream.close()
+        self.stream = None
+        self._rotated_elsewhere()
+        return True
+
+    def _rotated_elsewhere(self):
+        """其他进程完成轮转后的处理"""
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            self._reopen_if_rotated()
+            if self.shouldRollover(record):
+                with open(f"{self.baseFilename}.lock", 'a') as lock_file:
+                    if FCNTL_AVAILABLE:
+                        fcntl.flock(lock_file, fcntl.LOCK_EX)
+                    # 等锁期间其他进程可能已经完成轮转
+                    if not self._reopen_if_rotated() or self.shouldRollover(record):
+                        self.doRollover()
+            logging.FileHandler.emit(self, record)
+        except Exception:
+            self.handleError(record)
+
+
+class SharedRotatingFileHandler(_SharedRotationMixin, logging.handlers.RotatingFileHandler):
+    """按大小轮转，可由多个进程共同写入"""
+
+
+class SharedTimedRotatingFileHandler(_SharedRotationMixin, logging.handlers.TimedRotatingFileHandler):
+    """按时间轮转，可由多个进程共同写入"""
+
+    def _rotated_elsewhere(self):
+        # 其他进程已经完成本周期的轮转，按当前时间计算下一次轮转时间
+        self.rolloverAt = self.computeRollover(int(time.time()))
+
+
+def _rotating_handler(path: Path, config: Dict[str, Any]) -> logging.Handler:
+    """按配置创建按大小或按时间轮转的文件处理器"""
+    backup_count = config.get('log_backup_count', 7)
+    if config.get('log_rotation', 'size') == 'time':
+        handler = SharedTimedRotatingFileHandler(
+            path, when=config.get('log_rotate_when', 'midnight'),
+            backupCount=backup_count, encoding='utf-8'
+        )
+    else:
+        handler = SharedRotatingFileHandler(
+            path, maxBytes=int(config.get('log_max_mb', 10) * 1024 * 1024),
+            backupCount=backup_count, encoding='utf-8'
+        )
+    if config.get('log_compress', True):
+        handler.namer = lambda name: name + '.gz'
+        handler.rotator = _gzip_rotator
+    return handler
+
+
+def setup_logging(config: Dict[str, Any]) -> logging.Logger:
+    """配置签到日志 (进程内只生效一次，之后的调用只更新日志级别)
+
+    Args:
+        config: 配置字典
+
+    Returns:
+        签到工具使用的 logger
+    """
+    global _listener
+
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.setLevel(getattr(logging, config.get('log_level', 'INFO')))
+    if _listener is not None:
+        return logger
+
+    log_dir = Path(config.get('log_dir', 'logs'))
+    log_dir.mkdir(exist_ok=True)
+
+    formatter = logging.Formatter(TEXT_FORMAT, datefmt=DATE_FORMAT)
+    file_handler = _rotating_handler(log_dir / 'checkin.log', config)
+    file_handler.setFormatter(formatter)
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(formatter)
+    handlers = [file_handler, console_handler]
+
+    if config.get('log_json', False):
+        json_handler = _rotating_handler(log_dir / 'checkin.jsonl', config)
+        json_handler.setFormatter(JsonLinesFormatter())
+        handlers.append(json_handler)
+
+    log_queue: queue.Queue = queue.Queue(-1)
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+    logger.addHandler(queue_handler)
+    logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+    return logger
@@ -6,24 +6,27 @@
 """
 
 import logging
-import requests
 from typing import Optional
 
+from proxy_pool import requests_proxies
+
 
 class ServerChanNotifier:
     """Server酱推送通知类"""
     
-    def __init__(self, sendkey: str, uid: str = "1611", timeout: int = 10):
+    def __init__(self, sendkey: str, uid: str = "1611", timeout: int = 10, proxy: Optional[str] = None):
         """初始化Server酱推送器
         
         Args:
             sendkey: Server酱的SendKey
             uid: Server酱³的用户UID
             timeout: 请求超时时间(秒)
+            proxy: 推送请求使用的代理，None 表示直接连接
         """
         self.sendkey = sendkey
         self.uid = uid
         self.timeout = timeout
+        self.proxy = proxy
         self.api_url = f"https://{uid}.push.ft07.com/send/{sendkey}.send"
         self.logger = logging.getLogger('ServerChanNotifier')
     
@@ -38,6 +41,9 @@ class ServerChanNotifier:
         Returns:
             是否发送成功
         """
+        # requests 只在真正推送时导入，未启用通知的运行不承担导入开销
+        import requests
+
         try:
             # 构建请求参数
             params = {
@@ -50,7 +56,8 @@ class ServerChanNotifier:
             
             # 发送请求
             self.logger.info(f"正在发送Server酱推送: {title}")
-            response = requests.get(self.api_url, params=params, timeout=self.timeout)
+            response = requests.get(self.api_url, params=params, timeout=self.timeout,
+                                    proxies=requests_proxies(self.proxy))
             
             # 检查响应
             if response.status_code == 200:
@@ -142,7 +149,9 @@ def create_notifier(config: dict) -> Optional[ServerChanNotifier]:
     
     uid = config.get('serverchan_uid', '1611').strip()
     timeout = config.get('notification_timeout', 10)
-    return ServerChanNotifier(sendkey, uid, timeout)
+    # "account" 表示使用账号分到的出口代理，由签到流程在分配代理后设置
+    proxy = config.get('notification_proxy')
+    return ServerChanNotifier(sendkey, uid, timeout, proxy=None if proxy == 'account' else proxy or None)
 
 
 if __name__ == '__main__':
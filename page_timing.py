@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+页面计时模块
+每次导航后从浏览器读取 Navigation Timing / Resource Timing 和 CDP Performance.getMetrics，
+汇总为每次运行的计时报告，用于判断页面慢在网络、后端还是前端资源
+"""
+
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from storage import save_json
+
+TIMING_SCRIPT = """
+    const nav = performance.getEntriesByType('navigation')[0];
+    if (!nav) { return null; }
+    const resources = performance.getEntriesByType('resource');
+    return {
+        navigation: {
+            dns: nav.domainLookupEnd - nav.domainLookupStart,
+            connect: nav.connectEnd - nav.connectStart,
+            tls: nav.secureConnectionStart > 0 ? nav.connectEnd - nav.secureConnectionStart : 0,
+            ttfb: nav.responseStart - nav.requestStart,
+            response: nav.responseEnd - nav.responseStart,
+            domContentLoaded: nav.domContentLoadedEventEnd,
+            load: nav.loadEventEnd,
+            transferSize: nav.transferSize || 0,
+            redirectCount: nav.redirectCount
+        },
+        resources: resources.map(r => [
+            r.name, r.initiatorType, Math.round(r.duration), r.transferSize || 0
+        ])
+    };
+"""
+
+# 需要保留的 CDP Performance 指标
+CDP_METRICS = ('JSHeapUsedSize', 'JSHeapTotalSize', 'Nodes', 'Documents', 'LayoutCount', 'ScriptDuration')
+
+
+def collect_timing(driver, top_n: int = 10, include_requests: bool = False) -> Optional[Dict[str, Any]]:
+    """读取当前页面的计时数据
+
+    Args:
+        driver: WebDriver
+        top_n: 最慢/最大请求列表的长度
+        include_requests: 是否附带类似 HAR 的最慢/最大请求摘要
+
+    Returns:
+        计时数据，页面没有 Navigation Timing 时返回 None
+    """
+    raw = driver.execute_script(TIMING_SCRIPT)
+    if not raw:
+        return None
+
+    navigation = {key: round(value, 1) for key, value in raw['navigation'].items()}
+    resources: List[list] = raw.get('resources') or []
+    by_type: Dict[str, int] = {}
+    for _, initiator, _, _ in resources:
+        by_type[initiator] = by_type.get(initiator, 0) + 1
+
+    timing: Dict[str, Any] = {
+        'navigation': navigation,
+        'requests': len(resources) + 1,
+        'bytes': navigation['transferSize'] + sum(r[3] for r in resources),
+        'requests_by_type': by_type,
+    }
+    if include_requests:
+        as_dict = lambda r: {'url': r[0], 'type': r[1], 'duration_ms': r[2], 'bytes': r[3]}
+        timing['slowest'] = [as_dict(r) for r in sorted(resources, key=lambda r: -r[2])[:top_n]]
+        timing['largest'] = [as_dict(r) for r in sorted(resources, key=lambda r: -r[3])[:top_n]]
+
+    try:
+        driver.execute_cdp_cmd('Performance.enable', {})
+        metrics = driver.execute_cdp_cmd('Performance.getMetrics', {}).get('metrics', [])
+        timing['metrics'] = {m['name']: m['value'] for m in metrics if m['name'] in CDP_METRICS}
+    except Exception as e:
+        logging.getLogger('HitunCheckin').debug("读取 CDP 性能指标失败: %s", e)
+    return timing
+
+
+def summarize(timing: Dict[str, Any]) -> str:
+    """单行摘要，用于日志"""
+    nav = timing['navigation']
+    summary = (
+        f"DNS {nav['dns']:.0f}ms, 连接 {nav['connect']:.0f}ms (TLS {nav['tls']:.0f}ms), "
+        f"TTFB {nav['ttfb']:.0f}ms, DOMContentLoaded {nav['domContentLoaded']:.0f}ms, "
+        f"load {nav['load']:.0f}ms, {timing['requests']} 个请求 {timing['bytes'] / 1024:.0f}KB"
+    )
+    heap = timing.get('metrics', {}).get('JSHeapUsedSize')
+    if heap:
+        summary += f", JS 堆 {heap / 1024 / 1024:.1f}MB"
+    return summary
+
+
+class TimingReport:
+    """单次运行的页面计时报告"""
+
+    def __init__(self, directory: Path, run_id: str, account: str):
+        """
+        Args:
+            directory: 报告目录
+            run_id: 运行 ID
+            account: 账号标识
+        """
+        self.started = datetime.now()
+        self.path = Path(directory) / f"timing_{self.started.strftime('%Y%m%d_%H%M%S')}_{run_id}.json"
+        self.run_id = run_id
+        self.account = account
+        self.navigations: List[Dict[str, Any]] = []
+
+    def add(self, url: str, load_seconds: float, timing: Optional[Dict[str, Any]]):
+        """追加一次导航的计时"""
+        entry = {
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'url': url,
+            'driver_get_ms': round(load_seconds * 1000, 1),
+        }
+        if timing:
+            entry.update(timing)
+        self.navigations.append(entry)
+
+    def save(self):
+        """写入报告文件"""
+        if not self.navigations:
+            return
+        save_json(self.path, {
+            'run_id': self.run_id,
+            'account': self.account,
+            'started': self.started.isoformat(timespec='seconds'),
+            'navigations': self.navigations,
+        })
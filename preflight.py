@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+网络预检模块
+在启动浏览器之前用 DNS 解析 + TCP/TLS 连接 + HTTP HEAD 快速判断站点是否可达，
+站点不可达时只需花费毫秒级时间，而不是一次完整的浏览器启动和页面加载重试。
+使用出口代理时改为检查代理: 连接代理并通过 CONNECT 建立到站点的隧道
+"""
+
+import socket
+import ssl
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+# Cloudflare 回源失败类状态码，说明站点后端不可用；403/503 可能只是挑战页，视为可达
+UNAVAILABLE_STATUS = {500, 502, 504, 520, 521, 522, 523, 524, 525, 526, 530}
+
+
+class PreflightResult:
+    """预检结果"""
+
+    def __init__(self, ok: bool, stage: str, error: Optional[str] = None,
+                 status: Optional[int] = None, timings: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            ok: 站点是否可达
+            stage: 最后执行到的阶段 (dns/connect/tls/http)
+            error: 失败原因
+            status: HTTP 状态码
+            timings: 各阶段耗时 (毫秒)
+        """
+        self.ok = ok
+        self.stage = stage
+        self.error = error
+        self.status = status
+        self.timings = timings or {}
+
+    def summary(self) -> str:
+        """单行描述，用于日志和失败通知"""
+        timing_str = ", ".join(f"{name} {ms:.0f}ms" for name, ms in self.timings.items())
+        if self.ok:
+            target = '代理' if self.stage.startswith('proxy') else '站点'
+            status = f"HTTP {self.status}; " if self.status is not None else ''
+            return f"{target}可达 ({status}{timing_str})"
+        return f"{self.stage} 阶段失败: {self.error} ({timing_str})"
+
+
+def _resolve(host: str, port: int, timeout: float):
+    """带超时的 DNS 解析 (getaddrinfo 本身不支持超时)"""
+    executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        future = executor.submit(socket.getaddrinfo, host, port, 0, socket.SOCK_STREAM)
+        return future.result(timeout=timeout)
+    finally:
+        executor.shutdown(wait=False)
+
+
+def check_site(url: str, timeout: float = 5.0) -> PreflightResult:
+    """对站点执行一次快速预检
+
+    Args:
+        url: 站点地址
+        timeout: 整个预检的总时限(秒)，各阶段共享
+
+    Returns:
+        PreflightResult
+    """
+    parsed = urlparse(url)
+    host = parsed.hostname
+    use_tls = parsed.scheme == 'https'
+    port = parsed.port or (443 if use_tls else 80)
+    deadline = time.monotonic() + timeout
+    timings: Dict[str, float] = {}
+
+    def remaining() -> float:
+        return max(deadline - time.monotonic(), 0.001)
+
+    stage = 'dns'
+    sock = None
+    try:
+        start = time.monotonic()
+        addrinfo = _resolve(host, port, remaining())
+        timings['dns'] = (time.monotonic() - start) * 1000
+
+        stage = 'connect'
+        start = time.monotonic()
+        family, socktype, proto, _, address = addrinfo[0]
+        sock = socket.socket(family, socktype, proto)
+        sock.settimeout(remaining())
+        sock.connect(address)
+        timings['connect'] = (time.monotonic() - start) * 1000
+
+        if use_tls:
+            stage = 'tls'
+            start = time.monotonic()
+            context = ssl.create_default_context()
+            sock.settimeout(remaining())
+            sock = context.wrap_socket(sock, server_hostname=host)
+            timings['tls'] = (time.monotonic() - start) * 1000
+
+        stage = 'http'
+        start = time.monotonic()
+        sock.settimeout(remaining())
+        request = (
+            f"HEAD {parsed.path or '/'} HTTP/1.1\r\n"
+            f"Host: {parsed.netloc}\r\n"
+            f"User-Agent: Mozilla/5.0\r\n"
+            f"Connection: close\r\n\r\n"
+        )
+        sock.sendall(request.encode('ascii'))
+        status_line = b''
+        while b'\r\n' not in status_line and len(status_line) < 1024:
+            chunk = sock.recv(256)
+            if not chunk:
+                break
+            status_line += chunk
+        timings['http'] = (time.monotonic() - start) * 1000
+
+        parts = status_line.split(b'\r\n', 1)[0].split()
+        if len(parts) < 2 or not parts[1].isdigit():
+            return PreflightResult(False, stage, "无效的 HTTP 响应", timings=timings)
+        status = int(parts[1])
+        if status in UNAVAILABLE_STATUS:
+            return PreflightResult(False, stage, f"站点返回 HTTP {status}", status=status, timings=timings)
+        return PreflightResult(True, stage, status=status, timings=timings)
+    except (FutureTimeout, socket.timeout):
+        return PreflightResult(False, stage, f"超时 ({timeout}s)", timings=timings)
+    except (OSError, ssl.SSLError, IndexError) as e:
+        return PreflightResult(False, stage, str(e) or e.__class__.__name__, timings=timings)
+    finally:
+        if sock is not None:
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+
+def check_proxy(proxy: str, url: str, timeout: float = 5.0) -> PreflightResult:
+    """检查出口代理是否可用
+
+    HTTP 代理发送 CONNECT 请求确认代理能连到站点；SOCKS 代理只检查能否连接到代理本身。
+
+    Args:
+        proxy: 代理地址
+        url: 站点地址
+        timeout: 整个预检的总时限(秒)
+
+    Returns:
+        PreflightResult (timings 中的阶段名带 proxy_ 前缀)
+    """
+    proxy_parsed = urlparse(proxy)
+    parsed = urlparse(url)
+    target_port = parsed.port or (443 if parsed.scheme == 'https' else 80)
+    deadline = time.monotonic() + timeout
+    timings: Dict[str, float] = {}
+
+    def remaining() -> float:
+        return max(deadline - time.monotonic(), 0.001)
+
+    stage = 'proxy_dns'
+    sock = None
+    try:
+        start = time.monotonic()
+        addrinfo = _resolve(proxy_parsed.hostname, proxy_parsed.port, remaining())
+        timings[stage] = (time.monotonic() - start) * 1000
+
+        stage = 'proxy_connect'
+        start = time.monotonic()
+        family, socktype, proto, _, address = addrinfo[0]
+        sock = socket.socket(family, socktype, proto)
+        sock.settimeout(remaining())
+        sock.connect(address)
+        timings[stage] = (time.monotonic() - start) * 1000
+        if not proxy_parsed.scheme.startswith('http'):
+            return PreflightResult(True, stage, timings=timings)
+
+        stage = 'proxy_tunnel'
+        start = time.monotonic()
+        if proxy_parsed.scheme == 'https':
+            sock = ssl.create_default_context().wrap_socket(sock, server_hostname=proxy_parsed.hostname)
+        target = f"{parsed.hostname}:{target_port}"
+        sock.sendall(f"CONNECT {target} HTTP/1.1\r\nHost: {target}\r\n\r\n".encode('ascii'))
+        status_line = b''
+        while b'\r\n' not in status_line and len(status_line) < 1024:
+            sock.settimeout(remaining())
+            chunk = sock.recv(256)
+            if not chunk:
+                break
+            status_line += chunk
+        timings[stage] = (time.monotonic() - start) * 1000
+
+        parts = status_line.split(b'\r\n', 1)[0].split()
+        if len(parts) < 2 or not parts[1].isdigit():
+            return PreflightResult(False, stage, "代理返回无效的响应", timings=timings)
+        status = int(parts[1])
+        if status != 200:
+            return PreflightResult(False, stage, f"代理拒绝建立隧道 (HTTP {status})", status=status, timings=timings)
+        return PreflightResult(True, stage, status=status, timings=timings)
+    except (FutureTimeout, socket.timeout):
+        return PreflightResult(False, stage, f"超时 ({timeout}s)", timings=timings)
+    except (OSError, ssl.SSLError, IndexError, TypeError) as e:
+        return PreflightResult(False, stage, str(e) or e.__class__.__name__, timings=timings)
+    finally:
+        if sock is not None:
+            try:
+                sock.close()
+            except OSError:
+                pass
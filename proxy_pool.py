@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+出口代理池模块
+为每个账号分配一个出口代理，浏览器、HTTP 签到/保活和通知都经由该代理访问，
+避免所有账号集中从同一个 IP 出口而招致更多的 Cloudflare 挑战。
+同一账号尽量固定使用同一个代理 (cf_clearance 与出口 IP 绑定)；
+按观测到的耗时和 Cloudflare 挑战比例为代理打分，过慢、挑战过多或连续连接失败的代理
+自动暂停一段时间，期间其账号改用其他代理
+"""
+
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from storage import load_json, save_json
+
+SUPPORTED_SCHEMES = ('http', 'https', 'socks4', 'socks5')
+# 账号配置 "proxy": "direct" 表示不使用代理池，直接连接
+DIRECT = 'direct'
+
+
+def parse_proxy(url: str) -> Tuple[str, str, int]:
+    """解析代理地址
+
+    Chrome 的 --proxy-server 不支持在地址中携带用户名密码，因此只接受按来源 IP 授权的代理
+    (需要认证的代理可在本地用 gost/3proxy 等转发为无认证代理)。
+
+    Returns:
+        (协议, 主机, 端口)
+
+    Raises:
+        ValueError: 地址格式不正确或携带了认证信息
+    """
+    parsed = urlparse(url.strip())
+    if parsed.scheme not in SUPPORTED_SCHEMES:
+        raise ValueError(f"代理协议应为 {'/'.join(SUPPORTED_SCHEMES)} 之一: {url}")
+    if parsed.username or parsed.password:
+        raise ValueError(f"代理地址不支持用户名密码 (Chrome 无法使用): {url}")
+    try:
+        port = parsed.port
+    except ValueError:
+        raise ValueError(f"代理端口无效: {url}")
+    if not parsed.hostname or not port:
+        raise ValueError(f"代理地址应为 协议://主机:端口: {url}")
+    return parsed.scheme, parsed.hostname, port
+
+
+def requests_proxies(proxy: Optional[str]) -> Optional[Dict[str, str]]:
+    """requests 使用的代理配置 (SOCKS5 改用 socks5h，由代理解析域名)"""
+    if not proxy:
+        return None
+    if proxy.startswith('socks5://'):
+        proxy = 'socks5h://' + proxy[len('socks5://'):]
+    return {'http': proxy, 'https': proxy}
+
+
+class ProxyPool:
+    """按账号分配出口代理并跟踪代理健康度的代理池
+
+    每个代理记录衰减加权的平均耗时 (页面加载、HTTP 请求) 和 Cloudflare 挑战比例，
+    样本数达到 min_samples 后超过阈值即暂停 sideline_minutes 分钟；暂停结束后统计清零重新观察。
+    分配时优先沿用账号当前的代理，需要换代理时选择分到账号最少、得分最好的可用代理。
+    """
+
+    # 一次 Cloudflare 挑战折算的等待秒数，用于把挑战比例和耗时合成一个得分
+    CHALLENGE_COST = 30.0
+
+    # 进程内共享的代理池: 状态文件路径 -> ProxyPool
+    _shared: Dict[str, 'ProxyPool'] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, proxies: List[str], path: Path, max_latency: float = 20.0, max_challenge_rate: float = 0.5,
+                 sideline_minutes: float = 60, min_samples: int = 3, max_failures: int = 3,
+                 direct_fallback: bool = False, decay: float = 0.8, clock: Callable[[], float] = time.time,
+                 logger=None):
+        """
+        Args:
+            proxies: 代理地址列表
+            path: 状态文件路径 (代理统计与账号分配)
+            max_latency: 平均耗时上限 (秒)
+            max_challenge_rate: Cloudflare 挑战比例上限
+            sideline_minutes: 不健康的代理暂停使用的时间 (分钟)
+            min_samples: 判断耗时和挑战比例前至少需要的样本数
+            max_failures: 连续连接失败多少次后暂停
+            direct_fallback: 所有代理都暂停时是否直接连接 (否则使用最早恢复的代理)
+            decay: 每个新样本到来时旧样本的衰减系数
+            clock: 时间函数
+            logger: 日志记录器
+        """
+        self.path = Path(path)
+        self.decay = decay
+        self.clock = clock
+        self.logger = logger
+        self._lock = threading.RLock()
+        state = load_json(self.path, {}) or {}
+        # 代理 -> 统计
+        self.stats: Dict[str, Dict[str, Any]] = state.get('proxies', {})
+        # 账号 -> 代理
+        self.assignments: Dict[str, str] = state.get('assignments', {})
+        # 尚未写入文件的事件 (访问、挑战、暂停、分配)，写入时在文件中的最新状态上重放
+        self._pending: List[tuple] = []
+        self.proxies: List[str] = []
+        self.configure(proxies, max_latency=max_latency, max_challenge_rate=max_challenge_rate,
+                       sideline_minutes=sideline_minutes, min_samples=min_samples, max_failures=max_failures,
+                       direct_fallback=direct_fallback)
+
+    @classmethod
+    def shared(cls, config: Dict[str, Any], clock: Callable[[], float] = time.time,
+               logger=None) -> Optional['ProxyPool']:
+        """按配置获取进程内共享的代理池 (同一 data_dir 的各账号共用)，未配置 proxies 时返回 None
+
+        已存在的代理池按新配置更新代理列表和阈值 (常驻模式热加载)。
+        """
+        proxies = config.get('proxies') or []
+        if not proxies:
+            return None
+        path = Path(config.get('data_dir', 'data')) / 'proxy_pool.json'
+        options = {
+            'max_latency': config.get('proxy_max_latency', 20),
+            'max_challenge_rate': config.get('proxy_max_challenge_rate', 0.5),
+            'sideline_minutes': config.get('proxy_sideline_minutes', 60),
+            'min_samples': config.get('proxy_min_samples', 3),
+            'max_failures': config.get('proxy_max_failures', 3),
+            'direct_fallback': config.get('proxy_direct_fallback', False),
+        }
+        with cls._shared_lock:
+            pool = cls._shared.get(str(path.resolve()))
+            if pool is None:
+                pool = cls(proxies, path, clock=clock, logger=logger, **options)
+                cls._shared[str(path.resolve())] = pool
+            else:
+                pool.configure(proxies, **options)
+            return pool
+
+    def configure(self, proxies: List[str], max_latency: float = 20.0, max_challenge_rate: float = 0.5,
+                  sideline_minutes: float = 60, min_samples: int = 3, max_failures: int = 3,
+                  direct_fallback: bool = False):
+        """更新代理列表和阈值；已移除的代理的账号在下次分配时改用其他代理"""
+        with self._lock:
+            self.proxies = [proxy.strip() for proxy in proxies]
+            self.max_latency = max_latency
+            self.max_challenge_rate = max_challenge_rate
+            self.sideline_minutes = sideline_minutes
+            self.min_samples = min_samples
+            self.max_failures = max_failures
+            self.direct_fallback = direct_fallback
+
+    def _log(self, level: str, message: str):
+        if self.logger:
+            getattr(self.logger, level)(message)
+
+    @staticmethod
+    def _new_stats() -> Dict[str, Any]:
+        return {
+            'latency': None, 'visits': 0.0, 'challenges': 0.0, 'samples': 0, 'failures': 0,
+            'sidelined_until': 0, 'reason': None,
+        }
+
+    def _stats(self, proxy: str) -> Dict[str, Any]:
+        return self.stats.setdefault(proxy, self._new_stats())
+
+    def available(self, proxy: str) -> bool:
+        """代理是否在池中且未被暂停"""
+        return proxy in self.proxies and self._stats(proxy)['sidelined_until'] <= self.clock()
+
+    def challenge_rate(self, proxy: str) -> float:
+        """代理近期遇到 Cloudflare 挑战的比例"""
+        stats = self._stats(proxy)
+        return stats['challenges'] / stats['visits'] if stats['visits'] else 0.0
+
+    def score(self, proxy: str) -> float:
+        """代理得分 (秒，越小越好): 平均耗时 + 挑战比例 × 一次挑战的折算耗时；没有样本时为 0，优先试用"""
+        stats = self._stats(proxy)
+        return (stats['latency'] or 0.0) + self.challenge_rate(proxy) * self.CHALLENGE_COST
+
+    def assign(self, account: str) -> Optional[str]:
+        """为账号分配代理
+
+        账号当前的代理仍可用时沿用 (保持出口 IP 稳定)，否则在可用的代理中选择分到账号最少、得分最好的。
+        所有代理都暂停时按 direct_fallback 直接连接 (返回 None) 或使用最早恢复的代理。
+        """
+        with self._lock:
+            current = self.assignments.get(account)
+            if current and self.available(current):
+                return current
+            candidates = [proxy for proxy in self.proxies if self.available(proxy)]
+            if candidates:
+                load = {proxy: 0 for proxy in candidates}
+                for name, proxy in self.assignments.items():
+                    if name != account and proxy in load:
+                        load[proxy] += 1
+                choice = min(candidates, key=lambda proxy: (load[proxy], self.score(proxy)))
+            elif self.direct_fallback or not self.proxies:
+                choice = None
+            else:
+                choice = min(self.proxies, key=lambda proxy: self._stats(proxy)['sidelined_until'])
+
+            if current and current != choice:
+                reason = self._stats(current).get('reason') if current in self.proxies else '已从配置中移除'
+                self._log('warning', f"账号 {account} 的代理 {current} 不可用 ({reason})，改用 {choice or '直接连接'}")
+            if current != choice:
+                self._apply_assign(self.assignments, account, choice)
+                self._pending.append(('assign', account, choice))
+            return choice
+
+    def record(self, proxy: Optional[str], seconds: Optional[float] = None, failed: bool = False):
+        """记录一次经由代理的访问
+
+        Args:
+            proxy: 代理地址，不在池中的代理忽略
+            seconds: 访问耗时 (页面加载或 HTTP 请求)
+            failed: 连接代理或经由代理访问失败
+        """
+        if not proxy or proxy not in self.proxies:
+            return
+        with self._lock:
+            stats = self._stats(proxy)
+            self._apply_visit(stats, seconds, failed)
+            self._pending.append(('visit', proxy, seconds, failed))
+            if failed:
+                if stats['failures'] >= self.max_failures:
+                    self.sideline(proxy, f"连续 {stats['failures']} 次连接失败")
+                return
+            self._evaluate(proxy)
+
+    def record_challenge(self, proxy: Optional[str]):
+        """把最近一次经由代理的访问记为遇到了 Cloudflare 挑战"""
+        if not proxy or proxy not in self.proxies:
+            return
+        with self._lock:
+            self._apply_challenge(self._stats(proxy))
+            self._pending.append(('challenge', proxy))
+            self._evaluate(proxy)
+
+    def _evaluate(self, proxy: str):
+        """样本足够时检查耗时和挑战比例"""
+        stats = self._stats(proxy)
+        if stats['samples'] < self.min_samples:
+            return
+        if stats['latency'] is not None and stats['latency'] > self.max_latency:
+            self.sideline(proxy, f"平均耗时 {stats['latency']:.1f}s 超过 {self.max_latency}s")
+        elif self.challenge_rate(proxy) > self.max_challenge_rate:
+            self.sideline(proxy, f"Cloudflare 挑战比例 {self.challenge_rate(proxy):.0%} 超过 "
+                                 f"{self.max_challenge_rate:.0%}")
+
+    def sideline(self, proxy: str, reason: str):
+        """暂停使用代理，到期后统计清零重新观察"""
+        with self._lock:
+            until = self.clock() + self.sideline_minutes * 60
+            self._apply_sideline(self._stats(proxy), until, reason)
+            self._pending.append(('sideline', proxy, until, reason))
+        self._log('warning', f"代理 {proxy} 暂停使用 {self.sideline_minutes:g} 分钟: {reason}")
+
+    # ---- 状态变更 (记录时和写入文件时重放共用) ----
+
+    def _apply_visit(self, stats: Dict[str, Any], seconds: Optional[float], failed: bool):
+        if failed:
+            stats['failures'] += 1
+            return
+        stats['failures'] = 0
+        stats['visits'] = round(stats['visits'] * self.decay + 1.0, 4)
+        stats['challenges'] = round(stats['challenges'] * self.decay, 4)
+        if seconds is not None:
+            previous = stats['latency']
+            stats['latency'] = round(seconds if previous is None
+                                     else previous * self.decay + seconds * (1 - self.decay), 3)
+            stats['samples'] += 1
+
+    @staticmethod
+    def _apply_challenge(stats: Dict[str, Any]):
+        stats['challenges'] = round(min(stats['challenges'] + 1.0, stats['visits'] or 1.0), 4)
+        stats['visits'] = max(stats['visits'], stats['challenges'])
+
+    @staticmethod
+    def _apply_sideline(stats: Dict[str, Any], until: float, reason: str):
+        stats.update({
+            'latency': None, 'visits': 0.0, 'challenges': 0.0, 'samples': 0, 'failures': 0,
+            'sidelined_until': until, 'reason': reason,
+        })
+
+    @staticmethod
+    def _apply_assign(assignments: Dict[str, str], account: str, proxy: Optional[str]):
+        if proxy:
+            assignments[account] = proxy
+        else:
+            assignments.pop(account, None)
+
+    def status(self) -> List[Dict[str, Any]]:
+        """各代理的健康状况与分到的账号，供控制接口和日志使用"""
+        with self._lock:
+            now = self.clock()
+            result = []
+            for proxy in self.proxies:
+                stats = self._stats(proxy)
+                until = stats['sidelined_until']
+                result.append({
+                    'proxy': proxy,
+                    'available': until <= now,
+                    'latency': stats['latency'],
+                    'challenge_rate': round(self.challenge_rate(proxy), 3),
+                    'samples': stats['samples'],
+                    'score': round(self.score(proxy), 2),
+                    'accounts': sorted(name for name, assigned in self.assignments.items() if assigned == proxy),
+                    'sidelined_until': datetime.fromtimestamp(until).isoformat(timespec='seconds')
+                    if until > now else None,
+                    'reason': stats['reason'] if until > now else None,
+                })
+            return result
+
+    def flush(self):
+        """把本次的统计和分配合并写入状态文件
+
+        先重新读取文件，再把本次的访问、挑战、暂停和分配依次重放到文件中的状态上，
+        多个进程共用同一 data_dir 时不会互相覆盖。
+        """
+        with self._lock:
+            if not self._pending:
+                return
+            state = load_json(self.path, {}) or {}
+            stats = state.get('proxies', {})
+            assignments = state.get('assignments', {})
+            for kind, key, *args in self._pending:
+                if kind == 'assign':
+                    self._apply_assign(assignments, key, *args)
+                    continue
+                entry = stats.setdefault(key, self._new_stats())
+                if kind == 'visit':
+                    self._apply_visit(entry, *args)
+                elif kind == 'challenge':
+                    self._apply_challenge(entry)
+                else:
+                    self._apply_sideline(entry, *args)
+            save_json(self.path, {'proxies': stats, 'assignments': assignments})
+            self.stats = stats
+            self.assignments = assignments
+            self._pending = []
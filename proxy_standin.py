@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地替身代理
+用标准库实现一个 HTTP 代理: 转发绝对 URI 形式的 HTTP 请求，并通过 CONNECT 建立隧道 (HTTPS)。
+可以给每个请求加上延迟、随机断开连接，或按比例把 HTTP 请求替换成 Cloudflare 挑战页面，
+配合 site_standin.py 在本地测试代理池的评分和暂停 (真实 Chrome 与无浏览器的 HTTP 签到都可以使用)。
+CONNECT 隧道中的内容是加密的，挑战页面只对明文 HTTP 请求生效。
+
+用法:
+    python proxy_standin.py --port 3128 --latency-ms 500 --challenge-rate 0.3
+"""
+
+import argparse
+import http.client
+import random
+import select
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Tuple
+from urllib.parse import urlsplit
+
+CHALLENGE_PAGE = """<!DOCTYPE html>
+<html><head><title>Just a moment...</title></head>
+<body>
+<div id="challenge-running">Checking if the site connection is secure</div>
+<script>window._cf_chl_opt = {cType: 'managed'};</script>
+</body></html>
+"""
+
+# 逐跳首部，不转发
+HOP_HEADERS = {'connection', 'keep-alive', 'proxy-connection', 'proxy-authorization', 'proxy-authenticate',
+               'te', 'trailer', 'transfer-encoding', 'upgrade'}
+
+
+class ProxyStandin(ThreadingHTTPServer):
+    """替身代理服务器
+
+    Args:
+        address: 监听地址，端口为 0 时自动分配
+        latency_ms: 每个请求 (或隧道建立) 的额外延迟 (毫秒)
+        jitter_ms: 延迟的随机抖动上限 (毫秒)
+        challenge_rate: 把明文 HTTP 请求替换为 Cloudflare 挑战页面 (503) 的概率
+        fail_rate: 不作回应直接断开连接的概率，模拟不稳定的代理
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: Tuple[str, int] = ('127.0.0.1', 0), latency_ms: float = 0, jitter_ms: float = 0,
+                 challenge_rate: float = 0, fail_rate: float = 0):
+        super().__init__(address, _Handler)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.challenge_rate = challenge_rate
+        self.fail_rate = fail_rate
+        self.lock = threading.Lock()
+        self.stats: Dict[str, int] = {'requests': 0, 'tunnels': 0, 'challenges': 0, 'failures': 0}
+
+    @property
+    def url(self) -> str:
+        """代理地址 (用于 proxies 配置)"""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'ProxyStandin':
+        """在后台线程中运行"""
+        threading.Thread(target=self.serve_forever, name='proxy-standin', daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def count(self, key: str, amount: int = 1):
+        with self.lock:
+            self.stats[key] = self.stats.get(key, 0) + amount
+
+    def snapshot(self) -> Dict[str, int]:
+        """请求计数的副本"""
+        with self.lock:
+            return dict(self.stats)
+
+    def reset(self):
+        """清空计数"""
+        with self.lock:
+            for key in self.stats:
+                self.stats[key] = 0
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: ProxyStandin
+    server_version = 'ProxyStandin'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _delay_or_fail(self, key: str) -> bool:
+        """计数并模拟延迟和断开，返回 False 表示已断开连接"""
+        server = self.server
+        server.count(key)
+        delay = server.latency_ms + random.uniform(0, server.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+        if server.fail_rate and random.random() < server.fail_rate:
+            server.count('failures')
+            self.close_connection = True
+            self.connection.shutdown(socket.SHUT_RDWR)
+            return False
+        return True
+
+    def _send(self, status: int, body: str, content_type: str = 'text/plain; charset=utf-8'):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(data)
+        self.close_connection = True
+
+    def do_CONNECT(self):
+        if not self._delay_or_fail('tunnels'):
+            return
+        host, _, port = self.path.rpartition(':')
+        try:
+            upstream = socket.create_connection((host, int(port)), timeout=10)
+        except (OSError, ValueError) as e:
+            self._send(502, f"无法连接 {self.path}: {e}")
+            return
+        self.send_response(200, 'Connection Established')
+        self.end_headers()
+        self.close_connection = True
+        self._relay(upstream)
+
+    def _relay(self, upstream: socket.socket):
+        """在客户端和目标之间双向转发，直到任意一方关闭"""
+        sockets = [self.connection, upstream]
+        try:
+            while True:
+                readable, _, errored = select.select(sockets, [], sockets, 60)
+                if errored or not readable:
+                    return
+                for sock in readable:
+                    data = sock.recv(65536)
+                    if not data:
+                        return
+                    (upstream if sock is self.connection else self.connection).sendall(data)
+        except OSError:
+            pass
+        finally:
+            upstream.close()
+
+    def _forward(self):
+        """转发绝对 URI 形式的明文 HTTP 请求"""
+        if not self._delay_or_fail('requests'):
+            return
+        target = urlsplit(self.path)
+        if target.scheme != 'http' or not target.hostname:
+            self._send(400, '只转发 http:// 绝对地址的请求，HTTPS 请使用 CONNECT')
+            return
+        server = self.server
+        if server.challenge_rate and random.random() < server.challenge_rate:
+            server.count('challenges')
+            self._send(503, CHALLENGE_PAGE, 'text/html; charset=utf-8')
+            return
+
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else None
+        headers = {name: value for name, value in self.headers.items() if name.lower() not in HOP_HEADERS}
+        path = target.path or '/'
+        if target.query:
+            path += f"?{target.query}"
+        connection = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=30)
+        try:
+            connection.request(self.command, path, body=body, headers=headers)
+            response = connection.getresponse()
+            data = response.read()
+        except OSError as e:
+            self._send(502, f"上游请求失败: {e}")
+            return
+        finally:
+            connection.close()
+
+        self.send_response(response.status, response.reason)
+        for name, value in response.getheaders():
+            if name.lower() not in HOP_HEADERS and name.lower() != 'content-length':
+                self.send_header(name, value)
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(data)
+        self.close_connection = True
+
+    do_GET = do_POST = do_HEAD = do_PUT = do_DELETE = _forward
+
+
+def main():
+    parser = argparse.ArgumentParser(description='本地替身代理 (仅供测试)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=3128)
+    parser.add_argument('--latency-ms', type=float, default=0, help='每个请求的额外延迟')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='延迟的随机抖动上限')
+    parser.add_argument('--challenge-rate', type=float, default=0, help='返回 Cloudflare 挑战页面的概率')
+    parser.add_argument('--fail-rate', type=float, default=0, help='直接断开连接的概率')
+    args = parser.parse_args()
+    server = ProxyStandin((args.host, args.port), latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                          challenge_rate=args.challenge_rate, fail_rate=args.fail_rate)
+    print(f"监听 {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+精简的 Redis 协议 (RESP2) 客户端
+只实现会话存储和账号租约用到的基本命令收发，不依赖 redis-py；
+可连接 Redis/KeyDB/Valkey 等兼容服务，或本地的 resp_standin 替身服务
+"""
+
+import socket
+import threading
+from typing import Any, List, Optional
+from urllib.parse import unquote, urlparse
+
+
+class RespError(Exception):
+    """服务器返回的错误回复"""
+
+
+class RespClient:
+    """单连接的 RESP 客户端，调用方需持有 lock 才能执行事务 (WATCH/MULTI/EXEC)"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 6379, db: int = 0,
+                 password: Optional[str] = None, timeout: float = 5.0):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.timeout = timeout
+        self.lock = threading.RLock()
+        self._sock: Optional[socket.socket] = None
+        self._reader = None
+        self._in_transaction = False
+
+    @classmethod
+    def from_url(cls, url: str, timeout: float = 5.0) -> 'RespClient':
+        """从 redis://[:密码@]主机[:端口][/库号] 创建客户端"""
+        parsed = urlparse(url)
+        db = parsed.path.strip('/')
+        return cls(
+            host=parsed.hostname or '127.0.0.1',
+            port=parsed.port or 6379,
+            db=int(db) if db else 0,
+            password=unquote(parsed.password) if parsed.password else None,
+            timeout=timeout,
+        )
+
+    def _connect(self):
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._reader = self._sock.makefile('rb')
+        if self.password:
+            self._call('AUTH', self.password)
+        if self.db:
+            self._call('SELECT', self.db)
+
+    def close(self):
+        """关闭连接"""
+        if self._sock:
+            try:
+                self._reader.close()
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = None
+        self._reader = None
+
+    def execute(self, *args) -> Any:
+        """发送一条命令并返回回复，连接断开时重连一次"""
+        with self.lock:
+            if self._sock is None:
+                self._connect()
+            command = str(args[0]).upper()
+            in_transaction = self._in_transaction
+            if command in ('WATCH', 'MULTI'):
+                self._in_transaction = True
+            elif command in ('EXEC', 'DISCARD', 'UNWATCH'):
+                self._in_transaction = False
+            try:
+                return self._call(*args)
+            except (OSError, ConnectionError):
+                self.close()
+                # 事务进行中断线时 WATCH 已失效，不能在新连接上重放
+                if in_transaction or command in ('WATCH', 'MULTI', 'EXEC'):
+                    self._in_transaction = False
+                    raise
+                self._connect()
+                return self._call(*args)
+
+    def _call(self, *args) -> Any:
+        self._sock.sendall(self._encode(args))
+        return self._read_reply()
+
+    @staticmethod
+    def _encode(args) -> bytes:
+        parts: List[bytes] = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode('utf-8')
+            parts.append(f"${len(data)}\r\n".encode())
+            parts.append(data + b"\r\n")
+        return b''.join(parts)
+
+    def _read_reply(self) -> Any:
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("连接已被服务器关闭")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b'+':
+            return payload.decode('utf-8')
+        if kind == b'-':
+            raise RespError(payload.decode('utf-8'))
+        if kind == b':':
+            return int(payload)
+        if kind == b'$':
+            length = int(payload)
+            if length < 0:
+                return None
+            data = self._reader.read(length + 2)
+            return data[:-2]
+        if kind == b'*':
+            count = int(payload)
+            if count < 0:
+                return None
+            return [self._read_reply() for _ in range(count)]
+        raise RespError(f"无法解析的回复: {line[:50]!r}")
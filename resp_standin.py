@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Redis 协议替身服务
+在本地用纯 Python 实现会话存储和账号租约用到的 Redis 命令子集 (字符串、集合、过期时间、
+WATCH/MULTI/EXEC 事务)，用于在没有 Redis 的环境中测试多节点部署。数据只保存在内存中。
+
+用法:
+    python resp_standin.py --port 6390
+"""
+
+import argparse
+import fnmatch
+import socketserver
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+
+class _Reply:
+    """状态回复 (+OK) 与错误回复 (-ERR) 的标记"""
+
+    def __init__(self, text: str, error: bool = False):
+        self.text = text
+        self.error = error
+
+
+OK = _Reply('OK')
+QUEUED = _Reply('QUEUED')
+
+
+class Keyspace:
+    """线程安全的内存键空间"""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.data: Dict[bytes, Any] = {}
+        self.expires: Dict[bytes, float] = {}
+        # 每个键的修改计数，用于 WATCH
+        self.revisions: Dict[bytes, int] = {}
+
+    def _expire_if_needed(self, key: bytes):
+        deadline = self.expires.get(key)
+        if deadline is not None and time.time() >= deadline:
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+            self.touch(key)
+
+    def touch(self, key: bytes):
+        self.revisions[key] = self.revisions.get(key, 0) + 1
+
+    def revision(self, key: bytes) -> int:
+        self._expire_if_needed(key)
+        return self.revisions.get(key, 0)
+
+    def get(self, key: bytes) -> Any:
+        self._expire_if_needed(key)
+        return self.data.get(key)
+
+    def set(self, key: bytes, value: Any, ttl: Optional[float] = None):
+        self.data[key] = value
+        if ttl is None:
+            self.expires.pop(key, None)
+        else:
+            self.expires[key] = time.time() + ttl
+        self.touch(key)
+
+    def delete(self, key: bytes) -> bool:
+        self._expire_if_needed(key)
+        existed = key in self.data
+        self.data.pop(key, None)
+        self.expires.pop(key, None)
+        if existed:
+            self.touch(key)
+        return existed
+
+
+class StandinHandler(socketserver.StreamRequestHandler):
+    """单个客户端连接"""
+
+    def setup(self):
+        super().setup()
+        self.watched: Dict[bytes, int] = {}
+        self.queue: Optional[List[List[bytes]]] = None
+        self.dirty = False
+
+    @property
+    def keyspace(self) -> Keyspace:
+        return self.server.keyspace
+
+    def handle(self):
+        while True:
+            try:
+                command = self._read_command()
+            except (ConnectionError, ValueError):
+                return
+            if command is None:
+                return
+            self.wfile.write(self._encode(self._dispatch(command)))
+
+    def _read_command(self) -> Optional[List[bytes]]:
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b'*'):
+            # 内联命令 (如 telnet 手动输入)
+            return line.strip().split()
+        args = []
+        for _ in range(int(line[1:-2])):
+            header = self.rfile.readline()
+            length = int(header[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def _encode(self, value: Any) -> bytes:
+        if isinstance(value, _Reply):
+            return f"{'-' if value.error else '+'}{value.text}\r\n".encode('utf-8')
+        if value is None:
+            return b"$-1\r\n"
+        if isinstance(value, bool):
+            value = int(value)
+        if isinstance(value, int):
+            return f":{value}\r\n".encode()
+        if isinstance(value, (list, tuple, set)):
+            return f"*{len(value)}\r\n".encode() + b''.join(self._encode(item) for item in value)
+        data = value if isinstance(value, bytes) else str(value).encode('utf-8')
+        return f"${len(data)}\r\n".encode() + data + b"\r\n"
+
+    def _dispatch(self, command: List[bytes]) -> Any:
+        if not command:
+            return _Reply('ERR empty command', error=True)
+        name = command[0].decode('utf-8', 'replace').upper()
+        args = command[1:]
+
+        if name == 'MULTI':
+            if self.queue is not None:
+                return _Reply('ERR MULTI calls can not be nested', error=True)
+            self.queue = []
+            return OK
+        if name == 'DISCARD':
+            self.queue = None
+            self.watched = {}
+            return OK
+        if name == 'EXEC':
+            return self._exec()
+        if self.queue is not None and name not in ('WATCH',):
+            self.queue.append(command)
+            return QUEUED
+        if name == 'WATCH':
+            with self.keyspace.lock:
+                for key in args:
+                    self.watched[key] = self.keyspace.revision(key)
+            return OK
+        if name == 'UNWATCH':
+            self.watched = {}
+            return OK
+        with self.keyspace.lock:
+            return self._execute(name, args)
+
+    def _exec(self) -> Any:
+        if self.queue is None:
+            return _Reply('ERR EXEC without MULTI', error=True)
+        queue, self.queue = self.queue, None
+        with self.keyspace.lock:
+            watched, self.watched = self.watched, {}
+            if any(self.keyspace.revision(key) != revision for key, revision in watched.items()):
+                return None
+            return [self._execute(cmd[0].decode('utf-8', 'replace').upper(), cmd[1:]) for cmd in queue]
+
+    def _execute(self, name: str, args: List[bytes]) -> Any:
+        """执行单条命令 (调用方持有键空间锁)"""
+        ks = self.keyspace
+        try:
+            handler = getattr(self, f"cmd_{name.lower()}")
+        except AttributeError:
+            return _Reply(f"ERR unknown command '{name}'", error=True)
+        try:
+            return handler(ks, *args)
+        except TypeError:
+            return _Reply(f"ERR wrong number of arguments for '{name.lower()}' command", error=True)
+        except (ValueError, IndexError) as e:
+            return _Reply(f"ERR {e}", error=True)
+
+    # ---- 命令实现 ----
+
+    def cmd_ping(self, ks, message=None):
+        return message if message is not None else _Reply('PONG')
+
+    def cmd_auth(self, ks, *args):
+        return OK
+
+    def cmd_select(self, ks, db):
+        return OK
+
+    def cmd_flushall(self, ks, *args):
+        for key in list(ks.data):
+            ks.delete(key)
+        return OK
+
+    def cmd_get(self, ks, key):
+        value = ks.get(key)
+        if value is not None and not isinstance(value, bytes):
+            return _Reply('WRONGTYPE Operation against a key holding the wrong kind of value', error=True)
+        return value
+
+    def cmd_set(self, ks, key, value, *options):
+        ttl = None
+        nx = xx = False
+        opts = [opt.upper() for opt in options]
+        i = 0
+        while i < len(opts):
+            if opts[i] == b'NX':
+                nx = True
+            elif opts[i] == b'XX':
+                xx = True
+            elif opts[i] in (b'EX', b'PX'):
+                amount = float(opts[i + 1])
+                ttl = amount if opts[i] == b'EX' else amount / 1000
+                i += 1
+            else:
+                raise ValueError('syntax error')
+            i += 1
+        exists = ks.get(key) is not None
+        if (nx and exists) or (xx and not exists):
+            return None
+        ks.set(key, value, ttl)
+        return OK
+
+    def cmd_del(self, ks, *keys):
+        return sum(ks.delete(key) for key in keys)
+
+    def cmd_exists(self, ks, *keys):
+        return sum(ks.get(key) is not None for key in keys)
+
+    def cmd_incr(self, ks, key):
+        value = int(ks.get(key) or 0) + 1
+        ttl = ks.expires.get(key)
+        ks.set(key, str(value).encode(), None if ttl is None else ttl - time.time())
+        return value
+
+    def cmd_pexpire(self, ks, key, millis):
+        if ks.get(key) is None:
+            return 0
+        ks.expires[key] = time.time() + int(millis) / 1000
+        ks.touch(key)
+        return 1
+
+    def cmd_expire(self, ks, key, seconds):
+        return self.cmd_pexpire(ks, key, int(seconds) * 1000)
+
+    def cmd_pttl(self, ks, key):
+        if ks.get(key) is None:
+            return -2
+        deadline = ks.expires.get(key)
+        return -1 if deadline is None else int((deadline - time.time()) * 1000)
+
+    def cmd_keys(self, ks, pattern):
+        matches = []
+        for key in list(ks.data):
+            if ks.get(key) is not None and fnmatch.fnmatchcase(key.decode('utf-8', 'replace'),
+                                                               pattern.decode('utf-8', 'replace')):
+                matches.append(key)
+        return matches
+
+    def _set_value(self, ks, key) -> Set[bytes]:
+        value = ks.get(key)
+        if value is None:
+            return set()
+        if not isinstance(value, set):
+            raise ValueError('WRONGTYPE')
+        return value
+
+    def cmd_sadd(self, ks, key, *members):
+        current = self._set_value(ks, key)
+        added = len(set(members) - current)
+        ks.set(key, current | set(members), None)
+        return added
+
+    def cmd_srem(self, ks, key, *members):
+        current = self._set_value(ks, key)
+        removed = len(current & set(members))
+        remaining = current - set(members)
+        if remaining:
+            ks.set(key, remaining, None)
+        else:
+            ks.delete(key)
+        return removed
+
+    def cmd_smembers(self, ks, key):
+        return sorted(self._set_value(ks, key))
+
+
+class StandinServer(socketserver.ThreadingTCPServer):
+    """Redis 协议替身服务器"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: Tuple[str, int] = ('127.0.0.1', 0)):
+        super().__init__(address, StandinHandler)
+        self.keyspace = Keyspace()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+    def start(self) -> 'StandinServer':
+        """在后台线程中运行"""
+        threading.Thread(target=self.serve_forever, name='resp-standin', daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Redis 协议替身服务 (内存存储，仅供测试)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=6390)
+    args = parser.parse_args()
+    server = StandinServer((args.host, args.port))
+    print(f"监听 {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
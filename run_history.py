@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+运行历史模块
+记录各阶段 (页面加载、Cloudflare 挑战、元素等待等) 的耗时，
+并根据历史分位数推导自适应超时时间
+"""
+
+import math
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from storage import load_json, save_json
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """最近秩法计算分位数"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class RunHistory:
+    """各阶段耗时的持久化历史
+
+    样本格式: [时间戳, 耗时(秒), 是否成功]，等到超时才失败的样本追加第 4 项 True，
+    每个阶段只保留最近 MAX_SAMPLES 条。
+    同一 data_dir 的各账号共用一个历史文件，各阶段的耗时取决于站点本身而不是账号。
+    """
+
+    MAX_SAMPLES = 200
+
+    def __init__(self, path: Path, min_samples: int = 5, margin: float = 1.5):
+        """初始化运行历史
+
+        Args:
+            path: 历史文件路径
+            min_samples: 启用自适应超时所需的最少成功样本数
+            margin: 在分位数基础上放大的倍数，给偶发的慢请求留余量
+        """
+        self.path = Path(path)
+        self.min_samples = min_samples
+        self.margin = margin
+        self.phases: Dict[str, List[list]] = load_json(self.path, {}).get('phases', {})
+        # 本次运行新增、尚未写入文件的样本
+        self._pending: Dict[str, List[list]] = {}
+
+    def record(self, phase: str, duration: float, ok: bool = True, timed_out: bool = False):
+        """记录一次阶段耗时
+
+        Args:
+            phase: 阶段名称
+            duration: 耗时 (秒)
+            ok: 是否成功
+            timed_out: 失败原因是等到了超时，此时真实耗时至少为 duration (删失样本)
+        """
+        sample = [round(time.time(), 3), round(duration, 3), ok]
+        if timed_out and not ok:
+            sample.append(True)
+        self.phases.setdefault(phase, []).append(sample)
+        self._pending.setdefault(phase, []).append(sample)
+
+    def durations(self, phase: str, hour: Optional[int] = None, censored: bool = False) -> List[float]:
+        """获取某阶段成功样本的耗时
+
+        Args:
+            phase: 阶段名称
+            hour: 只取该小时前后一小时内的样本 (站点在某些时段明显更慢)
+            censored: 同时包含超时失败的样本 (按当时的超时时间计)
+        """
+        values = []
+        for sample in self.phases.get(phase, []):
+            timestamp, duration, ok = sample[:3]
+            if not ok and not (censored and len(sample) > 3 and sample[3]):
+                continue
+            if hour is not None:
+                sample_hour = datetime.fromtimestamp(timestamp).hour
+                if min((sample_hour - hour) % 24, (hour - sample_hour) % 24) > 1:
+                    continue
+            values.append(duration)
+        return values
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """各阶段的样本数、失败数、最近一次耗时和 P50/P95"""
+        result = {}
+        for phase, samples in self.phases.items():
+            values = self.durations(phase)
+            result[phase] = {
+                'samples': len(samples),
+                'failures': sum(1 for sample in samples if not sample[2]),
+                'last': samples[-1][1] if samples else None,
+                'last_at': datetime.fromtimestamp(samples[-1][0]).isoformat(timespec='seconds') if samples else None,
+                'p50': percentile(values, 50),
+                'p95': percentile(values, 95),
+            }
+        return result
+
+    def pending_summary(self) -> Dict[str, Dict[str, Any]]:
+        """本次运行 (尚未写入文件) 各阶段的次数、失败数、总耗时和最近一次耗时"""
+        return {
+            phase: {
+                'count': len(samples),
+                'failures': sum(1 for sample in samples if not sample[2]),
+                'total': round(sum(sample[1] for sample in samples), 3),
+                'last': samples[-1][1],
+            }
+            for phase, samples in self._pending.items()
+        }
+
+    def timeout(self, phase: str, default: float, floor: float, ceiling: float,
+                pct: float = 95) -> float:
+        """根据历史分位数推导超时时间
+
+        当前时段样本足够时优先使用时段样本，否则使用全部样本；
+        样本不足时返回默认值。结果限制在 [floor, ceiling] 内。
+        超时失败的样本按当时的超时时间参与计算，站点变慢后超时会随之放大，而不是一直停在下限。
+        """
+        values = self.durations(phase, hour=datetime.now().hour, censored=True)
+        if len(values) < self.min_samples:
+            values = self.durations(phase, censored=True)
+        if len(values) < self.min_samples:
+            return default
+        value = percentile(values, pct) * self.margin
+        return round(min(max(value, floor), ceiling), 1)
+
+    def flush(self):
+        """把本次运行的新样本合并写入历史文件
+
+        先重新读取文件再合并，多个账号/进程先后写入时不会互相覆盖样本。
+        """
+        if not self._pending:
+            return
+        phases = load_json(self.path, {}).get('phases', {})
+        for phase, samples in self._pending.items():
+            merged = phases.get(phase, []) + samples
+            phases[phase] = merged[-self.MAX_SAMPLES:]
+        save_json(self.path, {'phases': phases})
+        self.phases = phases
+        self._pending = {}
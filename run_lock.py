@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+账号级运行锁模块
+用 flock 文件锁保证同一账号同一时间只有一次签到在执行 (跨进程、跨共享 data 卷的容器)。
+后到的调用会等待进行中的签到结束并直接复用它写下的结果，而不是再启动一个浏览器。
+"""
+
+import json
+import logging
+import os
+import socket
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from storage import load_json, save_json
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+
+class RunLock:
+    """单个账号的运行锁与最近结果"""
+
+    # 等待锁时的轮询间隔 (秒)
+    POLL_INTERVAL = 1.0
+
+    def __init__(self, lock_path: Path, result_path: Path, logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            lock_path: 锁文件路径，锁持有者信息也写在其中
+            result_path: 最近一次运行结果的文件路径
+            logger: 日志记录器
+        """
+        self.lock_path = Path(lock_path)
+        self.result_path = Path(result_path)
+        self.logger = logger or logging.getLogger('HitunCheckin')
+        # 本次获取锁前是否等待过其他进程
+        self.waited = False
+        self._fd: Optional[int] = None
+
+    def _try_lock(self) -> bool:
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            return False
+
+    def holder(self) -> Dict[str, Any]:
+        """当前持有者写下的信息 (pid/主机/开始时间)"""
+        try:
+            return json.loads(self.lock_path.read_text(encoding='utf-8') or '{}')
+        except (OSError, ValueError):
+            return {}
+
+    def acquire(self, timeout: Optional[float] = None, purpose: str = 'run') -> bool:
+        """获取锁
+
+        Args:
+            timeout: 最长等待秒数，None 表示一直等待，0 表示不等待
+            purpose: 写入持有者信息的用途说明
+
+        Returns:
+            是否获得锁；平台不支持 flock 时总是返回 True
+        """
+        self.waited = False
+        if not FCNTL_AVAILABLE:
+            return True
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+        self._fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+
+        if not self._try_lock():
+            if timeout == 0:
+                self._close()
+                return False
+            holder = self.holder()
+            self.logger.info(
+                f"另一个进程正在运行 (pid {holder.get('pid', '?')}@{holder.get('host', '?')}, "
+                f"{holder.get('purpose', '?')}, 开始于 {holder.get('started', '?')})，等待其完成..."
+            )
+            self.waited = True
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while not self._try_lock():
+                if deadline is not None and time.monotonic() >= deadline:
+                    self._close()
+                    return False
+                time.sleep(self.POLL_INTERVAL)
+
+        os.ftruncate(self._fd, 0)
+        os.pwrite(self._fd, json.dumps({
+            'pid': os.getpid(),
+            'host': socket.gethostname(),
+            'purpose': purpose,
+            'started': datetime.now().isoformat(timespec='seconds'),
+        }).encode('utf-8'), 0)
+        return True
+
+    def release(self):
+        """释放锁"""
+        if self._fd is None:
+            return
+        try:
+            os.ftruncate(self._fd, 0)
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        finally:
+            self._close()
+
+    def _close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def write_result(self, result: Dict[str, Any]):
+        """记录本次运行结果，供等待中的调用复用"""
+        save_json(self.result_path, {**result, 'finished_at': time.time()})
+
+    def result_since(self, since: float) -> Optional[Dict[str, Any]]:
+        """读取在 since 之后结束的运行结果，没有则返回 None (如持有者崩溃未写结果)"""
+        result = load_json(self.result_path)
+        if result and result.get('finished_at', 0) >= since:
+            return result
+        return None
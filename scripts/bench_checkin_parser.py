@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+签到结果解析的样本检查与基准测试
+先用 scripts/checkin_corpus.json 中收集的弹窗/接口消息和页面片段逐条检查 checkin_parser 的解析结果，
+再测量解析消息和整页源码的耗时，并与旧的实现 (每次用 4 个未编译的正则扫描整个文本) 对比；
+旧实现还会通过 WebDriver 多取一次页面源码，这次往返不在测量范围内。
+页面样本会用用户中心常见的卡片标记填充到 --page-kb 指定的大小，并混入"剩余流量 10GB"之类的干扰文本。
+
+用法:
+    python scripts/bench_checkin_parser.py                 # 检查样本并测试
+    python scripts/bench_checkin_parser.py --check-only    # 只检查样本，失败时返回非 0
+    python scripts/bench_checkin_parser.py --page-kb 300 --number 2000
+"""
+
+import argparse
+import json
+import re
+import sys
+import timeit
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from checkin_parser import parse_message, parse_page  # noqa: E402
+
+CORPUS = Path(__file__).resolve().parent / 'checkin_corpus.json'
+
+# 旧实现中的流量格式 (只识别 MB)
+LEGACY_PATTERNS = [
+    r'获得[了]?\s*(\d+)\s*M',
+    r'奖励[了]?\s*(\d+)\s*M',
+    r'(\d+)\s*M[B]?\s*流量',
+    r'流量[：:]\s*(\d+)\s*M',
+]
+
+# 填充页面用的用户中心卡片
+FILLER = (
+    '<div class="col-lg-3 col-md-6 col-sm-12"><div class="card card-statistic-2">'
+    '<div class="card-stats"><div class="card-stats-title">剩余流量</div></div>'
+    '<div class="card-icon shadow-primary bg-primary"><i class="fas fa-gas-pump"></i></div>'
+    '<div class="card-wrap"><div class="card-header"><h4>剩余流量</h4></div>'
+    '<div class="card-body"><span class="counter">10</span> GB 流量</div>'
+    '<div class="card-stats-items"><div class="card-stats-item-count">今日已用: 356.2MB</div>'
+    '<a href="/user/shop" class="text-muted">购买套餐可获得更多流量</a></div></div></div></div>\n'
+)
+
+
+def legacy_extract(text: str) -> Optional[str]:
+    for pattern in LEGACY_PATTERNS:
+        match = re.search(pattern, text)
+        if match:
+            return match.group(1)
+    return None
+
+
+def legacy_page(source: str) -> Any:
+    """旧实现在页面源码上的工作量: 提取流量后再检查成功提示"""
+    traffic = legacy_extract(source)
+    succeeded = '签到成功' in source or '获得' in source
+    return traffic, succeeded
+
+
+def pad_page(snippet: str, size_kb: int) -> str:
+    """把页面片段放在填充的用户中心页面末尾 (签到结果弹窗通常在 body 最后)"""
+    repeat = max(size_kb * 1024 // len(FILLER.encode('utf-8')), 1)
+    return f"<html><head><title>用户中心</title></head><body>{FILLER * repeat}{snippet}</body></html>"
+
+
+def check(corpus: List[Dict[str, Any]], page_kb: int) -> List[str]:
+    """逐条检查样本，返回不符合预期的描述"""
+    failures = []
+    for case in corpus:
+        variants = [('', case['text'])]
+        if case['kind'] == 'page':
+            variants.append((f' (填充到 {page_kb}KB)', pad_page(case['text'], page_kb)))
+        for suffix, text in variants:
+            parser = parse_page if case['kind'] == 'page' else parse_message
+            result = parser(text)
+            actual = {
+                'traffic': result.traffic,
+                'already_checked_in': result.already_checked_in,
+                'succeeded': result.succeeded,
+            }
+            for key, expected in case['expect'].items():
+                if actual[key] != expected:
+                    failures.append(f"{case['name']}{suffix}: {key} 应为 {expected!r}，实际 {actual[key]!r}")
+    return failures
+
+
+def bench(label: str, func, texts: List[str], number: int) -> float:
+    """所有样本各解析 number 次，取 5 轮中最快的一轮，返回每次解析的平均耗时 (微秒)"""
+    total = min(timeit.repeat(lambda: [func(text) for text in texts], number=number, repeat=5))
+    micros = total / (number * len(texts)) * 1e6
+    print(f"  {label:<28} {micros:>10.1f} µs/次")
+    return micros
+
+
+def main():
+    parser = argparse.ArgumentParser(description='签到结果解析的样本检查与基准测试')
+    parser.add_argument('--corpus', default=str(CORPUS), help='样本文件 (默认 scripts/checkin_corpus.json)')
+    parser.add_argument('--page-kb', type=int, default=120, help='页面样本填充到的大小 (KB，默认 120)')
+    parser.add_argument('--number', type=int, default=1000, help='每组样本重复解析的次数 (默认 1000)')
+    parser.add_argument('--check-only', action='store_true', help='只检查样本，不做基准测试')
+    args = parser.parse_args()
+
+    with open(args.corpus, 'r', encoding='utf-8') as f:
+        corpus = json.load(f)
+
+    failures = check(corpus, args.page_kb)
+    print(f"样本 {len(corpus)} 条，不符合预期 {len(failures)} 条")
+    for failure in failures:
+        print(f"  ✗ {failure}")
+    if failures:
+        sys.exit(1)
+    if args.check_only:
+        return
+
+    messages = [case['text'] for case in corpus if case['kind'] == 'message']
+    pages = [pad_page(case['text'], args.page_kb) for case in corpus if case['kind'] == 'page']
+    print(f"\n消息 {len(messages)} 条:")
+    old = bench('旧实现', legacy_extract, messages, args.number)
+    new = bench('parse_message', parse_message, messages, args.number)
+    print(f"  {'加速':<28} {old / new:>10.1f} x")
+
+    number = max(args.number // 10, 1)
+    print(f"\n页面 {len(pages)} 个 (各约 {args.page_kb}KB):")
+    old = bench('旧实现', legacy_page, pages, number)
+    new = bench('parse_page', parse_page, pages, number)
+    print(f"  {'加速':<28} {old / new:>10.1f} x")
+
+
+if __name__ == '__main__':
+    main()
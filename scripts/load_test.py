@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多账号压力测试
+用若干合成账号对本地的 hitun.io 替身站点 (site_standin) 执行完整的 run()，
+按不同并发数逐级测试，记录每一级的吞吐、耗时分位数、内存峰值、Chrome 进程数和失败率，
+输出 CSV/JSON 曲线，便于在不同版本之间对比
+
+用法:
+    python scripts/load_test.py --accounts 200 --concurrency 1,5,10,25,50
+    python scripts/load_test.py --accounts 50 --driver fake        # 不启动 Chrome，只测量程序自身开销
+    python scripts/load_test.py --latency-ms 150 --error-rate 0.02 --label v2.3
+    python scripts/load_test.py --accounts 20 --login-submit classic --label classic   # 对比登录表单提交方式
+    python scripts/load_test.py --proxies 3 --slow-proxy-ms 3000 --proxy-max-latency 2   # 经由替身代理，第一个代理过慢
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from browser_pool import process_tree, process_tree_rss_mb  # noqa: E402
+from hitun_checkin import HitunCheckin  # noqa: E402
+from proxy_standin import ProxyStandin  # noqa: E402
+from run_history import percentile  # noqa: E402
+from site_standin import SiteStandin  # noqa: E402
+
+# CSV 列顺序
+FIELDS = [
+    'concurrency', 'accounts', 'succeeded', 'failed', 'failure_rate', 'wall_seconds',
+    'throughput_per_min', 'p50_seconds', 'p95_seconds', 'p99_seconds', 'max_seconds',
+    'peak_rss_mb', 'peak_chrome_processes', 'peak_driver_processes',
+    'site_requests', 'site_errors', 'site_logins', 'site_checkins',
+    'proxies_sidelined', 'proxy_accounts',
+]
+
+
+def _comm(pid: int) -> str:
+    try:
+        with open(f'/proc/{pid}/comm', 'r') as f:
+            return f.read().strip().lower()
+    except OSError:
+        return ''
+
+
+class ResourceSampler(threading.Thread):
+    """后台定期采样本进程及其子进程的内存与 Chrome 进程数，记录峰值"""
+
+    def __init__(self, interval: float = 0.5):
+        super().__init__(name='sampler', daemon=True)
+        self.interval = interval
+        self.peak_rss_mb = 0.0
+        self.peak_chrome = 0
+        self.peak_drivers = 0
+        self._done = threading.Event()
+
+    def sample(self):
+        pids = process_tree([os.getpid()])
+        rss_mb = process_tree_rss_mb([os.getpid()]) or 0.0
+        names = [_comm(pid) for pid in pids]
+        drivers = sum(1 for name in names if 'driver' in name)
+        chrome = sum(1 for name in names if 'chrom' in name and 'driver' not in name)
+        self.peak_rss_mb = max(self.peak_rss_mb, rss_mb)
+        self.peak_chrome = max(self.peak_chrome, chrome)
+        self.peak_drivers = max(self.peak_drivers, drivers)
+
+    def run(self):
+        while not self._done.is_set():
+            self.sample()
+            self._done.wait(self.interval)
+
+    def stop(self):
+        self._done.set()
+        self.join()
+        self.sample()
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=Path(__file__).resolve().parent.parent, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _write_config(workdir: Path, base_url: str, args, proxies: List[str]) -> Path:
+    config = {
+        'base_url': base_url,
+        'data_dir': str(workdir / 'data'),
+        'log_dir': str(workdir / 'logs'),
+        'log_level': 'INFO' if args.verbose else 'WARNING',
+        'headless': True,
+        'preflight': False,
+        'enable_notification': False,
+        'max_retry': args.max_retry,
+        'debug_artifacts': False,
+        'speculative_http_checkin': False,
+        'login_submit': args.login_submit,
+        # 替身站点是本地的 http 服务，使用普通 Selenium 即可
+        'use_undetected_chrome': False,
+    }
+    if proxies:
+        config.update({
+            'proxies': proxies,
+            'proxy_max_latency': args.proxy_max_latency,
+            'proxy_min_samples': args.proxy_min_samples,
+        })
+    config_path = workdir / 'config.json'
+    config_path.write_text(json.dumps(config, ensure_ascii=False), encoding='utf-8')
+    return config_path
+
+
+def run_level(concurrency: int, args, site: Optional[SiteStandin], workdir: Path,
+              proxies: List[ProxyStandin]) -> Dict[str, Any]:
+    """以给定并发数为所有合成账号签到一次
+
+    每一级使用全新的 data 目录 (代理池的统计也从零开始)，所有账号都走完整的密码登录。
+    """
+    workdir.mkdir(parents=True)
+    fake_site = clock = None
+    if args.driver == 'fake':
+        from fake_driver import FakeSite, VirtualClock
+        clock = VirtualClock()
+        # 假浏览器不经过替身代理，按替身代理的延迟模拟每次页面加载的额外耗时
+        fake_site = FakeSite(clock=clock, proxies={
+            proxy.url: {'latency': proxy.latency_ms / 1000} for proxy in proxies
+        })
+        base_url, email, password = fake_site.base_url, fake_site.email, fake_site.password
+    else:
+        site.reset()
+        base_url, email, password = site.base_url, None, site.password
+    for proxy in proxies:
+        proxy.reset()
+    config_path = str(_write_config(workdir, base_url, args, [proxy.url for proxy in proxies]))
+    accounts = [
+        {'name': f"load{i:04d}", 'email': email or f"load{i:04d}@example.com", 'password': password}
+        for i in range(args.accounts)
+    ]
+
+    latencies: List[float] = []
+    lock = threading.Lock()
+    pools = []
+
+    def one(account: Dict[str, Any]) -> bool:
+        started = time.perf_counter()
+        try:
+            driver_factory = fake_site.new_driver if fake_site else None
+            checkin = HitunCheckin(config_path, account=account, driver_factory=driver_factory)
+            if checkin.proxies and not pools:
+                pools.append(checkin.proxies)
+            ok = checkin.run()
+        except Exception as e:
+            print(f"  [{account['name']}] 异常: {e}", file=sys.stderr)
+            ok = False
+        with lock:
+            latencies.append(time.perf_counter() - started)
+        return ok
+
+    sampler = ResourceSampler(args.sample_interval)
+    sampler.start()
+    started = time.perf_counter()
+    if clock:
+        # 假浏览器模式下 sleep 和超时由虚拟时钟瞬间完成，耗时只反映程序自身开销
+        with clock.install():
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                results = list(pool.map(one, accounts))
+            # 暂停时间按虚拟时钟计算，需在恢复真实时钟前读取
+            proxy_status = pools[0].status() if pools else []
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(one, accounts))
+        proxy_status = pools[0].status() if pools else []
+    wall = time.perf_counter() - started
+    sampler.stop()
+
+    succeeded = sum(1 for ok in results if ok)
+    stats = site.snapshot() if site and not fake_site else {
+        'requests': fake_site.page_loads, 'errors': 0, 'logins': fake_site.logins, 'checkins': fake_site.checkins,
+    }
+
+    def rounded(value: Optional[float]) -> Optional[float]:
+        return round(value, 2) if value is not None else None
+
+    return {
+        'concurrency': concurrency,
+        'accounts': len(accounts),
+        'succeeded': succeeded,
+        'failed': len(accounts) - succeeded,
+        'failure_rate': round((len(accounts) - succeeded) / len(accounts), 4),
+        'wall_seconds': round(wall, 2),
+        'throughput_per_min': round(len(accounts) / wall * 60, 1) if wall > 0 else None,
+        'p50_seconds': rounded(percentile(latencies, 50)),
+        'p95_seconds': rounded(percentile(latencies, 95)),
+        'p99_seconds': rounded(percentile(latencies, 99)),
+        'max_seconds': rounded(max(latencies) if latencies else None),
+        'peak_rss_mb': round(sampler.peak_rss_mb, 1),
+        'peak_chrome_processes': sampler.peak_chrome,
+        'peak_driver_processes': sampler.peak_drivers,
+        'site_requests': stats.get('requests', 0),
+        'site_errors': stats.get('errors', 0),
+        'site_logins': stats.get('logins', 0),
+        'site_checkins': stats.get('checkins', 0),
+        'proxies_sidelined': sum(1 for entry in proxy_status if not entry['available']),
+        # 各代理分到的账号数，按 proxies 的顺序用 / 连接
+        'proxy_accounts': '/'.join(str(len(entry['accounts'])) for entry in proxy_status),
+        'proxy_status': proxy_status,
+    }
+
+
+def write_report(levels: List[Dict[str, Any]], meta: Dict[str, Any], output_dir: Path) -> Path:
+    """写入 JSON 报告和同名 CSV，返回 JSON 路径"""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    stem = f"loadtest_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    if meta.get('label'):
+        stem += f"_{meta['label']}"
+    json_path = output_dir / f"{stem}.json"
+    json_path.write_text(json.dumps({**meta, 'levels': levels}, ensure_ascii=False, indent=2), encoding='utf-8')
+    with open(output_dir / f"{stem}.csv", 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(levels)
+    return json_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='多账号压力测试 (本地替身站点)')
+    parser.add_argument('--accounts', type=int, default=50, help='合成账号数量 (默认 50)')
+    parser.add_argument('--concurrency', default='1,2,5,10',
+                        help='逗号分隔的并发数列表，逐级测试 (默认 1,2,5,10)')
+    parser.add_argument('--driver', choices=['chrome', 'fake'], default='chrome',
+                        help='chrome: 真实 Chrome 访问替身站点；fake: 进程内假浏览器 (不启动 Chrome)')
+    parser.add_argument('--latency-ms', type=float, default=50, help='替身站点每个请求的基础延迟')
+    parser.add_argument('--jitter-ms', type=float, default=50, help='替身站点延迟的随机抖动上限')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='替身站点随机返回 502 的概率')
+    parser.add_argument('--max-retry', type=int, default=1, help='每个账号的最大重试次数 (默认 1)')
+    parser.add_argument('--login-submit', choices=['fast', 'classic'], default='fast',
+                        help='登录表单提交方式，分别测试两种方式可对比登录耗时 (默认 fast)')
+    parser.add_argument('--proxies', type=int, default=0,
+                        help='启动多少个替身代理并配置为代理池 (默认 0，直接连接)')
+    parser.add_argument('--slow-proxy-ms', type=float, default=0,
+                        help='第一个替身代理每个请求的额外延迟，用于观察代理池暂停慢代理')
+    parser.add_argument('--proxy-challenge-rate', type=float, default=0,
+                        help='第一个替身代理返回 Cloudflare 挑战页面的概率 (仅明文 HTTP 请求)')
+    parser.add_argument('--proxy-max-latency', type=float, default=20, help='代理池的平均耗时上限 (秒，默认 20)')
+    parser.add_argument('--proxy-min-samples', type=int, default=3, help='代理池判断前至少需要的样本数 (默认 3)')
+    parser.add_argument('--stop-failure-rate', type=float, default=0.5,
+                        help='某一级失败率超过该值后停止测试更高的并发 (默认 0.5)')
+    parser.add_argument('--sample-interval', type=float, default=0.5, help='内存与进程数采样间隔 (秒)')
+    parser.add_argument('--label', help='写入报告的版本标签，如 v2.3')
+    parser.add_argument('--output', default='logs/loadtest', help='报告目录 (默认 logs/loadtest)')
+    parser.add_argument('-v', '--verbose', action='store_true', help='输出签到日志')
+    args = parser.parse_args()
+
+    levels_to_run = [int(level) for level in args.concurrency.split(',') if level.strip()]
+    site = None
+    if args.driver == 'chrome':
+        site = SiteStandin(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                           error_rate=args.error_rate).start()
+        print(f"替身站点: {site.base_url}")
+    proxies = [
+        ProxyStandin(latency_ms=args.slow_proxy_ms if i == 0 else 0,
+                     challenge_rate=args.proxy_challenge_rate if i == 0 else 0).start()
+        for i in range(args.proxies)
+    ]
+    if proxies:
+        print(f"替身代理: {', '.join(proxy.url for proxy in proxies)}")
+
+    meta = {
+        'label': args.label,
+        'revision': _git_revision(),
+        'started_at': datetime.now().isoformat(timespec='seconds'),
+        'driver': args.driver,
+        'accounts': args.accounts,
+        'login_submit': args.login_submit,
+        'site': {'latency_ms': args.latency_ms, 'jitter_ms': args.jitter_ms, 'error_rate': args.error_rate},
+        'proxies': {'count': args.proxies, 'slow_proxy_ms': args.slow_proxy_ms,
+                    'challenge_rate': args.proxy_challenge_rate, 'max_latency': args.proxy_max_latency,
+                    'min_samples': args.proxy_min_samples},
+        'host': {'platform': platform.platform(), 'python': platform.python_version(), 'cpus': os.cpu_count()},
+    }
+    print(f"{'并发':>4} {'成功':>6} {'失败率':>7} {'吞吐/分':>8} {'P50':>7} {'P95':>7} {'P99':>7} "
+          f"{'内存MB':>8} {'Chrome':>6}")
+    levels = []
+    with tempfile.TemporaryDirectory(prefix='loadtest_') as tmp:
+        for concurrency in levels_to_run:
+            result = run_level(concurrency, args, site, Path(tmp) / f"c{concurrency}", proxies)
+            levels.append(result)
+            print(f"{concurrency:>4} {result['succeeded']:>6} {result['failure_rate']:>7.1%} "
+                  f"{result['throughput_per_min'] or 0:>8.1f} {result['p50_seconds'] or 0:>7.2f} "
+                  f"{result['p95_seconds'] or 0:>7.2f} {result['p99_seconds'] or 0:>7.2f} "
+                  f"{result['peak_rss_mb']:>8.1f} {result['peak_chrome_processes']:>6}")
+            for entry in result['proxy_status']:
+                state = '可用' if entry['available'] else f"暂停 ({entry['reason']})"
+                print(f"     代理 {entry['proxy']}: {len(entry['accounts'])} 个账号, 得分 {entry['score']}, {state}")
+            if result['failure_rate'] > args.stop_failure_rate:
+                print(f"失败率 {result['failure_rate']:.1%} 超过 {args.stop_failure_rate:.0%}，停止提高并发")
+                break
+    if site:
+        site.stop()
+    for proxy in proxies:
+        proxy.stop()
+
+    path = write_report(levels, meta, Path(args.output))
+    print(f"报告已保存: {path} (及同名 .csv)")
+
+
+if __name__ == '__main__':
+    main()
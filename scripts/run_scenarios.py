@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+签到流程场景测试
+使用 fake_driver 的假站点和虚拟时钟运行 login()/checkin()/run() 的各种场景
+(Cloudflare 挑战、cookie 过期、缺少签到按钮、各种弹窗等)，无需 Chrome 与网络
+
+用法:
+    python scripts/run_scenarios.py            # 运行全部场景
+    python scripts/run_scenarios.py -k popup   # 只运行名称包含 popup 的场景
+    python scripts/run_scenarios.py -v         # 输出签到日志
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import pickle
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from browser_pool import SharedBrowser  # noqa: E402
+from coordinator import CoordinatorWorker, create_lease_store  # noqa: E402
+from fake_driver import FakeSite, VirtualClock  # noqa: E402
+from hitun_checkin import HitunCheckin  # noqa: E402
+from log_analytics import iter_runs, parse_text  # noqa: E402
+from logging_setup import DATE_FORMAT, LOGGER_NAME, TEXT_FORMAT  # noqa: E402
+from resp_standin import StandinServer  # noqa: E402
+from storage import save_json  # noqa: E402
+
+
+# 场景中使用的代理地址 (假站点按地址模拟代理的表现，不会真正连接)
+PROXY_A = 'http://10.0.0.1:3128'
+PROXY_B = 'http://10.0.0.2:3128'
+
+
+class Scenario:
+    """一个签到场景及其预期结果"""
+
+    def __init__(self, name: str, site: Optional[Dict[str, Any]] = None, session: str = 'none',
+                 config: Optional[Dict[str, Any]] = None, accounts: int = 1, nodes: int = 1,
+                 history: Optional[Dict[str, List[float]]] = None, **expect):
+        """
+        Args:
+            name: 场景名称
+            site: FakeSite 参数
+            session: 预先保存的会话: none (无) / valid (有效) / expired (已过期)
+            config: 覆盖的配置项，字符串中的 {workdir} / {redis} 替换为工作目录 / Redis 替身地址
+            accounts: 账号数量，大于 1 时使用共享浏览器 (配置了 coordinator 时改为由 worker 从账号表租用)
+            nodes: 节点数量，大于 1 时各节点使用独立的 data_dir 依次签到 (模拟多台主机共享会话存储)
+            history: 预先写入运行历史的成功样本: 阶段 -> 耗时列表 (秒)
+            expect: 预期结果，支持 success / traffic / logins / checkins / attempts /
+                min_virtual_seconds / max_virtual_seconds / artifacts (产物文件名前缀) /
+                deadline_phase (耗尽整体时限的阶段) / proxy (最后一个账号使用的出口代理) /
+                sidelined (被暂停的代理) / direct_loads (未经代理的页面加载次数) /
+                log_issues (log_analytics 从本场景日志中统计出的异常计数，未列出的字段应为 0)
+        """
+        self.name = name
+        self.site = site or {}
+        self.session = session
+        self.config = config or {}
+        self.accounts = accounts
+        self.nodes = nodes
+        self.history = history or {}
+        self.expect = expect
+
+
+def build_scenarios() -> List[Scenario]:
+    """组合生成场景列表"""
+    scenarios = []
+
+    # 弹窗样式 × 结果展示 × 会话状态 × Cloudflare 挑战 × 瞬态加载失败
+    matrix = itertools.product(
+        [None, 'ok_text', 'swal2', 'confirm_class'],
+        ['swal2', 'modal', 'alert', 'page'],
+        ['none', 'valid', 'expired'],
+        [None, 8],
+        [0, 2],
+    )
+    for welcome, result, session, challenge, failures in matrix:
+        name = (f"flow/welcome={welcome}/result={result}/session={session}"
+                f"/challenge={challenge}/load_failures={failures}")
+        scenarios.append(Scenario(
+            name,
+            site={'welcome_popup': welcome, 'result_popup': result,
+                  'challenge_seconds': challenge, 'load_failures': failures},
+            session=session,
+            success=True, traffic='256', checkins=1,
+            logins=0 if session == 'valid' else 1,
+        ))
+
+    scenarios += [
+        Scenario('cloudflare/never-clears', site={'challenge_seconds': float('inf')},
+                 success=False, checkins=0, attempts=3, min_virtual_seconds=60),
+        Scenario('deadline/cloudflare-never-clears', site={'challenge_seconds': float('inf')},
+                 config={'run_deadline': 20}, success=False, checkins=0, attempts=1,
+                 max_virtual_seconds=25, deadline_phase='cloudflare'),
+        Scenario('deadline/persistent-load-failures', site={'load_failures': 100},
+                 config={'run_deadline': 40}, success=False, checkins=0,
+                 max_virtual_seconds=45, deadline_phase='retry_delay'),
+        # 策略中的元素等待耗尽时限后不再尝试后备策略 (表单提交)，本次运行直接结束
+        Scenario('deadline/inside-login-strategy', site={'login_button': False},
+                 config={'login_submit': 'classic', 'run_deadline': 20}, success=False, logins=0, checkins=0,
+                 attempts=1, deadline_phase='element', max_virtual_seconds=21),
+        # 逐字段输入之间的固定等待同样受时限约束，不会超出时限继续等待
+        Scenario('deadline/inside-login-settle', config={'login_submit': 'classic', 'run_deadline': 5},
+                 success=False, logins=0, checkins=0, attempts=1, deadline_phase='login', max_virtual_seconds=6),
+        Scenario('deadline/generous-budget', site={'challenge_seconds': 8},
+                 config={'run_deadline': 300}, success=True, checkins=1),
+        Scenario('checkin/missing-button', site={'checkin_button': False},
+                 success=False, checkins=0, attempts=3, artifacts='error_'),
+        Scenario('checkin/already-checked-in', site={'already_checked_in': True},
+                 success=True, traffic=None, checkins=0),
+        Scenario('login/wrong-password', config={'password': 'wrong'},
+                 success=False, checkins=0, attempts=3, artifacts='login_failed_'),
+        Scenario('login/no-redirect-welcome', site={'login_redirect': False},
+                 success=True, traffic='256', checkins=1),
+        # 快速提交只在确有验证码时等待；逐字段输入固定等待约 15s
+        # 历史耗时很短时页面加载超时收敛到下限；站点变慢后超时失败的样本按超时时间计入，下一次尝试放宽超时
+        Scenario('adaptive/recovers-after-slowdown', site={'load_time': 12}, history={'page_load': [0.5] * 20},
+                 success=True, checkins=1, attempts=2),
+        # 日志统计: cookie 失效后改用密码登录成功不算登录失败；密码错误时每次尝试只计一次
+        Scenario('log-stats/cookie-fallback-login', session='expired',
+                 success=True, logins=1, checkins=1, log_issues={'login_failures': 0}),
+        Scenario('log-stats/wrong-password', config={'password': 'wrong'},
+                 success=False, checkins=0, attempts=3, log_issues={'login_failures': 3}),
+        Scenario('login/classic-submit', config={'login_submit': 'classic'},
+                 success=True, logins=1, checkins=1, min_virtual_seconds=15),
+        Scenario('login/fast-submit', success=True, logins=1, checkins=1, max_virtual_seconds=5),
+        Scenario('login/fast-submit-captcha', site={'login_captcha': 4},
+                 success=True, logins=1, checkins=1, min_virtual_seconds=4, max_virtual_seconds=10),
+        Scenario('login/fast-submit-captcha-unsolved', site={'login_captcha': 400},
+                 success=True, logins=1, checkins=1, min_virtual_seconds=15, max_virtual_seconds=25),
+        Scenario('login/classic-submit-wrong-password', config={'login_submit': 'classic', 'password': 'wrong'},
+                 success=False, checkins=0, attempts=3, artifacts='login_failed_'),
+        Scenario('network/persistent-load-failures', site={'load_failures': 100},
+                 success=False, checkins=0, attempts=3),
+        Scenario('retry/recovers-on-second-attempt', site={'load_failures': 3},
+                 success=True, checkins=1, attempts=2),
+        Scenario('reward/gigabytes', site={'reward': '获得了 1024MB 流量'},
+                 success=True, traffic='1024', checkins=1),
+        # 流量单位统一换算为 MB
+        Scenario('reward/gb-unit', site={'reward': '获得了 1.5GB 流量'},
+                 success=True, traffic='1536', checkins=1),
+        Scenario('reward/kb-unit', site={'reward': '获得了 512KB 流量'},
+                 success=True, traffic='0.5', checkins=1),
+        Scenario('reward/gb-unit-page-only', site={'reward': '获得了 2 GB 流量', 'result_popup': 'page'},
+                 success=True, traffic='2048', checkins=1),
+        Scenario('reward/already-checked-in-popup', site={'reward': '您似乎已经签到过了...'},
+                 success=True, traffic=None, checkins=1),
+        # 出口代理: 按账号分配，连接失败、过慢或挑战过多的代理被暂停，账号改用其他代理
+        Scenario('proxy/assigned', config={'proxies': [PROXY_A]},
+                 success=True, checkins=1, proxy=PROXY_A, direct_loads=0),
+        Scenario('proxy/fixed-proxy', config={'proxies': [PROXY_A], 'proxy': 'socks5://10.0.0.9:1080'},
+                 success=True, checkins=1, proxy='socks5://10.0.0.9:1080', direct_loads=0),
+        Scenario('proxy/direct-opt-out', config={'proxies': [PROXY_A], 'proxy': 'direct'},
+                 success=True, checkins=1, proxy=None, sidelined=[]),
+        Scenario('proxy/down-fails-over', site={'proxies': {PROXY_A: {'down': True}}},
+                 config={'proxies': [PROXY_A, PROXY_B]},
+                 success=True, checkins=1, attempts=2, proxy=PROXY_B, sidelined=[PROXY_A]),
+        Scenario('proxy/down-direct-fallback', site={'proxies': {PROXY_A: {'down': True}}},
+                 config={'proxies': [PROXY_A], 'proxy_direct_fallback': True},
+                 success=True, checkins=1, attempts=2, proxy=None, sidelined=[PROXY_A]),
+        Scenario('proxy/down-no-fallback', site={'proxies': {PROXY_A: {'down': True}}},
+                 config={'proxies': [PROXY_A]}, success=False, checkins=0, attempts=3, direct_loads=0),
+        Scenario('proxy/slow-sidelined', accounts=3, site={'proxies': {PROXY_A: {'latency': 30}}},
+                 config={'proxies': [PROXY_A, PROXY_B], 'proxy_max_latency': 20, 'proxy_min_samples': 1},
+                 success=True, checkins=3, proxy=PROXY_B, sidelined=[PROXY_A], direct_loads=0),
+        Scenario('proxy/challenged-sidelined', accounts=2, site={'proxies': {PROXY_A: {'challenge_seconds': 4}}},
+                 config={'proxies': [PROXY_A, PROXY_B], 'proxy_min_samples': 1},
+                 success=True, checkins=2, proxy=PROXY_B, sidelined=[PROXY_A]),
+        Scenario('timing/report', session='valid', config={'timing_report': True},
+                 success=True, checkins=1, timing_report=2),
+        Scenario('session-store/sqlite-handoff', nodes=2,
+                 config={'session_store': 'sqlite:{workdir}/shared/sessions.db'},
+                 success=True, logins=1, checkins=1),
+        Scenario('session-store/redis-handoff', nodes=2, config={'session_store': '{redis}'},
+                 success=True, logins=1, checkins=1),
+        Scenario('coordinator/sqlite-worker', accounts=3,
+                 config={'coordinator': 'sqlite:{workdir}/shared/coordinator.db'},
+                 success=True, checkins=3, logins=3),
+        Scenario('coordinator/redis-worker', accounts=3, config={'coordinator': '{redis}'},
+                 success=True, checkins=3, logins=3),
+        Scenario('shared-browser/two-accounts', accounts=2,
+                 success=True, checkins=2, logins=2),
+    ]
+    return scenarios
+
+
+class LogCapture(logging.Handler):
+    """按文本日志格式收集签到日志，供 log_analytics 解析"""
+
+    def __init__(self):
+        super().__init__(logging.INFO)
+        self.setFormatter(logging.Formatter(TEXT_FORMAT, datefmt=DATE_FORMAT))
+        self.lines: List[str] = []
+
+    def emit(self, record: logging.LogRecord):
+        self.lines.append(self.format(record) + '\n')
+
+
+def _write_config(workdir: Path, site: FakeSite, overrides: Dict[str, Any], verbose: bool,
+                  name: str = 'config.json') -> Path:
+    config = {
+        'email': site.email,
+        'password': site.password,
+        'base_url': site.base_url,
+        'data_dir': str(workdir / 'data'),
+        'log_dir': str(workdir / 'logs'),
+        'log_level': 'INFO' if verbose else 'CRITICAL',
+        'preflight': False,
+        'enable_notification': False,
+        'max_retry': 3,
+        'debug_artifacts': False,
+    }
+    config.update(overrides)
+    config_path = workdir / name
+    config_path.write_text(json.dumps(config, ensure_ascii=False), encoding='utf-8')
+    return config_path
+
+
+def run_scenario(scenario: Scenario, workdir: Path, verbose: bool = False) -> List[str]:
+    """运行单个场景
+
+    Returns:
+        不符合预期的描述列表，为空表示通过
+    """
+    clock = VirtualClock()
+    site = FakeSite(clock=clock, **scenario.site)
+    standin = StandinServer().start() if '{redis}' in json.dumps(scenario.config) else None
+    overrides = {
+        key: value.format(workdir=workdir, redis=standin.url if standin else '') if isinstance(value, str) else value
+        for key, value in scenario.config.items()
+    }
+    if scenario.accounts > 1:
+        overrides['accounts'] = [
+            {'name': f"acc{i}", 'email': site.email, 'password': site.password}
+            for i in range(1, scenario.accounts + 1)
+        ]
+    config_path = _write_config(workdir, site, overrides, verbose)
+    data_dir = workdir / 'data'
+    data_dir.mkdir(parents=True, exist_ok=True)
+
+    if scenario.history:
+        # 样本时间取在虚拟时钟起点之前，每分钟一条
+        save_json(data_dir / 'run_history.json', {'phases': {
+            phase: [[clock.now - (len(values) - i) * 60, duration, True] for i, duration in enumerate(values)]
+            for phase, values in scenario.history.items()
+        }})
+
+    if scenario.session != 'none':
+        with open(data_dir / 'cookies.pkl', 'wb') as f:
+            pickle.dump([site.issue_session()], f)
+        if scenario.session == 'expired':
+            site.expire_sessions()
+
+    results = []
+
+    def capture(checkin: HitunCheckin) -> HitunCheckin:
+        original = checkin._run_once
+
+        def run_once():
+            result = original()
+            results.append(result)
+            return result
+
+        checkin._run_once = run_once
+        return checkin
+
+    success = True
+    start = clock.now
+    with clock.install():
+        if 'coordinator' in overrides:
+            store = create_lease_store(overrides['coordinator'], data_dir)
+            store.register(overrides['accounts'])
+            worker = CoordinatorWorker(
+                str(config_path), store=store, worker_id='scenario',
+                checkin_factory=lambda account: capture(
+                    HitunCheckin(str(config_path), account=account, driver_factory=site.new_driver)),
+            )
+            success = worker.run()
+            checkins = []
+        elif scenario.accounts > 1:
+            host = HitunCheckin(str(config_path), account=overrides['accounts'][0],
+                                driver_factory=site.new_driver)
+            browser = SharedBrowser.launch(host)
+            checkins = [HitunCheckin(str(config_path), account=account, browser=browser)
+                        for account in overrides['accounts']]
+        elif scenario.nodes > 1:
+            checkins = [
+                HitunCheckin(str(_write_config(workdir, site, {**overrides, 'data_dir': str(workdir / f"node{i}")},
+                                               verbose, name=f"config{i}.json")),
+                             driver_factory=site.new_driver)
+                for i in range(scenario.nodes)
+            ]
+        else:
+            checkins = [HitunCheckin(str(config_path), driver_factory=site.new_driver)]
+
+        capture_log = LogCapture() if 'log_issues' in scenario.expect else None
+        if capture_log:
+            # 收集 INFO 及以上的日志；不输出签到日志时临时摘下原有的处理器
+            logger = logging.getLogger(LOGGER_NAME)
+            saved_level, saved_handlers = logger.level, logger.handlers[:]
+            logger.setLevel(logging.INFO)
+            logger.handlers = saved_handlers + [capture_log] if verbose else [capture_log]
+        try:
+            for checkin in checkins:
+                success = capture(checkin).run() and success
+                checkin.artifacts.flush()
+        finally:
+            if capture_log:
+                logger.setLevel(saved_level)
+                logger.handlers = saved_handlers
+        # 代理的暂停时间按虚拟时钟计算，需在恢复真实时钟前读取
+        last = checkins[-1] if checkins else None
+        proxy = last.proxy if last else None
+        sidelined = sorted(entry['proxy'] for entry in last.proxies.status()
+                           if not entry['available']) if last and last.proxies else []
+    if standin:
+        standin.stop()
+
+    expect = scenario.expect
+    problems = []
+    if 'success' in expect and success != expect['success']:
+        problems.append(f"success={success}, 预期 {expect['success']}")
+    if 'traffic' in expect:
+        traffic = results[-1][1] if results else None
+        if traffic != expect['traffic']:
+            problems.append(f"traffic={traffic!r}, 预期 {expect['traffic']!r}")
+    if 'checkins' in expect and site.checkins != expect['checkins']:
+        problems.append(f"checkins={site.checkins}, 预期 {expect['checkins']}")
+    if 'logins' in expect and site.logins != expect['logins']:
+        problems.append(f"logins={site.logins}, 预期 {expect['logins']}")
+    if 'attempts' in expect and len(results) != expect['attempts']:
+        problems.append(f"attempts={len(results)}, 预期 {expect['attempts']}")
+    if 'min_virtual_seconds' in expect and clock.now - start < expect['min_virtual_seconds']:
+        problems.append(f"虚拟耗时 {clock.now - start:.0f}s, 预期至少 {expect['min_virtual_seconds']}s")
+    if 'max_virtual_seconds' in expect and clock.now - start > expect['max_virtual_seconds']:
+        problems.append(f"虚拟耗时 {clock.now - start:.0f}s, 预期最多 {expect['max_virtual_seconds']}s")
+    if 'deadline_phase' in expect:
+        phase = checkins[-1].deadline.exhausted_phase if checkins else None
+        if phase != expect['deadline_phase']:
+            problems.append(f"时限耗尽于 {phase!r}, 预期 {expect['deadline_phase']!r}")
+    if 'proxy' in expect and proxy != expect['proxy']:
+        problems.append(f"proxy={proxy!r}, 预期 {expect['proxy']!r}")
+    if 'sidelined' in expect and sidelined != expect['sidelined']:
+        problems.append(f"暂停的代理 {sidelined}, 预期 {expect['sidelined']}")
+    if 'direct_loads' in expect and site.proxy_loads.get(None, 0) != expect['direct_loads']:
+        problems.append(f"直接连接的页面加载 {site.proxy_loads.get(None, 0)} 次, 预期 {expect['direct_loads']}")
+    if 'log_issues' in expect:
+        issues: Dict[str, int] = {}
+        for run in iter_runs(parse_text(capture_log.lines)):
+            for field, count in run['issues'].items():
+                issues[field] = issues.get(field, 0) + count
+        expected_issues = {field: count for field, count in expect['log_issues'].items() if count}
+        if issues != expected_issues:
+            problems.append(f"日志统计的异常 {issues}, 预期 {expected_issues}")
+    if 'artifacts' in expect:
+        artifact_dir = workdir / 'logs' / 'artifacts'
+        if not artifact_dir.is_dir() or not any(p.name.startswith(expect['artifacts']) for p in artifact_dir.iterdir()):
+            problems.append(f"未找到 {expect['artifacts']}* 调试产物")
+    if 'timing_report' in expect:
+        reports = list((workdir / 'logs' / 'timing').glob('timing_*.json'))
+        navigations = json.loads(reports[0].read_text(encoding='utf-8'))['navigations'] if reports else []
+        if len(navigations) < expect['timing_report'] or 'slowest' not in navigations[0]:
+            problems.append(f"计时报告记录了 {len(navigations)} 次导航, 预期至少 {expect['timing_report']}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description='签到流程场景测试 (假浏览器 + 虚拟时钟)')
+    parser.add_argument('-k', '--keyword', help='只运行名称包含该关键字的场景')
+    parser.add_argument('-v', '--verbose', action='store_true', help='输出签到日志')
+    args = parser.parse_args()
+
+    scenarios = [s for s in build_scenarios() if not args.keyword or args.keyword in s.name]
+    failures = 0
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory() as tmp:
+        for index, scenario in enumerate(scenarios):
+            workdir = Path(tmp) / f"s{index}"
+            workdir.mkdir()
+            try:
+                problems = run_scenario(scenario, workdir, args.verbose)
+            except Exception as e:
+                problems = [f"异常: {e!r}"]
+            if problems:
+                failures += 1
+                print(f"FAIL {scenario.name}: {'; '.join(problems)}")
+            elif args.verbose:
+                print(f"ok   {scenario.name}")
+
+    elapsed = time.perf_counter() - started
+    print(f"{len(scenarios)} 个场景, 通过 {len(scenarios) - failures}, 失败 {failures} ({elapsed:.1f}s)")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
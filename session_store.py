@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+会话存储模块
+把各账号的 cookies (以及与 cf_clearance 绑定的浏览器指纹) 保存在可共享的存储中，
+多台主机上的签到进程可以直接接手其他节点刚产生的有效会话，而不是各自重新登录、争抢 Cloudflare 验证。
+
+每条会话带版本号，写入使用比较并交换 (compare-and-set)：只有存储中的版本仍是读取时的版本才会写入，
+避免较旧的会话覆盖其他节点刚写入的新会话。
+
+后端:
+    file                              data_dir 下的 cookies.pkl (默认，兼容旧版本的 cookie 文件)
+    sqlite:///路径/sessions.db          共享卷上的 SQLite 数据库
+    redis://[:密码@]主机:端口/库号       Redis 协议服务 (或本地的 resp_standin 替身)
+"""
+
+import abc
+import json
+import pickle
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from resp_client import RespClient
+from storage import atomic_write_bytes
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+
+def _new_record(cookies: List[Dict[str, Any]], fingerprint: Optional[Dict[str, Any]],
+                version: int) -> Dict[str, Any]:
+    return {
+        'version': version,
+        'cookies': cookies,
+        'fingerprint': fingerprint,
+        'updated_at': time.time(),
+        'node': socket.gethostname(),
+    }
+
+
+class SessionStore(abc.ABC):
+    """会话存储接口
+
+    会话记录格式: {'version', 'cookies', 'fingerprint', 'updated_at', 'node'}
+    """
+
+    @abc.abstractmethod
+    def load(self, account: str) -> Optional[Dict[str, Any]]:
+        """读取账号的会话，不存在时返回 None"""
+
+    @abc.abstractmethod
+    def save(self, account: str, cookies: List[Dict[str, Any]],
+             fingerprint: Optional[Dict[str, Any]] = None,
+             expected_version: Optional[int] = None) -> Optional[int]:
+        """写入会话
+
+        Args:
+            account: 账号标识
+            cookies: driver.get_cookies() 格式的 cookie 列表
+            fingerprint: 与 cookies 绑定的浏览器指纹
+            expected_version: 读取时的版本号 (没有会话时为 0)；为 None 时无条件写入
+
+        Returns:
+            写入后的版本号；存储中的版本已被其他节点更新时返回 None
+        """
+
+    def describe(self) -> str:
+        """用于日志的存储描述"""
+        return self.__class__.__name__
+
+
+class FileSessionStore(SessionStore):
+    """本地文件存储，每个账号一个 pickle 文件
+
+    兼容旧版本直接保存 cookie 列表的 cookies.pkl (视为版本 0)。
+    """
+
+    def __init__(self, data_dir: Path):
+        self.data_dir = Path(data_dir)
+        self._thread_lock = threading.Lock()
+
+    def path(self, account: str) -> Path:
+        """账号的 cookie 文件路径，默认账号沿用原有文件名"""
+        if account == 'default':
+            return self.data_dir / 'cookies.pkl'
+        return self.data_dir / f"cookies_{account}.pkl"
+
+    def load(self, account: str) -> Optional[Dict[str, Any]]:
+        path = self.path(account)
+        if not path.exists():
+            return None
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+        if isinstance(data, list):
+            return {'version': 0, 'cookies': data, 'fingerprint': None,
+                    'updated_at': path.stat().st_mtime, 'node': None}
+        return data
+
+    def save(self, account, cookies, fingerprint=None, expected_version=None):
+        path = self.path(account)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # 文件锁保证跨进程的读取-比较-写入是原子的
+        with self._thread_lock, open(path.with_name(f".{path.name}.lock"), 'a') as lock_file:
+            if FCNTL_AVAILABLE:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                current = self.load(account)
+            except Exception:
+                current = None
+            version = current['version'] if current else 0
+            if expected_version is not None and version != expected_version:
+                return None
+            atomic_write_bytes(path, pickle.dumps(_new_record(cookies, fingerprint, version + 1)))
+            return version + 1
+
+    def describe(self):
+        return f"file:{self.data_dir}"
+
+
+class SQLiteSessionStore(SessionStore):
+    """SQLite 存储，适合放在多个容器共享的卷上"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS sessions (
+            account TEXT PRIMARY KEY,
+            version INTEGER NOT NULL,
+            data TEXT NOT NULL,
+            updated_at REAL NOT NULL,
+            node TEXT
+        )
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(self.SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # 每次操作使用独立连接，可以在线程池中并发调用
+        return sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+
+    def load(self, account):
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                'SELECT version, data, updated_at, node FROM sessions WHERE account = ?', (account,)
+            ).fetchone()
+        if not row:
+            return None
+        data = json.loads(row[1])
+        return {'version': row[0], 'cookies': data['cookies'], 'fingerprint': data.get('fingerprint'),
+                'updated_at': row[2], 'node': row[3]}
+
+    def save(self, account, cookies, fingerprint=None, expected_version=None):
+        record = _new_record(cookies, fingerprint, 0)
+        data = json.dumps({'cookies': cookies, 'fingerprint': fingerprint}, ensure_ascii=False)
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute('SELECT version FROM sessions WHERE account = ?', (account,)).fetchone()
+            version = row[0] if row else 0
+            if expected_version is not None and version != expected_version:
+                conn.execute('ROLLBACK')
+                return None
+            conn.execute(
+                'INSERT OR REPLACE INTO sessions (account, version, data, updated_at, node) VALUES (?, ?, ?, ?, ?)',
+                (account, version + 1, data, record['updated_at'], record['node']),
+            )
+            conn.execute('COMMIT')
+            return version + 1
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    def describe(self):
+        return f"sqlite:{self.path}"
+
+
+class RedisSessionStore(SessionStore):
+    """Redis 协议存储，每个账号一个 JSON 字符串键，比较并交换使用 WATCH/MULTI/EXEC"""
+
+    def __init__(self, url: str, prefix: str = 'hitun:session:'):
+        self.url = url
+        self.prefix = prefix
+        self.client = RespClient.from_url(url)
+
+    def load(self, account):
+        raw = self.client.execute('GET', self.prefix + account)
+        return json.loads(raw) if raw else None
+
+    def save(self, account, cookies, fingerprint=None, expected_version=None):
+        key = self.prefix + account
+        with self.client.lock:
+            try:
+                self.client.execute('WATCH', key)
+                raw = self.client.execute('GET', key)
+                version = json.loads(raw)['version'] if raw else 0
+                if expected_version is not None and version != expected_version:
+                    self.client.execute('UNWATCH')
+                    return None
+                record = _new_record(cookies, fingerprint, version + 1)
+                self.client.execute('MULTI')
+                self.client.execute('SET', key, json.dumps(record, ensure_ascii=False))
+                # WATCH 的键在 EXEC 前被其他连接修改时事务被放弃，返回 nil
+                if self.client.execute('EXEC') is None:
+                    return None
+                return version + 1
+            except BaseException:
+                self.client.close()
+                raise
+
+    def describe(self):
+        # 不输出密码
+        return f"redis://{self.client.host}:{self.client.port}/{self.client.db}"
+
+
+def create_session_store(spec: Optional[str], data_dir: Path) -> SessionStore:
+    """根据配置创建会话存储
+
+    Args:
+        spec: 配置项 session_store，见模块说明；为空时使用文件存储
+        data_dir: 数据目录
+    """
+    spec = (spec or 'file').strip()
+    if spec == 'file':
+        return FileSessionStore(data_dir)
+    if spec.startswith('sqlite:'):
+        path = spec[len('sqlite:'):]
+        if path.startswith('//'):
+            path = path[2:]
+        return SQLiteSessionStore(Path(path) if path else Path(data_dir) / 'sessions.db')
+    if spec.startswith(('redis://', 'rediss://')):
+        if spec.startswith('rediss://'):
+            raise ValueError("暂不支持 TLS 连接 (rediss://)")
+        return RedisSessionStore(spec)
+    raise ValueError(f"未知的会话存储: {spec}")
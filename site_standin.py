@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+hitun.io 本地替身站点
+用标准库 HTTP 服务实现签到流程用到的页面和接口 (登录页、用户页、签到接口)，
+页面结构与 fake_driver 的假站点一致，真实 Chrome 和无浏览器的 HTTP 签到都可以直接访问。
+用于压力测试和本地调试，任意邮箱配合统一密码即可登录。
+
+用法:
+    python site_standin.py --port 8080 --latency-ms 150 --error-rate 0.01
+"""
+
+import argparse
+import html
+import json
+import random
+import secrets
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+LOGIN_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>登录 — Hitun</title></head>
+<body>
+<h1>登录 Hitun</h1>
+{error}
+<form id="login-form" method="post" action="/auth/login">
+  <input id="email" name="email" type="email">
+  <input id="passwd" name="passwd" type="password">
+  <button id="login" class="btn btn-primary" type="submit">登录</button>
+</form>
+</body></html>
+"""
+
+USER_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>用户中心 — Hitun</title></head>
+<body>
+<h1>用户中心</h1>
+<p>{email} 剩余流量 10GB</p>
+<button id="checkin" class="btn" {disabled}>{label}</button>
+<div id="result"></div>
+<script>
+document.getElementById('checkin').addEventListener('click', function () {{
+  fetch('/user/checkin', {{method: 'POST', headers: {{'X-Requested-With': 'XMLHttpRequest'}}}})
+    .then(function (r) {{ return r.json(); }})
+    .then(function (data) {{
+      var box = document.createElement('div');
+      box.className = data.ret === 1 ? 'swal2-html-container' : 'alert alert-danger';
+      box.textContent = data.msg;
+      document.getElementById('result').appendChild(box);
+      if (data.ret === 1) {{ document.body.appendChild(document.createTextNode(' 签到成功')); }}
+    }});
+}});
+</script>
+</body></html>
+"""
+
+
+class SiteStandin(ThreadingHTTPServer):
+    """替身站点服务器
+
+    Args:
+        address: 监听地址，端口为 0 时自动分配
+        password: 所有账号通用的登录密码
+        latency_ms: 每个请求的基础延迟 (毫秒)，模拟网络与服务端耗时
+        jitter_ms: 延迟的随机抖动上限 (毫秒)
+        error_rate: 随机返回 502 的概率
+        reward_mb: 签到获得的流量
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: Tuple[str, int] = ('127.0.0.1', 0), password: str = 'secret',
+                 latency_ms: float = 0, jitter_ms: float = 0, error_rate: float = 0, reward_mb: int = 256):
+        super().__init__(address, _Handler)
+        self.password = password
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.reward_mb = reward_mb
+        self.lock = threading.Lock()
+        # 会话 token -> 邮箱
+        self.sessions: Dict[str, str] = {}
+        # (日期, 邮箱) 已签到
+        self.checked_in = set()
+        self.stats: Dict[str, int] = {'requests': 0, 'errors': 0, 'logins': 0, 'failed_logins': 0, 'checkins': 0}
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'SiteStandin':
+        """在后台线程中运行"""
+        threading.Thread(target=self.serve_forever, name='site-standin', daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def count(self, key: str, amount: int = 1):
+        with self.lock:
+            self.stats[key] = self.stats.get(key, 0) + amount
+
+    def snapshot(self) -> Dict[str, int]:
+        """请求计数的副本"""
+        with self.lock:
+            return dict(self.stats)
+
+    def reset(self):
+        """清空会话、签到记录和计数 (每轮压测前调用)"""
+        with self.lock:
+            self.sessions.clear()
+            self.checked_in.clear()
+            for key in self.stats:
+                self.stats[key] = 0
+
+    def login(self, email: str, password: str) -> Optional[str]:
+        """校验凭证并返回新的会话 token"""
+        if not email or password != self.password:
+            self.count('failed_logins')
+            return None
+        token = secrets.token_hex(16)
+        with self.lock:
+            self.sessions[token] = email
+            self.stats['logins'] += 1
+        return token
+
+    def checkin(self, email: str) -> Dict[str, Any]:
+        """签到，同一账号每天只能签到一次"""
+        key = (datetime.now().strftime('%Y-%m-%d'), email)
+        with self.lock:
+            if key in self.checked_in:
+                return {'ret': 0, 'msg': '您似乎已经签到过了...'}
+            self.checked_in.add(key)
+            self.stats['checkins'] += 1
+        return {'ret': 1, 'msg': f"获得了 {self.reward_mb}MB 流量"}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: SiteStandin
+    server_version = 'HitunStandin'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _session_email(self) -> Optional[str]:
+        for part in (self.headers.get('Cookie') or '').split(';'):
+            name, _, value = part.strip().partition('=')
+            if name == 'key':
+                return self.server.sessions.get(value)
+        return None
+
+    def _delay_or_fail(self) -> bool:
+        """模拟延迟和瞬态错误，返回 False 表示已回复 502"""
+        server = self.server
+        server.count('requests')
+        delay = server.latency_ms + random.uniform(0, server.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+        if server.error_rate and random.random() < server.error_rate:
+            server.count('errors')
+            self._send(502, 'Bad Gateway', 'text/plain')
+            return False
+        return True
+
+    def _send(self, status: int, body: str, content_type: str = 'text/html; charset=utf-8',
+              headers: Optional[Dict[str, str]] = None):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _redirect(self, location: str, cookie: Optional[str] = None):
+        headers = {'Location': location}
+        if cookie:
+            headers['Set-Cookie'] = f"key={cookie}; Path=/; Max-Age=86400"
+        self._send(302, '', headers=headers)
+
+    def _login_page(self, error: str = ''):
+        block = f'<div class="alert alert-danger">{html.escape(error)}</div>' if error else ''
+        self._send(200, LOGIN_PAGE.format(error=block))
+
+    def do_GET(self):
+        if not self._delay_or_fail():
+            return
+        path = urlparse(self.path).path
+        if path.startswith('/auth/login'):
+            self._login_page()
+        elif path.startswith('/user'):
+            email = self._session_email()
+            if not email:
+                self._redirect('/auth/login')
+                return
+            done = (datetime.now().strftime('%Y-%m-%d'), email) in self.server.checked_in
+            self._send(200, USER_PAGE.format(
+                email=html.escape(email),
+                disabled='disabled' if done else '',
+                label='今日已签到' if done else '>_ 签到',
+            ))
+        elif path == '/':
+            self._send(200, '<html><head><title>Hitun</title></head><body>Hitun 首页</body></html>')
+        else:
+            self._send(404, 'Not Found', 'text/plain')
+
+    def do_POST(self):
+        if not self._delay_or_fail():
+            return
+        path = urlparse(self.path).path
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length).decode('utf-8') if length else ''
+        if path == '/auth/login':
+            if 'json' in (self.headers.get('Content-Type') or ''):
+                form = json.loads(body or '{}')
+            else:
+                form = {key: values[0] for key, values in parse_qs(body).items()}
+            token = self.server.login(form.get('email', ''), form.get('passwd', ''))
+            if token:
+                self._redirect('/user', cookie=token)
+            else:
+                self._login_page('密码错误')
+        elif path == '/user/checkin':
+            email = self._session_email()
+            if not email:
+                self._send(401, json.dumps({'ret': -1, 'msg': '请先登录'}), 'application/json')
+                return
+            self._send(200, json.dumps(self.server.checkin(email), ensure_ascii=False), 'application/json')
+        else:
+            self._send(404, 'Not Found', 'text/plain')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='hitun.io 本地替身站点 (仅供测试)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--password', default='secret', help='所有账号通用的登录密码')
+    parser.add_argument('--latency-ms', type=float, default=0, help='每个请求的基础延迟')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='延迟的随机抖动上限')
+    parser.add_argument('--error-rate', type=float, default=0, help='随机返回 502 的概率')
+    args = parser.parse_args()
+    server = SiteStandin((args.host, args.port), password=args.password, latency_ms=args.latency_ms,
+                         jitter_ms=args.jitter_ms, error_rate=args.error_rate)
+    print(f"监听 {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
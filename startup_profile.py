@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+启动耗时统计模块
+重量级依赖 (selenium、undetected-chromedriver、requests) 通过 lazy_import 在首次使用时才导入，
+导入和初始化耗时记录在这里，供 --profile-startup 输出报告
+"""
+
+import importlib
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+
+_events: List[Tuple[str, float]] = []
+
+
+def record(label: str, seconds: float):
+    """记录一个步骤的耗时"""
+    _events.append((label, seconds))
+
+
+@contextmanager
+def timed(label: str):
+    """记录代码块的耗时"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(label, time.perf_counter() - start)
+
+
+def lazy_import(name: str):
+    """导入模块，首次导入时记录耗时"""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    with timed(f"import {name}"):
+        return importlib.import_module(name)
+
+
+def process_age() -> Optional[float]:
+    """进程启动至今的秒数 (读取 /proc，不可用时返回 None)"""
+    try:
+        with open('/proc/self/stat') as f:
+            # 第 22 个字段为进程启动时间 (开机后的时钟滴答数)，comm 字段可能含空格，从右括号后开始切分
+            start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+    return uptime - start_ticks / os.sysconf('SC_CLK_TCK')
+
+
+def report() -> str:
+    """按记录顺序输出耗时报告"""
+    lines = ['启动耗时:']
+    for label, seconds in _events:
+        lines.append(f"  {seconds * 1000:9.1f} ms  {label}")
+    return '\n'.join(lines)
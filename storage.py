@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地状态文件读写工具
+所有写入均先写临时文件再原子替换，避免进程中断留下半截文件
+"""
+
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Union
+
+PathLike = Union[str, Path]
+
+
+def atomic_write_bytes(path: PathLike, data: bytes):
+    """原子写入二进制文件 (同目录临时文件 + os.replace)"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def load_json(path: PathLike, default: Any = None) -> Any:
+    """读取 JSON 状态文件，文件不存在或损坏时返回默认值"""
+    path = Path(path)
+    if not path.exists():
+        return default
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logging.getLogger('HitunCheckin').warning(f"读取状态文件失败，已忽略: {path} ({e})")
+        return default
+
+
+def save_json(path: PathLike, data: Any):
+    """原子写入 JSON 状态文件"""
+    atomic_write_bytes(path, json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8'))
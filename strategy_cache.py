@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+定位策略缓存模块
+记录每个步骤中各定位/点击策略的近期成功率，下次按成功率从高到低尝试，
+常见情况下第一次尝试即可命中，省去失败查找和后备等待
+"""
+
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from storage import load_json, save_json
+
+
+class StrategyCache:
+    """按步骤记录策略成功率的持久化缓存
+
+    成功率使用指数衰减计数，近期结果权重更高，页面改版后能较快适应。
+    """
+
+    # 未记录过的策略的默认成功率，位于"总成功"和"总失败"之间
+    DEFAULT_RATE = 0.5
+
+    def __init__(self, path: Path, decay: float = 0.8):
+        """初始化策略缓存
+
+        Args:
+            path: 缓存文件路径
+            decay: 每次记录时旧结果的衰减系数
+        """
+        self.path = Path(path)
+        self.decay = decay
+        # 步骤 -> 策略 -> {'score': 衰减后的成功次数, 'weight': 衰减后的总次数}
+        self.steps: Dict[str, Dict[str, Dict[str, float]]] = load_json(self.path, {})
+        # 本次运行新增、尚未写入文件的结果: (步骤, 策略, 是否成功)
+        self._pending: List[Tuple[str, str, bool]] = []
+
+    def rate(self, step: str, strategy: str) -> float:
+        """策略的近期成功率"""
+        stats = self.steps.get(step, {}).get(strategy)
+        if not stats or not stats['weight']:
+            return self.DEFAULT_RATE
+        return stats['score'] / stats['weight']
+
+    def order(self, step: str, strategies: List[str]) -> List[str]:
+        """按近期成功率排序策略，成功率相同时保持原有顺序"""
+        return sorted(strategies, key=lambda name: -self.rate(step, name))
+
+    def record(self, step: str, strategy: str, ok: bool):
+        """记录一次策略尝试结果"""
+        self._apply(self.steps, step, strategy, ok)
+        self._pending.append((step, strategy, ok))
+
+    def _apply(self, steps: Dict[str, Dict[str, Dict[str, float]]], step: str, strategy: str, ok: bool):
+        stats = steps.setdefault(step, {}).setdefault(strategy, {'score': 0.0, 'weight': 0.0})
+        stats['score'] = round(stats['score'] * self.decay + (1.0 if ok else 0.0), 4)
+        stats['weight'] = round(stats['weight'] * self.decay + 1.0, 4)
+
+    def flush(self):
+        """把本次运行的结果合并写入缓存文件
+
+        先重新读取文件，再把本次的结果依次计入，多个账号/进程先后写入时不会互相覆盖。
+        """
+        if not self._pending:
+            return
+        steps = load_json(self.path, {})
+        for step, strategy, ok in self._pending:
+            self._apply(steps, step, strategy, ok)
+        save_json(self.path, steps)
+        self.steps = steps
+        self._pending = []